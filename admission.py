@@ -0,0 +1,197 @@
+"""
+Admission control for evaluation requests
+
+POST /api/submissions evaluates synchronously, so every accepted request
+holds a worker thread, memory and LLM quota until it finishes. When the
+process is already at capacity, a new submission is turned away at once
+with Retry-After instead of being accepted and ending in timeouts or
+fallback scores. Limits (per worker process; 0 disables a check):
+
+- in-flight evaluations: ADMISSION_MAX_INFLIGHT, and per hackathon
+  Hackathon.max_inflight_evaluations
+- queued LLM tokens (calls active evaluations still have to make, times
+  ADMISSION_TOKENS_PER_CALL): ADMISSION_MAX_QUEUED_TOKENS, and per
+  hackathon Hackathon.max_queued_tokens
+- free disk on the upload volume: ADMISSION_MIN_FREE_DISK_MB plus the upload
+
+Server-wide limits answer 503, a hackathon's own limits 429. Both carry a
+queue-position hint (evaluations that must finish before one fits) and a
+Retry-After derived from recent evaluation durations. An evaluation whose
+LLM budget cannot cover a single call (BudgetExhausted) is refused with 429
+as well, before any call is made.
+"""
+
+import math
+import os
+import shutil
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from config import Config
+from scheduler import llm_scheduler
+
+
+class AdmissionRejected(Exception):
+    """Request refused for capacity reasons"""
+
+    def __init__(self, status, reason, retry_after, queue_position=None):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+        self.queue_position = queue_position
+
+    def to_dict(self):
+        return {
+            'error': 'Evaluation capacity reached, please retry later',
+            'reason': self.reason,
+            'retry_after': self.retry_after,
+            'queue_position': self.queue_position
+        }
+
+
+class BudgetExhausted(AdmissionRejected):
+    """Evaluation refused: not even one LLM call fits the budget, or the hackathon totals could not be reserved"""
+
+    def __init__(self, budget):
+        super().__init__(429, 'budget_exhausted', Config.ADMISSION_DEFAULT_EVALUATION_SECONDS)
+        self.budget = budget
+
+    def to_dict(self):
+        body = super().to_dict()
+        body.update(error='LLM budget of this hackathon is exhausted', budget=self.budget)
+        return body
+
+
+class AdmissionController:
+    """Counts admitted evaluations per hackathon and refuses work beyond the limits"""
+
+    def __init__(self, scheduler=llm_scheduler, history=50):
+        self.scheduler = scheduler
+        self._lock = threading.Lock()
+        self._inflight = Counter()  # hackathon id -> admitted evaluations running
+        self._durations = deque(maxlen=history)  # Seconds of recent evaluations
+        self.admitted = 0
+        self.rejected = Counter()  # reason -> count
+
+    def _evaluation_seconds(self):
+        if not self._durations:
+            return Config.ADMISSION_DEFAULT_EVALUATION_SECONDS
+        return sum(self._durations) / len(self._durations)
+
+    def _reject(self, status, reason, queue_position, parallelism):
+        """Build the rejection; Retry-After is the time for queue_position evaluations to drain"""
+        self.rejected[reason] += 1
+        waves = math.ceil(max(1, queue_position or 1) / max(1, parallelism))
+        retry_after = min(Config.ADMISSION_MAX_RETRY_AFTER, max(1, math.ceil(waves * self._evaluation_seconds())))
+        return AdmissionRejected(status, reason, retry_after, queue_position)
+
+    def _queued_tokens(self, group=None):
+        return self.scheduler.pending_calls(group) * Config.ADMISSION_TOKENS_PER_CALL
+
+    def _check_server(self, upload_bytes):
+        """Raise AdmissionRejected if the process as a whole is at capacity (caller holds the lock)"""
+        min_free = Config.ADMISSION_MIN_FREE_DISK_MB * 1024 * 1024
+        if min_free:
+            folder = Config.UPLOAD_FOLDER if os.path.isdir(Config.UPLOAD_FOLDER) else '.'
+            if shutil.disk_usage(folder).free < min_free + (upload_bytes or 0):
+                # Space comes back with garbage collection, not as evaluations finish
+                self.rejected['disk'] += 1
+                raise AdmissionRejected(503, 'disk', Config.ADMISSION_MAX_RETRY_AFTER)
+
+        inflight = sum(self._inflight.values())
+        limit = Config.ADMISSION_MAX_INFLIGHT
+        if limit and inflight >= limit:
+            raise self._reject(503, 'inflight_evaluations', inflight - limit + 1, limit)
+
+        limit = Config.ADMISSION_MAX_QUEUED_TOKENS
+        if limit:
+            queued = self._queued_tokens()
+            if queued >= limit:
+                # Tokens per running evaluation tell how many of them have to finish
+                per_evaluation = queued / max(1, inflight)
+                raise self._reject(503, 'queued_llm_tokens', math.ceil((queued - limit) / per_evaluation) + 1,
+                                   max(1, inflight))
+
+    def _check_hackathon(self, hackathon):
+        """Raise AdmissionRejected if the hackathon is over its own limits (caller holds the lock)"""
+        inflight = self._inflight[hackathon.id]
+        limit = hackathon.max_inflight_evaluations
+        if limit and inflight >= limit:
+            raise self._reject(429, 'hackathon_inflight_evaluations', inflight - limit + 1, limit)
+
+        limit = hackathon.max_queued_tokens
+        if limit:
+            queued = self._queued_tokens(hackathon.id)
+            if queued >= limit:
+                per_evaluation = queued / max(1, inflight)
+                raise self._reject(429, 'hackathon_queued_llm_tokens', math.ceil((queued - limit) / per_evaluation) + 1,
+                                   max(1, inflight))
+
+    def check(self, upload_bytes=0):
+        """
+        Cheap server-wide check before the upload body is read
+
+        Raises:
+            AdmissionRejected: The process is at capacity
+        """
+        with self._lock:
+            self._check_server(upload_bytes)
+
+    @contextmanager
+    def admit(self, hackathon, upload_bytes=0):
+        """
+        Hold an evaluation slot for the block, or refuse it
+
+        Checking and counting happen under one lock, so concurrent requests
+        cannot both take the last slot.
+
+        Raises:
+            AdmissionRejected: A server-wide (503) or hackathon (429) limit is reached
+        """
+        with self._lock:
+            self._check_server(upload_bytes)
+            self._check_hackathon(hackathon)
+            self._inflight[hackathon.id] += 1
+            self.admitted += 1
+        with self.track(hackathon.id, admitted=True):
+            yield
+
+    @contextmanager
+    def track(self, hackathon_id, admitted=False):
+        """Count an evaluation that bypasses admission (background work) toward the limits"""
+        if not admitted:
+            with self._lock:
+                self._inflight[hackathon_id] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight[hackathon_id] -= 1
+                if not self._inflight[hackathon_id]:
+                    del self._inflight[hackathon_id]
+                self._durations.append(time.monotonic() - started)
+
+    def stats(self):
+        with self._lock:
+            inflight = dict(self._inflight)
+            rejected = dict(self.rejected)
+            evaluation_seconds = self._evaluation_seconds()
+        return {
+            'inflight_evaluations': sum(inflight.values()),
+            'inflight_by_hackathon': {str(key): count for key, count in inflight.items()},
+            'queued_llm_tokens': self._queued_tokens(),
+            'admitted': self.admitted,
+            'rejected': rejected,
+            'mean_evaluation_seconds': round(evaluation_seconds, 2),
+            'limits': {
+                'max_inflight': Config.ADMISSION_MAX_INFLIGHT,
+                'max_queued_tokens': Config.ADMISSION_MAX_QUEUED_TOKENS,
+                'min_free_disk_mb': Config.ADMISSION_MIN_FREE_DISK_MB
+            }
+        }
+
+
+admission = AdmissionController()
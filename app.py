@@ -1,45 +1,207 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Blueprint, request, jsonify, current_app, Response, stream_with_context, send_file
+from flask.cli import with_appcontext
 from flask_cors import CORS
-from models import db, Hackathon, Submission, Evaluation
-from utils import allowed_file, save_uploaded_file, extract_code_from_files, extract_documentation
+from sqlalchemy import text, func
+from sqlalchemy.exc import IntegrityError
+from models import db, Hackathon, Submission, Evaluation, UploadSession, BudgetReservation, ensure_schema
+from utils import (
+    allowed_file, store_uploaded_file, link_into_blob_store, combine_content_hashes,
+    extract_code_from_files, extract_documentation, submission_folder_path
+)
+from static_analysis import analyze_submission
+from chunking_utils import ChunkResultCache
+from git_ingest import RepositoryError, open_repository, tree_content_hash, extract_commit
+from http_cache import result_cache, init_compression
+from export import iter_export_rows, stream_csv, stream_ndjson
+from search_index import ensure_search_index, search_submissions
+from score_stats import hackathon_score_stats
+from maintenance import collect_garbage, start_maintenance, last_report, restore_archived_upload
+from scheduler import llm_scheduler
+from admission import admission, AdmissionRejected, BudgetExhausted
+import profiling
+from profiling import ProfilingMiddleware, submission_profile
+from estimator import default_call_seconds, submission_seconds, project_workload, collect_samples
+from werkzeug.utils import secure_filename
+from resumable_upload import (
+    UploadRangeError, new_upload_id, parse_content_range, upload_lock,
+    write_range, finalize_upload, discard_upload_state
+)
 from config import Config
+import hashlib
 import json
-from datetime import datetime
+import os
+import shutil
+import tempfile
+import click
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 
-app = Flask(__name__)
-app.config.from_object(Config)
-app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH  # Explicitly set the upload limit
-CORS(app)
+api = Blueprint('api', __name__)
 
-# Initialize database
-db.init_app(app)
-
-# Initialize AI evaluator (will load models on first use)
+# Initialize AI evaluator (will load models on first use, or on warm-up via /api/ready)
 evaluator = None
+_evaluator_lock = threading.Lock()
 
 def get_evaluator():
     global evaluator
     if evaluator is None:
-        print(f"Initializing AI evaluator (mode: {Config.EVALUATION_MODEL})...")
-        
-        if Config.EVALUATION_MODEL == 'openai':
-            from evaluator import AIEvaluator
-            evaluator = AIEvaluator()
-            print("✅ Using OpenAI GPT-4o for evaluation")
-        else:
-            from evaluator_opensource import OpenSourceEvaluator
-            evaluator = OpenSourceEvaluator()
-            print("✅ Using Open-Source LLM for evaluation")
+        # Double-checked locking: concurrent first requests must not build two clients
+        with _evaluator_lock:
+            if evaluator is None:
+                print(f"Initializing AI evaluator (mode: {Config.EVALUATION_MODEL})...")
+                
+                # Heavy imports (openai, model runtimes) are deferred to here to keep worker start fast
+                if Config.EVALUATION_MODEL == 'openai':
+                    from evaluator import AIEvaluator
+                    evaluator = AIEvaluator()
+                    print("✅ Using OpenAI GPT-4o for evaluation")
+                else:
+                    from evaluator_opensource import OpenSourceEvaluator
+                    evaluator = OpenSourceEvaluator()
+                    print("✅ Using Open-Source LLM for evaluation")
     
     return evaluator
 
-# Create tables
-with app.app_context():
-    db.create_all()
-    print("Database initialized with productivity_score column!")
+# Warm-up state for the readiness endpoint
+_warmup_lock = threading.Lock()
+_warmup_state = {'status': 'cold', 'error': None, 'seconds': None}
+
+def _warm_up():
+    """Build the evaluator (imports + client) so the first real request does not pay for it"""
+    started = time.monotonic()
+    try:
+        get_evaluator()
+        _warmup_state.update(status='ready', error=None)
+    except Exception as e:
+        print(f"❌ Warm-up failed: {str(e)}")
+        _warmup_state.update(status='failed', error=str(e))
+    _warmup_state['seconds'] = round(time.monotonic() - started, 3)
+
+def start_warm_up():
+    """Kick off warm-up once, in the background"""
+    with _warmup_lock:
+        if _warmup_state['status'] in ('cold', 'failed'):
+            _warmup_state['status'] = 'warming'
+            threading.Thread(target=_warm_up, name='evaluator-warmup', daemon=True).start()
+
+# In-flight evaluation tracking, so shutdown can drain work instead of cutting it off
+_inflight_lock = threading.Condition()
+_inflight_evaluations = 0
+
+@contextmanager
+def track_evaluation():
+    """Count an evaluation as in flight for the duration of the block"""
+    global _inflight_evaluations
+    with _inflight_lock:
+        _inflight_evaluations += 1
+    try:
+        yield
+    finally:
+        with _inflight_lock:
+            _inflight_evaluations -= 1
+            _inflight_lock.notify_all()
+
+def inflight_evaluations():
+    return _inflight_evaluations
+
+def drain_evaluations(timeout):
+    """
+    Block until in-flight evaluations finish or the timeout expires
+
+    Returns:
+        int: Evaluations still running when the wait ended
+    """
+    deadline = time.monotonic() + timeout
+    with _inflight_lock:
+        while _inflight_evaluations and time.monotonic() < deadline:
+            _inflight_lock.wait(timeout=max(0.0, deadline - time.monotonic()))
+        return _inflight_evaluations
+
+def create_app(config_object=Config):
+    """Application factory"""
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.config['MAX_CONTENT_LENGTH'] = config_object.MAX_CONTENT_LENGTH  # Explicitly set the upload limit
+    CORS(app)
+    init_compression(app)
+    
+    # Initialize database (schema changes run via `flask init-db`, never at import/startup)
+    db.init_app(app)
+    app.register_blueprint(api)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(gc_command)
+    app.cli.add_command(reindex_search_command)
+    app.cli.add_command(estimate_command)
+    start_maintenance(app)
+    
+    # Opt-in profiling: without an admin token nothing is wrapped
+    if config_object.PROFILING_ADMIN_TOKEN:
+        app.wsgi_app = ProfilingMiddleware(app.wsgi_app)
+    
+    return app
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create tables and apply additive column migrations"""
+    added = ensure_schema()
+    for name in added:
+        print(f"➕ Added {name}")
+    print(f"Database initialized ({len(added)} column(s)/index(es) added)")
+
+@click.command('reindex-search')
+@with_appcontext
+def reindex_search_command():
+    """Rebuild the full-text search index (after changing SEARCH_INDEX_CODE)"""
+    if not ensure_search_index(rebuild=True):
+        print("Full-text search index unavailable on this database; search uses LIKE scans")
+
+@click.command('estimate')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--hackathon', 'hackathon_id', type=int, default=None, help='Use this hackathon\'s prompt and budgets')
+@click.option('--concurrency', type=int, default=Config.LLM_MAX_CONCURRENT_CALLS, help='LLM call slots available')
+@click.option('--call-seconds', type=float, default=None, help='Latency per call (default ESTIMATE_CALL_SECONDS)')
+@with_appcontext
+def estimate_command(paths, hackathon_id, concurrency, call_seconds):
+    """Dry-run cost/latency estimate for upload archives or directories of samples"""
+    if hackathon_id is not None:
+        hackathon = db.session.get(Hackathon, hackathon_id)
+        if hackathon is None:
+            raise click.ClickException(f"Hackathon {hackathon_id} not found")
+    else:
+        hackathon = Hackathon(name='Capacity planning', description='', evaluation_prompt='Evaluate this hackathon project.', criteria='[]')
+    
+    call_seconds = call_seconds or default_call_seconds()
+    plans = [plan_files(files, hackathon, name) for path in paths for name, files in collect_samples(path)]
+    for plan in plans:
+        print(f"📦 {plan['name']}: {plan['chunks_total']} chunks, {plan['llm_calls']} calls "
+              f"(+{plan['field_retry_calls']} follow-ups), "
+              f"~{plan['input_tokens']:,} in / ~{plan['output_tokens']:,} out tokens, "
+              f"level {plan['degradation_level']}, ~{submission_seconds(plan, concurrency, call_seconds):.0f}s")
+    print(json.dumps(project_workload(plans, concurrency, call_seconds), indent=2))
+
+@click.command('gc')
+@click.option('--budget', type=float, default=None, help='Seconds before the pass stops (default MAINTENANCE_BUDGET_SECONDS)')
+@click.option('--dry-run', is_flag=True, help='Only report what would be removed')
+@click.option('--restore', 'restore_id', type=int, default=None,
+              help='Decompress this submission\'s compacted uploads back to its file_paths instead of collecting')
+@with_appcontext
+def gc_command(budget, dry_run, restore_id):
+    """Remove orphaned uploads and compact old ones"""
+    if restore_id is not None:
+        if restore_archived_upload(restore_id):
+            print(f"✅ Restored the uploads of submission {restore_id}")
+        else:
+            print(f"ℹ️ Submission {restore_id} has no compacted uploads")
+        return
+    report = collect_garbage(budget_seconds=budget, dry_run=dry_run)
+    print(json.dumps(report, indent=2))
 
 # Routes
-@app.route('/')
+@api.route('/')
 def index():
     """API server info - Frontend is served separately on port 5173"""
     return jsonify({
@@ -50,14 +212,42 @@ def index():
         'message': 'API is running. Access the UI at http://localhost:5173'
     })
 
+@api.route('/api/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness probe: 200 once the database answers and the evaluator is warm
+
+    The first probe starts the warm-up in the background (disable with
+    WARMUP_ON_READY=false to keep evaluator initialization lazy).
+    """
+    try:
+        db.session.execute(text('SELECT 1'))
+        database_ok = True
+    except Exception as e:
+        print(f"❌ Readiness DB check failed: {str(e)}")
+        database_ok = False
+    
+    if Config.WARMUP_ON_READY:
+        start_warm_up()
+        warm = _warmup_state['status'] == 'ready'
+    else:
+        warm = True
+    
+    ready = database_ok and warm
+    return jsonify({
+        'ready': ready,
+        'database': database_ok,
+        'warmup': dict(_warmup_state)
+    }), 200 if ready else 503
+
 # API Endpoints
-@app.route('/api/hackathons', methods=['GET'])
+@api.route('/api/hackathons', methods=['GET'])
 def get_hackathons():
     """Get all hackathons"""
     hackathons = Hackathon.query.order_by(Hackathon.created_at.desc()).all()
     return jsonify([h.to_dict() for h in hackathons])
 
-@app.route('/api/hackathon', methods=['POST'])
+@api.route('/api/hackathon', methods=['POST'])
 def create_hackathon():
     """Create a new hackathon"""
     try:
@@ -78,7 +268,13 @@ def create_hackathon():
             evaluation_prompt=data.get('evaluation_prompt', 'Evaluate this hackathon project.'),
             criteria=json.dumps(data.get('criteria', default_criteria)),
             host_email=data.get('host_email', ''),
-            deadline=datetime.fromisoformat(data['deadline']) if data.get('deadline') else None
+            deadline=datetime.fromisoformat(data['deadline']) if data.get('deadline') else None,
+            token_budget=data.get('token_budget'),
+            call_budget=data.get('call_budget'),
+            submission_token_budget=data.get('submission_token_budget'),
+            submission_call_budget=data.get('submission_call_budget'),
+            max_inflight_evaluations=data.get('max_inflight_evaluations'),
+            max_queued_tokens=data.get('max_queued_tokens')
         )
         
         db.session.add(hackathon)
@@ -91,10 +287,327 @@ def create_hackathon():
         return jsonify({'error': str(e)}), 400
 
 
-@app.route('/api/submissions', methods=['POST'])
+def extract_submission_content(submission, file_paths):
+    """Extract code, documentation and static metrics from saved upload files"""
+    submission.file_paths = json.dumps(file_paths)
+    submission.code_content = extract_code_from_files(file_paths)
+    submission.documentation_content = extract_documentation(file_paths, submission.project_description or '')
+    submission.static_metrics = json.dumps(analyze_submission(file_paths))
+
+def plan_files(file_paths, hackathon, name='sample'):
+    """
+    Extract files exactly like a real submission and plan its evaluation (no LLM calls)
+
+    Returns:
+        dict: AIEvaluator.plan_submission result plus extraction sizes
+    """
+    from evaluator import AIEvaluator
+    
+    # Transient row: never added to the session
+    submission = Submission(hackathon_id=hackathon.id, team_name='Dry run', participant_email='dry-run@autoeval.ai',
+                            project_name=name, project_description='')
+    extract_submission_content(submission, file_paths)
+    plan = AIEvaluator(offline=True).plan_submission(submission, hackathon, budget=hackathon.submission_budget())
+    plan.update(name=name, code_chars=len(submission.code_content or ''),
+                documentation_chars=len(submission.documentation_content or ''))
+    return plan
+
+def find_reusable_submission(submission):
+    """Earliest evaluated submission in the same hackathon with identical uploaded content"""
+    if not submission.content_hash:
+        return None
+    return Submission.query.filter(
+        Submission.hackathon_id == submission.hackathon_id,
+        Submission.content_hash == submission.content_hash,
+        Submission.evaluated.is_(True),
+        Submission.id != submission.id
+    ).order_by(Submission.id.asc()).first()
+
+def reuse_evaluation(submission, original):
+    """
+    Copy extracted content and the evaluation of an identical earlier upload
+
+    Skips extraction, static analysis and every LLM call. The caller commits.
+    """
+    source = original.evaluation
+    submission.code_content = original.code_content
+    submission.documentation_content = original.documentation_content
+    submission.static_metrics = original.static_metrics
+    submission.reused_from_id = original.id
+    
+    evaluation = Evaluation(
+        submission_id=submission.id,
+        relevance_score=source.relevance_score,
+        technical_complexity_score=source.technical_complexity_score,
+        creativity_score=source.creativity_score,
+        documentation_score=source.documentation_score,
+        productivity_score=source.productivity_score,
+        overall_score=source.overall_score,
+        feedback=source.feedback,
+        detailed_scores=source.detailed_scores,
+        chunks_total=source.chunks_total,
+        chunks_evaluated=source.chunks_evaluated,
+        tokens_used=0,  # Reuse spends no LLM calls
+        llm_calls=0,
+        degradation_level=source.degradation_level,
+        fallback_reason=source.fallback_reason,
+        llm_results=source.llm_results
+    )
+    submission.evaluated = True
+    submission.status = 'evaluated'
+    db.session.add(evaluation)
+    result_cache.invalidate(submission.id)
+    print(f"♻️ Identical upload already evaluated (submission {original.id}); reusing its content and evaluation")
+    return evaluation
+
+def find_previous_revision(submission):
+    """Latest evaluated submission of the same repository in the same hackathon"""
+    if not submission.repository_url:
+        return None
+    return Submission.query.filter(
+        Submission.hackathon_id == submission.hackathon_id,
+        Submission.repository_url == submission.repository_url,
+        Submission.evaluated.is_(True),
+        Submission.id != submission.id
+    ).order_by(Submission.id.desc()).first()
+
+def evaluate_and_store(submission, hackathon, chunk_results=None):
+    """
+    Run the AI evaluation and add the Evaluation row to the session (caller commits)
+
+    chunk_results (ChunkResultCache) answers the calls whose content an
+    earlier version already had evaluated; its results are stored with the
+    evaluation for the next version.
+
+    With hackathon totals, the planned spend is reserved before the first
+    call and the reservation is deleted with the evaluation stored. When the
+    budget cannot cover a single call, the submission is committed as
+    'budget_exhausted' and BudgetExhausted (a 429 AdmissionRejected) raised.
+
+    Returns:
+        dict: Scores returned by the evaluator
+    """
+    print(f"🎯 Starting AI evaluation for project: {submission.project_name}")
+    print(f"📁 Files uploaded: {len(json.loads(submission.file_paths or '[]'))}")
+    print(f"📝 Code content length: {len(submission.code_content or '')} characters")
+    print(f"📄 Documentation length: {len(submission.documentation_content or '')} characters")
+    
+    eval_engine = get_evaluator()
+    # Reservations use their own connection: the session must not keep SQLite's write lock meanwhile
+    db.session.commit()
+    budget = hackathon.submission_budget()
+    reservation_id = None
+    
+    def reserve(tokens, calls):
+        nonlocal reservation_id
+        if not (hackathon.token_budget or hackathon.call_budget):
+            return True  # Only hackathon totals are shared between evaluations
+        reservation_id = hackathon.reserve_budget(tokens, calls)
+        return reservation_id is not None
+    
+    try:
+        scores = eval_engine.evaluate_submission(submission, hackathon, budget=budget, result_cache=chunk_results,
+                                                 reserve=reserve)
+    except Exception as e:
+        db.session.rollback()
+        if reservation_id is not None:
+            db.session.execute(db.delete(BudgetReservation).where(BudgetReservation.id == reservation_id))
+        if isinstance(e, BudgetExhausted):
+            submission.status = 'budget_exhausted'
+        db.session.commit()
+        raise
+    
+    print("🎉 AI evaluation completed!")
+    print(f"⭐ Overall score: {scores['overall_score']}/10")
+    if scores.get('usage'):
+        usage = scores['usage']
+        print(f"💰 LLM usage: {usage['calls']} calls, {usage['total_tokens']:,} tokens "
+              f"({usage['cached_prompt_tokens']:,} cached prompt tokens)")
+    if scores.get('degradation_level'):
+        print(f"💸 Budget {budget} applied: degradation level {scores['degradation_level']}")
+    if scores.get('fallback'):
+        print(f"⚠️ Chunked evaluation fell back to one truncated call: {scores['fallback']}")
+    if scores.get('scheduling'):
+        print(f"⏳ Waited {scores['scheduling']['queue_wait_seconds']}s for LLM call slots "
+              f"(max {scores['scheduling']['max_queue_wait_seconds']}s per call)")
+    if scores.get('result_cache'):
+        print(f"♻️ Previous version's results: {scores['result_cache']['reused_calls']} calls reused, "
+              f"{scores['result_cache']['new_calls']} made")
+    
+    # Create evaluation
+    evaluation = Evaluation(
+        submission_id=submission.id,
+        relevance_score=scores['relevance_score'],
+        technical_complexity_score=scores['technical_complexity_score'],
+        creativity_score=scores['creativity_score'],
+        documentation_score=scores['documentation_score'],
+        productivity_score=scores['productivity_score'],
+        overall_score=scores['overall_score'],
+        feedback=scores['feedback'],
+        detailed_scores=scores['detailed_scores'],
+        chunks_total=scores.get('chunks_total'),
+        chunks_evaluated=scores.get('chunks_evaluated'),
+        tokens_used=(scores.get('usage') or {}).get('total_tokens', 0),
+        llm_calls=(scores.get('usage') or {}).get('calls', 0),
+        token_budget=budget['tokens'],
+        call_budget=budget['calls'],
+        degradation_level=scores.get('degradation_level', 0),
+        fallback_reason=scores.get('fallback'),
+        llm_results=json.dumps(chunk_results.to_dict()) if chunk_results is not None else None
+    )
+    
+    submission.evaluated = True
+    submission.status = 'evaluated'
+    db.session.add(evaluation)
+    if reservation_id is not None:
+        # Spent usage replaces the reservation in the same commit
+        db.session.execute(db.delete(BudgetReservation).where(BudgetReservation.id == reservation_id))
+    result_cache.invalidate(submission.id)
+    return scores
+
+# Background processing for uploads that were finalized through the resumable API
+_background_executor = None
+_background_lock = threading.Lock()
+
+def process_submission_async(submission_id, file_paths):
+    """Queue extraction + evaluation of a submission outside the request cycle"""
+    global _background_executor
+    with _background_lock:
+        if _background_executor is None:
+            _background_executor = ThreadPoolExecutor(
+                max_workers=Config.BACKGROUND_EVALUATION_WORKERS,
+                thread_name_prefix='submission-eval'
+            )
+    app = current_app._get_current_object()
+    _background_executor.submit(_process_submission, app, submission_id, file_paths)
+
+def _process_submission(app, submission_id, file_paths):
+    with app.app_context(), track_evaluation():
+        try:
+            submission = db.session.get(Submission, submission_id)
+            # Counted toward the admission limits, never refused: the upload was already accepted
+            with admission.track(submission.hackathon_id):
+                submission.file_paths = json.dumps(file_paths)
+                original = find_reusable_submission(submission)
+                if original is not None:
+                    reuse_evaluation(submission, original)
+                else:
+                    with submission_profile(submission_id):
+                        extract_submission_content(submission, file_paths)
+                        evaluate_and_store(submission, submission.hackathon)
+                db.session.commit()
+        except BudgetExhausted as e:
+            print(f"💸 Background evaluation of submission {submission_id} refused: budget {e.budget} exhausted")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Background evaluation of submission {submission_id} failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            submission = db.session.get(Submission, submission_id)
+            if submission is not None:
+                submission.status = 'failed'
+                db.session.commit()
+
+def _admission_response(rejection):
+    """429/503 for a refused submission, with Retry-After and the queue-position hint"""
+    print(f"🚦 Submission refused ({rejection.reason}), retry after {rejection.retry_after}s")
+    response = jsonify(rejection.to_dict())
+    response.status_code = rejection.status
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+def derive_idempotency_key(hackathon_id, team_name, content_hash):
+    """Idempotency key of a request without the header: same hackathon, team and uploaded content"""
+    material = f"{hackathon_id}\0{team_name}\0{content_hash}".encode('utf-8')
+    return 'upload:' + hashlib.sha256(material).hexdigest()
+
+def find_idempotent_submission(key):
+    """
+    Submission created earlier with this idempotency key
+
+    A failed one, or one refused for lack of LLM budget, gives its key up (in
+    the caller's transaction), so the retry is processed as a new submission.
+    So does one still 'processing' after EVALUATION_ABANDON_SECONDS: the
+    worker evaluating it died, and it is marked failed.
+    """
+    submission = Submission.query.filter_by(idempotency_key=key).first()
+    if submission is None:
+        return None
+    abandoned_before = datetime.utcnow() - timedelta(seconds=Config.EVALUATION_ABANDON_SECONDS)
+    if submission.status == 'processing' and submission.submitted_at is not None \
+            and submission.submitted_at < abandoned_before:
+        print(f"⚠️ Submission {submission.id} has been processing since {submission.submitted_at}; treating it as abandoned")
+        submission.status = 'failed'
+    if submission.status in ('failed', 'budget_exhausted'):
+        submission.idempotency_key = None
+        db.session.flush()
+        return None
+    return submission
+
+def claim_idempotency_key(submission, idempotency_key=None):
+    """
+    Give a submission its idempotency key and commit it as 'processing'
+
+    Retries arriving during the evaluation then find the committed row; of
+    two concurrent requests the unique index lets one through. Without an
+    Idempotency-Key header the key is derived from hackathon, team and
+    content hash.
+
+    Returns:
+        Submission: The earlier submission holding the key (the session is
+                    rolled back), or None once the key is claimed
+    """
+    key = idempotency_key or derive_idempotency_key(submission.hackathon_id, submission.team_name,
+                                                    submission.content_hash)
+    duplicate = None if idempotency_key else find_idempotent_submission(key)
+    if duplicate is None:
+        submission.idempotency_key = key
+        try:
+            db.session.commit()
+            return None
+        except IntegrityError:
+            db.session.rollback()
+            duplicate = Submission.query.filter_by(idempotency_key=key).first()
+    db.session.rollback()
+    return duplicate
+
+def _idempotent_response(submission):
+    """Replay of an earlier request: its result (200), or 202 while it is still being evaluated"""
+    print(f"🔁 Repeated request for submission {submission.id} ({submission.status}); not processing it again")
+    body = {
+        'success': True,
+        'id': submission.id,
+        'hackathon_id': submission.hackathon_id,
+        'status': submission.status,
+        'overall_score': submission.evaluation.overall_score if submission.evaluation else None,
+        'reused_from_id': submission.reused_from_id
+    }
+    response = jsonify(body)
+    response.headers['Idempotent-Replayed'] = 'true'
+    if submission.evaluated:
+        response.status_code = 200
+    else:
+        response.status_code = 202
+        response.headers['Retry-After'] = str(Config.ADMISSION_DEFAULT_EVALUATION_SECONDS)
+    return response
+
+@api.route('/api/submissions', methods=['POST'])
 def create_submission():
     """Create a single submission and evaluate it"""
+    claimed_id = None
     try:
+        # A retried request is answered from the first one, before its upload is read
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip() or None
+        if idempotency_key:
+            if len(idempotency_key) > 255:
+                return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+            original = find_idempotent_submission(idempotency_key)
+            if original is not None:
+                return _idempotent_response(original)
+        
+        # Refuse early, before the upload body is parsed, when the server is at capacity
+        admission.check(request.content_length or 0)
+        
         # Get form data
         hackathon_id = request.form.get('hackathon_id')
         team_name = request.form.get('team_name', 'Team')
@@ -110,72 +623,69 @@ def create_submission():
         if not hackathon:
             return jsonify({'error': 'Hackathon not found'}), 404
         
-        # Get uploaded files
-        files = request.files.getlist('project_files')
-        if not files:
-            return jsonify({'error': 'At least one file is required'}), 400
-        
-        # Create submission
-        submission = Submission(
-            hackathon_id=hackathon.id,
-            team_name=team_name,
-            participant_email=participant_email,
-            project_name=project_name,
-            project_description=project_description
-        )
-        db.session.add(submission)
-        db.session.flush()
-        
-        # Save files
-        file_paths = []
-        for file in files:
-            if file and allowed_file(file.filename):
-                file_path = save_uploaded_file(file, submission.id)
-                file_paths.append(file_path)
-        
-        if not file_paths:
-            db.session.rollback()
-            return jsonify({'error': 'No valid files uploaded'}), 400
-        
-        # Extract content
-        submission.file_paths = json.dumps(file_paths)
-        submission.code_content = extract_code_from_files(file_paths)
-        submission.documentation_content = extract_documentation(file_paths, project_description)
-        
-        # Evaluate
-        print(f"🎯 Starting AI evaluation for project: {project_name}")
-        print(f"📁 Files uploaded: {len(file_paths)}")
-        print(f"📝 Code content length: {len(submission.code_content)} characters")
-        print(f"📄 Documentation length: {len(submission.documentation_content)} characters")
-        
-        eval_engine = get_evaluator()
-        scores = eval_engine.evaluate_submission(submission, hackathon)
-        
-        print("🎉 AI evaluation completed!")
-        print(f"⭐ Overall score: {scores['overall_score']}/10")
-        
-        # Create evaluation
-        evaluation = Evaluation(
-            submission_id=submission.id,
-            relevance_score=scores['relevance_score'],
-            technical_complexity_score=scores['technical_complexity_score'],
-            creativity_score=scores['creativity_score'],
-            documentation_score=scores['documentation_score'],
-            productivity_score=scores['productivity_score'],
-            overall_score=scores['overall_score'],
-            feedback=scores['feedback'],
-            detailed_scores=scores['detailed_scores']
-        )
-        
-        submission.evaluated = True
-        db.session.add(evaluation)
-        db.session.commit()
+        # Hold an evaluation slot from saving the upload until the result is stored
+        with admission.admit(hackathon, request.content_length or 0):
+            # Get uploaded files
+            files = request.files.getlist('project_files')
+            if not files:
+                return jsonify({'error': 'At least one file is required'}), 400
+            
+            # Create submission
+            submission = Submission(
+                hackathon_id=hackathon.id,
+                team_name=team_name,
+                participant_email=participant_email,
+                project_name=project_name,
+                project_description=project_description,
+                status='processing'
+            )
+            db.session.add(submission)
+            db.session.flush()
+            submission_id = submission.id
+            
+            # Save files (hashed while streaming to disk)
+            file_paths = []
+            digests = []
+            for file in files:
+                if file and allowed_file(file.filename):
+                    file_path, digest = store_uploaded_file(file, submission.id)
+                    file_paths.append(file_path)
+                    digests.append(digest)
+            
+            if not file_paths:
+                db.session.rollback()
+                return jsonify({'error': 'No valid files uploaded'}), 400
+            
+            submission.content_hash = combine_content_hashes(digests)
+            submission.file_paths = json.dumps(file_paths)
+            
+            duplicate = claim_idempotency_key(submission, idempotency_key)
+            if duplicate is not None:
+                shutil.rmtree(submission_folder_path(submission_id), ignore_errors=True)
+                return _idempotent_response(duplicate)
+            claimed_id = submission.id
+            
+            original = find_reusable_submission(submission)
+            
+            with track_evaluation():
+                if original is not None:
+                    # Identical archive already processed for this hackathon: skip extraction and LLM calls
+                    overall_score = reuse_evaluation(submission, original).overall_score
+                else:
+                    with submission_profile(submission.id):
+                        # Extract content
+                        extract_submission_content(submission, file_paths)
+                        
+                        # Evaluate
+                        overall_score = evaluate_and_store(submission, hackathon)['overall_score']
+                db.session.commit()
         
         response_data = {
             'success': True,
             'id': submission.id,
             'hackathon_id': hackathon.id,
-            'overall_score': scores['overall_score']
+            'overall_score': overall_score,
+            'reused_from_id': submission.reused_from_id
         }
         
         print("📤 Sending response to frontend:")
@@ -187,14 +697,320 @@ def create_submission():
         
         return jsonify(response_data), 201
         
+    except AdmissionRejected as e:
+        db.session.rollback()
+        return _admission_response(e)
     except Exception as e:
         db.session.rollback()
         print(f"Error creating submission: {str(e)}")
         import traceback
         traceback.print_exc()
+        if claimed_id is not None:
+            # The row was committed to claim its idempotency key: mark it so a retry can take over
+            submission = db.session.get(Submission, claimed_id)
+            submission.status = 'failed'
+            db.session.commit()
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/hackathon/<int:hackathon_id>/submit/github', methods=['POST'])
+def submit_repository(hackathon_id):
+    """
+    Create a submission from a git repository and evaluate it
+
+    JSON body: team_name, project_name, github_url (https URL on an allowed
+    host, or a local repository or bundle path under GIT_LOCAL_ROOTS) and
+    optionally ref, project_description and participant_email. Files are
+    read from the commit's objects with the same filters as ZIP uploads.
+    Resubmitting the same repository reads only the blobs that changed and
+    reuses the LLM results of chunks whose content is unchanged.
+    """
+    claimed_id = None
+    try:
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip() or None
+        if idempotency_key:
+            if len(idempotency_key) > 255:
+                return jsonify({'error': 'Idempotency-Key must be at most 255 characters'}), 400
+            original = find_idempotent_submission(idempotency_key)
+            if original is not None:
+                return _idempotent_response(original)
+        
+        admission.check(0)
+        
+        data = request.get_json(silent=True) or {}
+        repository_url = (data.get('github_url') or '').strip()
+        project_name = data.get('project_name')
+        team_name = data.get('team_name', 'Team')
+        if not repository_url or not project_name:
+            return jsonify({'error': 'Repository URL and project name are required'}), 400
+        
+        hackathon = db.session.get(Hackathon, hackathon_id)
+        if not hackathon:
+            return jsonify({'error': 'Hackathon not found'}), 404
+        
+        try:
+            repository, commit = open_repository(repository_url, data.get('ref'))
+            entries = repository.list_files(commit)
+        except RepositoryError as e:
+            return jsonify({'error': str(e)}), 400
+        if not entries:
+            return jsonify({'error': 'The repository has no files that can be evaluated'}), 400
+        
+        with admission.admit(hackathon, 0):
+            submission = Submission(
+                hackathon_id=hackathon.id,
+                team_name=team_name,
+                participant_email=data.get('participant_email', 'participant@autoeval.ai'),
+                project_name=project_name,
+                project_description=data.get('project_description', ''),
+                repository_url=repository_url,
+                commit_sha=commit,
+                content_hash=tree_content_hash(entries),
+                status='processing'
+            )
+            db.session.add(submission)
+            db.session.flush()
+            
+            duplicate = claim_idempotency_key(submission, idempotency_key)
+            if duplicate is not None:
+                return _idempotent_response(duplicate)
+            claimed_id = submission.id
+            
+            original = find_reusable_submission(submission)
+            extraction = {}
+            with track_evaluation():
+                if original is not None:
+                    # Same files as an evaluated submission (any commit, any team): nothing to read or call
+                    overall_score = reuse_evaluation(submission, original).overall_score
+                    submission.source_tree = original.source_tree
+                else:
+                    previous = find_previous_revision(submission)
+                    stored = previous.evaluation.llm_results if previous is not None and previous.evaluation else None
+                    chunk_results = ChunkResultCache(json.loads(stored) if stored else None)
+                    with submission_profile(submission.id):
+                        extraction = extract_commit(repository, entries, submission.project_description or '', previous)
+                        submission.code_content = extraction['code_content']
+                        submission.documentation_content = extraction['documentation_content']
+                        submission.static_metrics = json.dumps(extraction['static_metrics'])
+                        submission.source_tree = json.dumps(extraction['source_tree'])
+                        if previous is not None:
+                            print(f"🌿 Previous version: submission {previous.id} (commit {previous.commit_sha[:12]})")
+                        overall_score = evaluate_and_store(submission, hackathon, chunk_results)['overall_score']
+                db.session.commit()
+        
+        response_data = {
+            'success': True,
+            'id': submission.id,
+            'hackathon_id': hackathon.id,
+            'overall_score': overall_score,
+            'commit_sha': commit,
+            'reused_from_id': submission.reused_from_id,
+            'files_read': extraction.get('files_read', 0),
+            'files_reused': extraction.get('files_reused', 0)
+        }
+        if original is None:
+            response_data.update(chunk_results.summary())
+        print(f"📤 Repository submission {submission.id} at {commit[:12]}: overall score {overall_score}")
+        return jsonify(response_data), 201
+        
+    except AdmissionRejected as e:
+        db.session.rollback()
+        return _admission_response(e)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error creating repository submission: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        if claimed_id is not None:
+            submission = db.session.get(Submission, claimed_id)
+            submission.status = 'failed'
+            db.session.commit()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/hackathon/<int:hackathon_id>/submissions', methods=['GET'])
+@api.route('/api/uploads', methods=['POST'])
+def init_upload():
+    """
+    Start a resumable upload
+
+    Accepts the same fields as /api/submissions plus `filename`, `size` and an
+    optional `sha256`; creates the submission up front so parts can be written
+    straight into its folder.
+    """
+    try:
+        data = request.get_json(silent=True) or request.form
+        hackathon_id = data.get('hackathon_id')
+        project_name = data.get('project_name')
+        filename = data.get('filename', '')
+        size = int(data.get('size') or 0)
+        
+        if not hackathon_id or not project_name:
+            return jsonify({'error': 'Hackathon ID and project name are required'}), 400
+        if not allowed_file(filename):
+            return jsonify({'error': 'File type not allowed'}), 400
+        if size <= 0 or size > Config.MAX_CONTENT_LENGTH:
+            return jsonify({'error': f'size must be between 1 and {Config.MAX_CONTENT_LENGTH} bytes'}), 400
+        
+        hackathon = db.session.get(Hackathon, int(hackathon_id))
+        if not hackathon:
+            return jsonify({'error': 'Hackathon not found'}), 404
+        
+        submission = Submission(
+            hackathon_id=hackathon.id,
+            team_name=data.get('team_name', 'Team'),
+            participant_email=data.get('participant_email', 'participant@autoeval.ai'),
+            project_name=project_name,
+            project_description=data.get('project_description', ''),
+            status='uploading'
+        )
+        db.session.add(submission)
+        db.session.flush()
+        
+        session = UploadSession(
+            id=new_upload_id(),
+            submission_id=submission.id,
+            filename=filename,
+            total_size=size,
+            received_size=0,
+            expected_sha256=data.get('sha256')
+        )
+        db.session.add(session)
+        db.session.commit()
+        
+        print(f"📦 Resumable upload {session.id} started for submission {submission.id} ({size:,} bytes)")
+        return jsonify({**session.to_dict(), 'chunk_size': Config.UPLOAD_CHUNK_SIZE}), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error starting upload: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+
+@api.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    """Upload status; `received_size` is the offset to resume from"""
+    session = db.session.get(UploadSession, upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+    return jsonify(session.to_dict())
+
+@api.route('/api/uploads/<upload_id>', methods=['PUT'])
+def put_upload_part(upload_id):
+    """
+    Write one byte range (`Content-Range: bytes start-end/total`, raw body)
+
+    Parts must start at the acknowledged offset; otherwise 409 with the
+    offset to resume from.
+    """
+    # Locks are only taken for uploads that exist; the state is checked again once held
+    session = db.session.get(UploadSession, upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+    with upload_lock(upload_id):
+        db.session.refresh(session)
+        if session.status != 'uploading':
+            return jsonify({'error': f'Upload is {session.status}'}), 409
+        
+        try:
+            start, end, total = parse_content_range(request.headers.get('Content-Range'))
+            if total is not None and total != session.total_size:
+                raise UploadRangeError(f"Declared size {total} does not match {session.total_size}")
+            received = write_range(session, request.stream, start, end - start + 1)
+        except UploadRangeError as e:
+            return jsonify({'error': str(e), 'received_size': session.received_size}), 409
+        
+        # Acknowledge only from the offset the part started at: another worker may have moved it meanwhile
+        acknowledged = UploadSession.query.filter_by(id=upload_id, received_size=start, status='uploading') \
+            .update({'received_size': received}, synchronize_session=False)
+        db.session.commit()
+        db.session.refresh(session)
+        if not acknowledged:
+            discard_upload_state(upload_id)  # The hash state covers this process's bytes, not the acknowledged ones
+            return jsonify({'error': 'Another request for this upload was acknowledged first',
+                            'received_size': session.received_size}), 409
+    
+    response = jsonify(session.to_dict())
+    if received:
+        response.headers['Range'] = f'bytes=0-{received - 1}'
+    return response
+
+@api.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload_route(upload_id):
+    """Verify size and hash, then extract and evaluate in the background"""
+    # Locks are only taken for uploads that exist; the state is checked again once held
+    session = db.session.get(UploadSession, upload_id)
+    if not session:
+        return jsonify({'error': 'Upload not found'}), 404
+    with upload_lock(upload_id):
+        db.session.refresh(session)
+        if session.status != 'uploading':
+            return jsonify({'error': f'Upload is {session.status}'}), 409
+        
+        try:
+            file_path, digest = finalize_upload(session)
+        except UploadRangeError as e:
+            return jsonify({'error': str(e), 'received_size': session.received_size}), 409
+        
+        link_into_blob_store(file_path, digest)
+        session.sha256 = digest
+        session.status = 'finalized'
+        session.submission.status = 'processing'
+        session.submission.content_hash = digest
+        db.session.commit()
+    
+    process_submission_async(session.submission_id, [file_path])
+    print(f"✅ Upload {upload_id} finalized ({digest}); evaluation queued")
+    
+    return jsonify({
+        'success': True,
+        'id': session.submission_id,
+        'hackathon_id': session.submission.hackathon_id,
+        'sha256': digest,
+        'status': 'processing'
+    }), 202
+
+@api.route('/api/hackathon/<int:hackathon_id>/estimate', methods=['POST'])
+def estimate_submission_cost(hackathon_id):
+    """
+    Dry run: extract, chunk and build prompts for an upload without calling the LLM
+
+    Multipart `project_files` like POST /api/submissions; optional
+    `concurrency` and `call_seconds` shape the wall-clock projection.
+    Nothing is stored. Refused like a submission when the server is at
+    capacity, since extraction and static analysis are just as heavy.
+    """
+    try:
+        admission.check(request.content_length or 0)
+    except AdmissionRejected as e:
+        return _admission_response(e)
+    
+    hackathon = db.session.get(Hackathon, hackathon_id)
+    if not hackathon:
+        return jsonify({'error': 'Hackathon not found'}), 404
+    files = [file for file in request.files.getlist('project_files') if file and allowed_file(file.filename)]
+    if not files:
+        return jsonify({'error': 'At least one file is required'}), 400
+    
+    try:
+        concurrency = int(request.values.get('concurrency', Config.LLM_MAX_CONCURRENT_CALLS))
+        call_seconds = float(request.values.get('call_seconds') or default_call_seconds(evaluator))
+    except ValueError:
+        return jsonify({'error': 'concurrency and call_seconds must be numbers'}), 400
+    
+    workdir = tempfile.mkdtemp(prefix='evalai-estimate-')
+    try:
+        file_paths = []
+        for index, file in enumerate(files):
+            # Index prefix: two uploads with the same name must not overwrite each other
+            path = os.path.join(workdir, f"{index}_{secure_filename(file.filename)}")
+            file.save(path)
+            file_paths.append(path)
+        plan = plan_files(file_paths, hackathon, request.values.get('project_name', 'sample'))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    plan['projected_seconds'] = round(submission_seconds(plan, concurrency, call_seconds), 1)
+    plan['workload'] = project_workload([plan], concurrency, call_seconds)
+    return jsonify(plan)
+
+@api.route('/api/hackathon/<int:hackathon_id>/submissions', methods=['GET'])
 def get_hackathon_submissions(hackathon_id):
     """Get all submissions for a hackathon"""
     try:
@@ -214,7 +1030,91 @@ def get_hackathon_submissions(hackathon_id):
         print(f"Error getting hackathon submissions: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/debug/submissions', methods=['GET'])
+@api.route('/api/hackathon/<int:hackathon_id>/stats', methods=['GET'])
+def get_hackathon_stats(hackathon_id):
+    """Score distribution per criterion (count, mean, stddev, 10-bin histogram), read from running aggregates"""
+    if db.session.get(Hackathon, hackathon_id) is None:
+        return jsonify({'error': 'Hackathon not found'}), 404
+    return jsonify(hackathon_score_stats(hackathon_id))
+
+@api.route('/api/hackathon/<int:hackathon_id>/search', methods=['GET'])
+def search_hackathon_submissions(hackathon_id):
+    """
+    Ranked full-text search of a hackathon's submissions
+
+    Query params: q (words must all match, "quoted phrase", prefix*),
+    page, per_page. Matches project name, description, documentation,
+    feedback (and code with SEARCH_INDEX_CODE); code blobs are never loaded.
+    """
+    if db.session.get(Hackathon, hackathon_id) is None:
+        return jsonify({'error': 'Hackathon not found'}), 404
+    query = request.args.get('q', '')
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(max(1, request.args.get('per_page', Config.SEARCH_PAGE_SIZE, type=int)), Config.SEARCH_MAX_PAGE_SIZE)
+    
+    found = search_submissions(hackathon_id, query, page, per_page)
+    if found is None:
+        return jsonify({'error': 'Query must contain at least one word'}), 400
+    
+    ids = [hit['submission_id'] for hit in found['hits']]
+    rows = {row.id: row for row in db.session.query(
+        Submission.id, Submission.team_name, Submission.project_name, Submission.status,
+        Submission.submitted_at, Evaluation.overall_score
+    ).outerjoin(Evaluation, Evaluation.submission_id == Submission.id).filter(Submission.id.in_(ids))} if ids else {}
+    
+    results = []
+    for hit in found['hits']:
+        row = rows.get(hit['submission_id'])
+        if row is None:
+            continue
+        results.append({
+            'id': row.id,
+            'team_name': row.team_name,
+            'project_name': row.project_name,
+            'status': row.status,
+            'submitted_at': row.submitted_at.isoformat() if row.submitted_at else None,
+            'overall_score': row.overall_score,
+            'rank': hit['rank'],
+            'snippet': hit['snippet']
+        })
+    
+    return jsonify({
+        'query': query,
+        'page': page,
+        'per_page': per_page,
+        'total': found['total'],
+        'ranked': found['ranked'],
+        'results': results
+    })
+
+@api.route('/api/hackathon/<int:hackathon_id>/export', methods=['GET'])
+def export_hackathon_results(hackathon_id):
+    """
+    Stream all results for a hackathon as CSV (default) or NDJSON
+
+    Query params: format=csv|ndjson, justifications=true to include the
+    per-criterion justifications from detailed_scores.
+    """
+    hackathon = db.session.get(Hackathon, hackathon_id)
+    if not hackathon:
+        return jsonify({'error': 'Hackathon not found'}), 404
+    
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    include_justifications = request.args.get('justifications', 'false').lower() in ('1', 'true', 'yes')
+    
+    rows = iter_export_rows(hackathon_id, include_justifications)
+    if export_format == 'csv':
+        body, mimetype = stream_csv(rows, include_justifications), 'text/csv'
+    else:
+        body, mimetype = stream_ndjson(rows), 'application/x-ndjson'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="hackathon_{hackathon_id}_results.{export_format}"'
+    return response
+
+@api.route('/api/debug/submissions', methods=['GET'])
 def debug_submissions():
     """Debug endpoint to list all submissions"""
     try:
@@ -233,30 +1133,130 @@ def debug_submissions():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/results/<int:submission_id>', methods=['GET'])
+@api.route('/api/debug/llm-stats', methods=['GET'])
+def debug_llm_stats():
+    """Debug endpoint with LLM call latency histograms, hedging and streaming counters, response repairs"""
+    if evaluator is None or not hasattr(evaluator, 'completions'):
+        return jsonify({'error': 'Evaluator not initialized yet'}), 404
+    return jsonify({
+        **evaluator.completions.stats(),
+        'streaming': evaluator.streaming.stats() if evaluator.streaming else None,
+        'responses': dict(evaluator.response_stats)
+    })
+
+@api.route('/api/debug/scheduler', methods=['GET'])
+def debug_scheduler():
+    """Fair-share LLM scheduler: active jobs and per-submission queue waits"""
+    return jsonify(llm_scheduler.stats())
+
+@api.route('/api/debug/admission', methods=['GET'])
+def debug_admission():
+    """Admission control: evaluations in flight, queued LLM tokens, refusals by reason"""
+    return jsonify(admission.stats())
+
+@api.route('/api/debug/maintenance', methods=['GET'])
+def debug_maintenance():
+    """Report of the last disk garbage-collection pass in this process"""
+    return jsonify({'interval_seconds': Config.MAINTENANCE_INTERVAL, 'last_pass': last_report()})
+
+def _profiling_admin_error():
+    """Error response unless profiling is enabled and the admin token matches"""
+    if not profiling.enabled():
+        return jsonify({'error': 'Not found'}), 404
+    if not profiling.is_admin(request.headers.get('X-Admin-Token')):
+        return jsonify({'error': 'Admin token required'}), 403
+    return None
+
+@api.route('/api/debug/profiles', methods=['GET', 'POST', 'DELETE'])
+def debug_profiles():
+    """
+    Profiling admin: list stored profiles (GET), arm (POST) or disarm (DELETE) this worker
+
+    POST body: {"requests": N, "submission_id": id, "mode": "cprofile" | "sampling"}
+    """
+    error = _profiling_admin_error()
+    if error:
+        return error
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        # Submissions are armed by integer id; a string id would never match a run
+        submission_id = data.get('submission_id')
+        if submission_id not in (None, ''):
+            try:
+                submission_id = int(str(submission_id))  # Via str: 1.5 and true are refused, not truncated
+            except ValueError:
+                return jsonify({'error': 'submission_id must be an integer'}), 400
+        else:
+            submission_id = None
+        try:
+            state = profiling.arm(requests=int(data.get('requests') or 0),
+                                  submission_id=submission_id,
+                                  mode=data.get('mode', 'cprofile'))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(state), 201
+    if request.method == 'DELETE':
+        return jsonify(profiling.disarm())
+    return jsonify({'armed': profiling.armed(), 'profiles': profiling.list_profiles()})
+
+@api.route('/api/debug/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    """Download a stored profile (.pstats for cProfile, .collapsed for sampling)"""
+    error = _profiling_admin_error()
+    if error:
+        return error
+    path = profiling.profile_file(name)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(os.path.abspath(path), as_attachment=True, download_name=name)
+
+@api.route('/api/results/<int:submission_id>', methods=['GET'])
 def get_individual_result(submission_id):
-    """Get evaluation results for a specific submission"""
+    """
+    Get evaluation results for a specific submission
+
+    Completed evaluations are immutable, so responses carry ETag/Last-Modified
+    (304 on revalidation) and the serialized body is cached in-process.
+    """
     try:
-        print(f"🔍 Looking for submission ID: {submission_id}")
-        submission = Submission.query.get(submission_id)
+        # Cheap validator lookup: no code blobs, no JSON parsing
+        marker = db.session.query(Evaluation.id, Evaluation.evaluated_at, Submission.hackathon_id).join(
+            Submission, Submission.id == Evaluation.submission_id
+        ).filter(Evaluation.submission_id == submission_id).first()
         
-        if not submission:
-            print(f"❌ Submission {submission_id} not found")
-            return jsonify({'error': f'Submission {submission_id} not found'}), 404
+        if marker is None:
+            return _build_individual_result(submission_id)
         
-        print(f"✅ Found submission: {submission.project_name}")
+        # The embedded hackathon carries submission_count, so new submissions change the version too
+        submission_count, latest_submission = db.session.query(
+            func.count(Submission.id), func.max(Submission.submitted_at)
+        ).filter(Submission.hackathon_id == marker.hackathon_id).one()
         
-        if not submission.evaluation:
-            print(f"⚠️ Submission {submission_id} not yet evaluated")
-            return jsonify({'error': 'Submission not yet evaluated'}), 404
+        last_modified = max(marker.evaluated_at, latest_submission or marker.evaluated_at).replace(tzinfo=timezone.utc)
+        version = f"{marker.id}-{marker.evaluated_at.timestamp()}-{submission_count}-{last_modified.timestamp()}"
+        etag = f"result-{submission_id}-{version}"
         
-        print(f"✅ Evaluation found for submission {submission_id}")
+        if request.if_none_match:
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            not_modified = request.if_modified_since is not None and request.if_modified_since >= last_modified.replace(microsecond=0)
         
-        result = submission.to_dict()
-        result['evaluation'] = submission.evaluation.to_dict()
-        result['hackathon'] = submission.hackathon.to_dict()
+        if not_modified:
+            response = current_app.response_class(status=304)
+        else:
+            body = result_cache.get(submission_id, version)
+            if body is None:
+                body, status = _build_individual_result(submission_id, serialize=True)
+                if status != 200:
+                    return current_app.response_class(body, status=status, mimetype='application/json')
+                result_cache.put(submission_id, version, body)
+            response = current_app.response_class(body, mimetype='application/json')
         
-        return jsonify(result)
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.no_cache = True  # Always revalidate; revalidation is a cheap 304
+        return response
         
     except Exception as e:
         print(f"❌ Error getting individual result: {str(e)}")
@@ -264,7 +1264,33 @@ def get_individual_result(submission_id):
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
+def _build_individual_result(submission_id, serialize=False):
+    """Full result payload (the uncached path)"""
+    print(f"🔍 Looking for submission ID: {submission_id}")
+    submission = db.session.get(Submission, submission_id)
+    
+    if not submission:
+        print(f"❌ Submission {submission_id} not found")
+        payload, status = {'error': f'Submission {submission_id} not found'}, 404
+    elif not submission.evaluation:
+        print(f"⚠️ Submission {submission_id} not yet evaluated")
+        payload, status = {'error': 'Submission not yet evaluated', 'status': submission.to_dict()['status']}, 404
+    else:
+        print(f"✅ Evaluation found for submission {submission_id}")
+        payload = submission.to_dict()
+        payload['evaluation'] = submission.evaluation.to_dict()
+        payload['hackathon'] = submission.hackathon.to_dict()
+        status = 200
+    
+    if serialize:
+        return current_app.json.dumps(payload), status
+    return jsonify(payload), status
+
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs gunicorn with gunicorn.conf.py (see wsgi.py)
+    dev_app = create_app()
+    with dev_app.app_context():
+        ensure_schema()
+    dev_app.run(debug=True, host='0.0.0.0', port=5000)
 
 
@@ -0,0 +1,105 @@
+"""
+Report how many LLM calls the chunk planner saves on a corpus of submissions
+
+Each sample is extracted exactly like an upload (directories are zipped
+first, so the ZIP path with its filtering and relative paths is used), then
+chunked with the previous splitter (a new chunk at every `===`/`---` line or
+`File:` mention) and with the bin-packing planner:
+
+    python bench_chunk_packing.py SAMPLES... [--chunk-size 4000]
+
+A sample is an archive, or a directory of archives / project directories
+(see estimator.collect_samples). Chunk calls exclude the one documentation
+call every chunked submission makes.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from chunking_utils import chunk_code_content, chunk_text, split_file_sections
+from estimator import collect_samples
+from utils import extract_code_from_files
+
+
+def legacy_chunk_count(code_content, max_chunk_size):
+    """Chunk count of the splitter that preceded the planner"""
+    if len(code_content) <= max_chunk_size:
+        return 1
+    sections, current = [], ""
+    for line in code_content.split('\n'):
+        if line.startswith('===') or line.startswith('---') or 'File:' in line:
+            if current.strip():
+                sections.append(current.strip())
+            current = line + '\n'
+        else:
+            current += line + '\n'
+    if current.strip():
+        sections.append(current.strip())
+    if len(sections) <= 1:
+        sections = [code_content]
+    return sum(1 if len(section) <= max_chunk_size else len(chunk_text(section, max_chunk_size, overlap=300))
+               for section in sections)
+
+
+def zip_directory(directory, workdir):
+    """ZIP of a project directory, members in sorted order so extraction (and every prompt) is the same on any filesystem"""
+    archive = os.path.join(workdir, os.path.basename(os.path.normpath(directory)) + '.zip')
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                zf.write(path, os.path.relpath(path, directory))
+    return archive
+
+
+def extract_sample(files, workdir):
+    """Code content as create_submission would extract it (quietly)"""
+    copies = []
+    for path in files:
+        copy = os.path.join(workdir, f'{len(copies)}_{os.path.basename(path)}')
+        shutil.copyfile(path, copy)
+        copies.append(copy)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return extract_code_from_files(copies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chunk count before/after bin-packing')
+    parser.add_argument('samples', nargs='+')
+    parser.add_argument('--chunk-size', type=int, default=4000, help='Characters per chunk (evaluator uses 4000)')
+    args = parser.parse_args()
+
+    rows = []
+    for sample_path in args.samples:
+        for name, files in collect_samples(sample_path):
+            workdir = tempfile.mkdtemp(prefix='evalai-chunks-')
+            try:
+                if len(files) > 1:
+                    # A project directory: upload it the way teams do, as one ZIP
+                    files = [zip_directory(os.path.commonpath(files), workdir)]
+                code = extract_sample(files, workdir)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+            chunks = chunk_code_content(code, max_chunk_size=args.chunk_size)
+            rows.append((name, len(split_file_sections(code)), len(code),
+                         legacy_chunk_count(code, args.chunk_size), len(chunks),
+                         sum(c['size'] for c in chunks) / (len(chunks) * args.chunk_size)))
+
+    print(f"{'sample':<28} {'files':>6} {'KB':>7} {'before':>7} {'after':>6} {'fill':>5}")
+    for name, files, size, before, after, fill in rows:
+        print(f"{name[:28]:<28} {files:>6} {size // 1024:>7} {before:>7} {after:>6} {fill:>5.0%}")
+
+    before = sum(row[3] for row in rows)
+    after = sum(row[4] for row in rows)
+    if before:
+        print(f"\n📉 {len(rows)} submissions: {before} -> {after} chunk calls ({1 - after / before:.0%} fewer)")
+
+
+if __name__ == '__main__':
+    main()
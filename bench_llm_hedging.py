@@ -0,0 +1,130 @@
+"""
+Validate LLM call deadlines and hedging against a local stub server
+
+Starts an OpenAI-compatible stub on localhost whose latency has a long tail
+(most calls are fast, a few stall), then runs the same workload through
+HedgedCompletions with hedging disabled and enabled and prints the latency
+percentiles. No network access or API key is needed.
+
+    python bench_llm_hedging.py [--calls 300] [--concurrency 8] [--tail-rate 0.05]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import OpenAI
+from llm_client import HedgedCompletions
+
+STUB_RESULT = json.dumps({
+    'relevance_score': 6.0, 'technical_complexity_score': 5.5, 'creativity_score': 5.0,
+    'documentation_score': 4.5, 'productivity_score': 5.0, 'overall_score': 5.2,
+    'feedback': 'Stub evaluation.', 'detailed_scores': {}
+})
+
+
+def make_handler(fast_latency, tail_latency, tail_rate, hang_marker):
+    rng = random.Random(42)
+    rng_lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            with rng_lock:
+                slow = rng.random() < tail_rate
+                latency = tail_latency if slow else rng.uniform(*fast_latency)
+            if hang_marker in json.dumps(body.get('messages', [])):
+                latency = 3600
+            time.sleep(latency)
+
+            payload = json.dumps({
+                'id': 'stub', 'object': 'chat.completion', 'created': int(time.time()), 'model': body.get('model'),
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': STUB_RESULT}}],
+                'usage': {'prompt_tokens': 1000, 'completion_tokens': 200, 'total_tokens': 1200,
+                          'prompt_tokens_details': {'cached_tokens': 896}}
+            }).encode()
+            try:
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client gave up (deadline) or the hedge already won
+
+    return StubHandler
+
+
+def run_workload(completions, calls, concurrency):
+    messages = [{'role': 'user', 'content': 'Evaluate this stub submission.'}]
+
+    def one_call(_):
+        return completions.create(model='gpt-4o', messages=messages, max_tokens=50)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_call, range(calls)))
+    return time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--tail-rate', type=float, default=0.05)
+    parser.add_argument('--tail-latency', type=float, default=3.0)
+    args = parser.parse_args()
+
+    hang_marker = 'STUB-HANG'
+    handler = make_handler((0.05, 0.15), args.tail_latency, args.tail_rate, hang_marker)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    print(f"🧪 Stub server at {base_url} (tail: {args.tail_rate:.0%} of calls take {args.tail_latency}s)")
+
+    def new_client():
+        return OpenAI(api_key='stub', base_url=base_url, max_retries=0)
+
+    results = {}
+    for label, max_rate in (('no hedging', 0.0), ('hedging', 0.1)):
+        completions = HedgedCompletions(new_client().chat.completions, deadline=30,
+                                        hedge_max_rate=max_rate, hedge_min_samples=20, max_workers=64)
+        elapsed = run_workload(completions, args.calls, args.concurrency)
+        stats = completions.stats()
+        results[label] = stats
+        latency = stats['call_latency']
+        print(f"\n📊 {label}: {args.calls} calls in {elapsed:.1f}s")
+        print(f"   p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  p99 {latency['p99']:.3f}s  mean {latency['mean']:.3f}s")
+        print(f"   hedges {stats['hedges']} ({stats['hedge_rate']:.1%}), hedge wins {stats['hedge_wins']}, timeouts {stats['timeouts']}")
+
+    # Deadline: a call that never answers must fail fast instead of stalling the submission
+    completions = HedgedCompletions(new_client().chat.completions, deadline=1.0, hedge_max_rate=0.0)
+    started = time.monotonic()
+    try:
+        completions.create(model='gpt-4o', messages=[{'role': 'user', 'content': hang_marker}])
+        deadline_ok = False
+    except TimeoutError:
+        deadline_ok = True
+    print(f"\n⏱️ Deadline check: {'PASS' if deadline_ok else 'FAIL'} (gave up after {time.monotonic() - started:.2f}s)")
+
+    server.shutdown()
+
+    baseline_p99 = results['no hedging']['call_latency']['p99']
+    hedged_p99 = results['hedging']['call_latency']['p99']
+    hedge_rate_ok = results['hedging']['hedge_rate'] <= 0.1 + 1e-9
+    print(f"\n{'✅' if hedged_p99 < baseline_p99 and hedge_rate_ok and deadline_ok else '❌'} "
+          f"p99 {baseline_p99:.3f}s -> {hedged_p99:.3f}s with hedge rate {results['hedging']['hedge_rate']:.1%}")
+
+
+if __name__ == '__main__':
+    main()
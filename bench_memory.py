@@ -0,0 +1,157 @@
+"""
+Peak-memory benchmark for ingesting and evaluating one large submission
+
+Builds a synthetic project ZIP of the requested size, then runs what
+create_submission does (code/documentation extraction, static analysis)
+and evaluate_submission (chunk planning, budget planning over every chunk
+prompt, chunk calls against an instant stub, combination) under
+tracemalloc. Fails if the peak exceeds the per-submission ceiling:
+
+    python bench_memory.py [--sizes 10 100]      # MB of source text
+
+Ceiling: Config.MEMORY_CEILING_FACTOR x kept code + Config.MEMORY_CEILING_OVERHEAD_MB.
+The pipeline keeps at most utils.code_content_limit() characters, the size
+whose ceiling fits Config.SUBMISSION_MEMORY_CEILING_MB, so a passing run
+means no upload can push the heap past that setting. Static analysis runs
+in pool workers outside tracemalloc; their peak RSS is reported separately
+and must stay under SUBMISSION_MEMORY_CEILING_MB too.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+import static_analysis
+from config import Config
+from evaluator import AIEvaluator
+from static_analysis import analyze_submission
+from utils import extract_code_from_files, extract_documentation
+
+STUB_RESULT = json.dumps({
+    'technical_complexity_score': 6.0, 'creativity_score': 5.0, 'productivity_score': 5.5,
+    'relevance_score': 6.0, 'documentation_score': 4.0, 'overall_score': 5.5,
+    'feedback': 'Stub evaluation.', 'detailed_scores': {}
+})
+
+
+class _StubCompletions:
+    """Instant chat-completions stand-in (no network)"""
+
+    def create(self, **kwargs):
+        message = type('Message', (), {'content': STUB_RESULT})()
+        choice = type('Choice', (), {'message': message})()
+        usage = type('Usage', (), {'prompt_tokens': 1000, 'completion_tokens': 200, 'total_tokens': 1200,
+                                   'prompt_tokens_details': None})()
+        return type('Response', (), {'choices': [choice], 'usage': usage})()
+
+
+def make_project_zip(path, megabytes, seed=7):
+    """ZIP of Python modules (4-120KB each) spread over nested directories"""
+    rng = random.Random(seed)
+    target = megabytes * 1024 * 1024
+    written = 0
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('README.md', '# Synthetic project\n\nBenchmark input.\n' * 20)
+        index = 0
+        while written < target:
+            lines = []
+            size = rng.randint(4, 120) * 1024
+            n = 0
+            while sum(len(line) for line in lines) < size:
+                lines.append(f"def handler_{index}_{n}(request, value={n}):\n"
+                             f"    \"\"\"Handle request {n} of module {index}\"\"\"\n"
+                             f"    result = compute(value, {rng.randint(0, 10**6)})\n"
+                             f"    if result > {n}:\n        return result - {n}\n    return result\n\n")
+                n += 1
+            content = ''.join(lines)
+            zf.writestr(f'pkg_{index % 17}/sub_{index % 5}/module_{index}.py', content)
+            written += len(content)
+            index += 1
+    return written
+
+
+def _worker_peak_rss(_):
+    """(pid, peak RSS in bytes) of the analysis worker running this task"""
+    time.sleep(0.05)  # Keep the task busy so the map reaches every worker
+    return os.getpid(), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def analysis_worker_peak():
+    """Largest peak RSS among the static-analysis pool workers (0 without a pool)"""
+    try:
+        pool = static_analysis._get_pool()
+        peaks = dict(pool.map(_worker_peak_rss, range(static_analysis._pool_size() * 8), chunksize=1))
+    except Exception:
+        return 0
+    return max(peaks.values(), default=0)
+
+
+def run_pipeline(zip_path):
+    """create_submission + evaluate_submission for one upload, LLM stubbed out"""
+    submission = type('BenchSubmission', (), {
+        'id': None, 'project_name': 'Memory benchmark', 'project_description': 'Synthetic project',
+        'team_name': 'Bench', 'participant_email': 'bench@example.com'
+    })()
+    hackathon = type('BenchHackathon', (), {
+        'id': None, 'name': 'Bench', 'description': 'Memory benchmark', 'evaluation_prompt': 'Evaluate.'
+    })()
+
+    submission.code_content = extract_code_from_files([zip_path])
+    submission.documentation_content = extract_documentation([zip_path], submission.project_description)
+    submission.static_metrics = json.dumps(analyze_submission([zip_path]))
+
+    evaluator = AIEvaluator(offline=True)
+    evaluator.completions = _StubCompletions()
+    budget = {'tokens': None, 'calls': 80}  # Plans over every chunk; 72 calls leave room for field retries
+    result = evaluator.evaluate_submission(submission, hackathon, budget=budget)
+    return len(submission.code_content), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak memory of one large submission')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100], help='Synthetic source sizes in MB')
+    args = parser.parse_args()
+
+    failed = False
+    for megabytes in args.sizes:
+        workdir = tempfile.mkdtemp(prefix='evalai-mem-')
+        try:
+            zip_path = os.path.join(workdir, 'project.zip')
+            make_project_zip(zip_path, megabytes)
+
+            started = time.monotonic()
+            tracemalloc.start()
+            with contextlib.redirect_stdout(io.StringIO()):
+                content_size, result = run_pipeline(zip_path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            elapsed = time.monotonic() - started
+            worker_peak = analysis_worker_peak()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        ceiling = Config.MEMORY_CEILING_FACTOR * content_size + Config.MEMORY_CEILING_OVERHEAD_MB * 1024 * 1024
+        configured = Config.SUBMISSION_MEMORY_CEILING_MB * 1024 * 1024 or float('inf')
+        ok = peak <= min(ceiling, configured) and worker_peak <= configured
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {megabytes}MB upload: {content_size / 2**20:.1f}MB code, "
+              f"{result.get('chunks_total')} chunks, {result['usage']['calls']} calls, "
+              f"peak {peak / 2**20:.1f}MB (ceiling {ceiling / 2**20:.1f}MB, {peak / content_size:.2f}x content, "
+              f"configured {Config.SUBMISSION_MEMORY_CEILING_MB}MB), "
+              f"analysis workers {worker_peak / 2**20:.1f}MB RSS, {elapsed:.1f}s")
+
+    static_analysis.shutdown_pool()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
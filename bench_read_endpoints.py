@@ -0,0 +1,156 @@
+"""
+Requests-per-second benchmark for the read endpoints
+
+Seeds a throwaway SQLite database, starts the API with the chosen server and
+hammers the read endpoints with keep-alive HTTP clients:
+
+    python bench_read_endpoints.py --server dev        # flask development server
+    python bench_read_endpoints.py --server gunicorn   # gunicorn.conf.py / wsgi:app
+
+Results depend heavily on the machine; compare runs made on the same host.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ENDPOINTS = [
+    '/api/hackathons',
+    '/api/results/{submission_id}',
+    '/api/hackathon/{hackathon_id}/submissions',
+]
+
+
+def seed_database(database_url, hackathons, submissions_per_hackathon):
+    """Create tables and fill them with evaluated submissions"""
+    from flask import Flask
+    from models import db, Hackathon, Submission, Evaluation
+
+    seed_app = Flask(__name__)
+    seed_app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(seed_app)
+
+    with seed_app.app_context():
+        db.create_all()
+        rng = random.Random(7)
+        for h in range(hackathons):
+            hackathon = Hackathon(name=f'Hackathon {h}', description='Benchmark event',
+                                  evaluation_prompt='Evaluate.', criteria='[]')
+            db.session.add(hackathon)
+            db.session.flush()
+            for s in range(submissions_per_hackathon):
+                submission = Submission(hackathon_id=hackathon.id, team_name=f'Team {s}',
+                                        participant_email='bench@example.com', project_name=f'Project {s}',
+                                        project_description='Benchmark project', code_content='x = 1\n' * 2000,
+                                        documentation_content='# README\n' * 50,
+                                        file_paths=json.dumps(['a.zip']), evaluated=True)
+                db.session.add(submission)
+                db.session.flush()
+                scores = {key: round(rng.uniform(3, 8), 1) for key in (
+                    'relevance_score', 'technical_complexity_score', 'creativity_score',
+                    'documentation_score', 'productivity_score')}
+                db.session.add(Evaluation(submission_id=submission.id, **scores,
+                                          overall_score=round(sum(scores.values()) / 5, 1),
+                                          feedback='Solid work. ' * 40,
+                                          detailed_scores=json.dumps({'technical_justification': 'ok ' * 50}),
+                                          evaluated_at=datetime.utcnow()))
+        db.session.commit()
+
+
+def wait_for_server(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def hammer(port, path_template, duration, clients, max_ids):
+    """Issue GETs from `clients` keep-alive connections for `duration` seconds"""
+    counts = [0] * clients
+    errors = [0] * clients
+    stop_at = time.monotonic() + duration
+
+    def worker(index):
+        rng = random.Random(index)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.monotonic() < stop_at:
+            path = path_template.format(submission_id=rng.randint(1, max_ids['submission']),
+                                        hackathon_id=rng.randint(1, max_ids['hackathon']))
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status == 200:
+                    counts[index] += 1
+                else:
+                    errors[index] += 1
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        conn.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / duration, sum(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the read endpoints')
+    parser.add_argument('--server', choices=['dev', 'gunicorn'], default='gunicorn')
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--hackathons', type=int, default=5)
+    parser.add_argument('--submissions', type=int, default=40, help='Submissions per hackathon')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='evalai-bench-')
+    database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    seed_database(database_url, args.hackathons, args.submissions)
+
+    env = dict(os.environ, DATABASE_URL=database_url, PORT=str(args.port), PYTHONUNBUFFERED='1')
+    if args.server == 'dev':
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(args.port)]
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        if not wait_for_server(args.port):
+            print("❌ Server did not start")
+            sys.exit(1)
+
+        max_ids = {'hackathon': args.hackathons, 'submission': args.hackathons * args.submissions}
+        print(f"🏁 {args.server}: {args.clients} keep-alive clients, {args.duration:.0f}s per endpoint")
+        for template in ENDPOINTS:
+            rps, errors = hammer(args.port, template, args.duration, args.clients, max_ids)
+            print(f"   {template:<45} {rps:8.1f} req/s  ({errors} errors)")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
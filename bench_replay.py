@@ -0,0 +1,240 @@
+"""
+Deterministic end-to-end benchmark: a corpus of submissions through create_submission
+
+Every sample is posted to POST /api/submissions on a throwaway database and
+upload folder, with LLM calls served from a cassette (see cassette.py), so
+runs need no network and make the same calls every time:
+
+    python bench_replay.py SAMPLES... --record              # once, with OPENAI_API_KEY set
+    python bench_replay.py SAMPLES... [--latency-scale 0]   # offline replay
+    python bench_replay.py SAMPLES... --baseline bench_replay_baseline.json [--update-baseline]
+
+A sample is an archive, or a directory of archives / project directories
+(see estimator.collect_samples); project directories are zipped first.
+Without SAMPLES the committed corpus (cassettes/corpus) is used, whose
+cassette and baseline are committed too, so a clean checkout can run
+
+    python bench_replay.py --latency-scale 1 --baseline bench_replay_baseline.json
+
+--stub-provider records against a local stub of the chat-completions API
+(bench_llm_hedging's, fixed scores and randomized latencies) instead of
+the provider; the committed cassette was recorded that way.
+Reports per-stage seconds, chunks, LLM calls and tokens per submission.
+With --baseline, exits 1 if any submission needs more chunks or calls than
+the baseline, if throughput drops by more than --tolerance, or if a request
+is missing from the cassette (re-record after prompt changes).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from bench_chunk_packing import zip_directory
+from bench_llm_hedging import make_handler
+from config import Config
+from estimator import collect_samples
+
+CASSETTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cassettes')
+DEFAULT_CASSETTE = os.path.join(CASSETTES, 'bench_replay.jsonl')
+DEFAULT_CORPUS = os.path.join(CASSETTES, 'corpus')
+STUB_LATENCY = (0.2, 0.6)  # Seconds of a stub call; 5% take STUB_TAIL_LATENCY
+STUB_TAIL_LATENCY = 1.5
+
+# (module attribute in app.py, stage name), in pipeline order
+STAGES = [
+    ('store_uploaded_file', 'save'),
+    ('extract_code_from_files', 'extract_code'),
+    ('extract_documentation', 'extract_docs'),
+    ('analyze_submission', 'static_analysis'),
+    ('evaluate_and_store', 'evaluate'),
+]
+
+
+def instrument_stages(app_module, timings):
+    """Wrap the pipeline functions create_submission calls so each adds its wall time to timings"""
+    def timed(stage, fn):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+        return wrapper
+
+    for attribute, stage in STAGES:
+        setattr(app_module, attribute, timed(stage, getattr(app_module, attribute)))
+
+
+def start_stub_provider():
+    """Local chat-completions stub in a daemon thread; returns its base URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(STUB_LATENCY, STUB_TAIL_LATENCY, 0.05, 'STUB-HANG'))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def build_app(workdir, mode, cassette_path, latency_scale):
+    """API app on a throwaway database, with the evaluator in cassette mode"""
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    Config.UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+    Config.MAINTENANCE_INTERVAL = 0
+    Config.LLM_CASSETTE_MODE = mode
+    Config.LLM_CASSETTE_PATH = cassette_path
+    Config.LLM_CASSETTE_LATENCY_SCALE = latency_scale
+
+    import app as app_module
+    from models import ensure_schema
+
+    api_app = app_module.create_app(Config)
+    with api_app.app_context():
+        ensure_schema()
+    return app_module, api_app
+
+
+def run_sample(client, timings, name, files, workdir):
+    """One hackathon + one submission; returns the per-submission report row"""
+    hackathon = client.post('/api/hackathon', json={
+        'name': f'Replay benchmark: {name}',
+        'description': 'Deterministic replay benchmark',
+        'evaluation_prompt': 'Evaluate the project on its technical merit.'
+    }).get_json()
+
+    if len(files) > 1:
+        # A project directory: upload it the way teams do, as one ZIP
+        files = [zip_directory(os.path.commonpath(files), workdir)]
+
+    timings.clear()
+    handles = [open(path, 'rb') for path in files]
+    try:
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.post('/api/submissions', content_type='multipart/form-data', data={
+                'hackathon_id': str(hackathon['id']),
+                'team_name': 'Replay',
+                'participant_email': 'replay@autoeval.ai',
+                'project_name': name,
+                'project_description': 'Corpus sample',
+                'project_files': [(handle, os.path.basename(path)) for handle, path in zip(handles, files)],
+            })
+        timings['total'] = time.perf_counter() - started
+    finally:
+        for handle in handles:
+            handle.close()
+
+    body = response.get_json() or {}
+    if response.status_code != 201:
+        raise RuntimeError(f"{name}: POST /api/submissions returned {response.status_code}: {body}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = client.get(f"/api/results/{body['id']}").get_json()
+    evaluation = result.get('evaluation') or {}
+    return {
+        'name': name,
+        'chunks': evaluation.get('chunks_total') or 1,
+        'calls': evaluation.get('llm_calls') or 0,
+        'tokens': evaluation.get('tokens_used') or 0,
+        'overall_score': evaluation.get('overall_score'),
+        'seconds': {stage: round(seconds, 4) for stage, seconds in timings.items()},
+    }
+
+
+def compare_to_baseline(rows, throughput, latency_scale, baseline, tolerance):
+    """Regression messages (empty if none)"""
+    problems = []
+    previous = {row['name']: row for row in baseline['samples']}
+    for row in rows:
+        before = previous.get(row['name'])
+        if before is None:
+            continue
+        for metric in ('chunks', 'calls'):
+            if row[metric] > before[metric]:
+                problems.append(f"{row['name']}: {metric} {before[metric]} -> {row[metric]}")
+
+    if baseline.get('latency_scale') != latency_scale:
+        print(f"⚠️ Baseline was taken at latency scale {baseline.get('latency_scale')}, skipping the throughput check")
+    elif throughput < baseline['throughput'] * (1 - tolerance):
+        problems.append(f"throughput {baseline['throughput']:.3f} -> {throughput:.3f} submissions/s "
+                        f"(more than {tolerance:.0%} slower)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay a corpus through create_submission')
+    parser.add_argument('samples', nargs='*', default=[DEFAULT_CORPUS],
+                        help='Archives or directories of samples (default: the committed corpus)')
+    parser.add_argument('--cassette', default=DEFAULT_CASSETTE, help='Recorded LLM calls')
+    parser.add_argument('--record', action='store_true', help='Call the provider and (re)write the cassette')
+    parser.add_argument('--stub-provider', action='store_true', help='With --record: call a local stub instead of the provider')
+    parser.add_argument('--latency-scale', type=float, default=0.0,
+                        help='Replayed latency multiplier (1 = as recorded, 0 = instant)')
+    parser.add_argument('--baseline', help='JSON baseline to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='Allowed throughput drop (fraction)')
+    args = parser.parse_args()
+
+    samples = [sample for path in args.samples for sample in collect_samples(path)]
+    if not samples:
+        parser.error('no samples found')
+    if args.record and os.path.exists(args.cassette):
+        os.remove(args.cassette)  # A fresh recording, not appended to an older one
+    if args.record and args.stub_provider:
+        Config.OPENAI_BASE_URL = start_stub_provider()
+        Config.OPENAI_API_KEY = 'stub'
+        Config.LLM_STREAM_RESPONSES = False  # The stub answers with plain JSON, not server-sent events
+
+    workdir = tempfile.mkdtemp(prefix='evalai-replay-')
+    try:
+        app_module, api_app = build_app(workdir, 'record' if args.record else 'replay',
+                                        args.cassette, args.latency_scale)
+        client = api_app.test_client()
+        with contextlib.redirect_stdout(io.StringIO()):
+            evaluator = app_module.get_evaluator()
+        timings = {}
+        instrument_stages(app_module, timings)
+
+        started = time.perf_counter()
+        rows = [run_sample(client, timings, name, files, workdir) for name, files in samples]
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stage_names = [stage for _, stage in STAGES] + ['total']
+    print(f"{'sample':<24} {'chunks':>6} {'calls':>5} {'tokens':>8} " + ' '.join(f'{s[:10]:>10}' for s in stage_names))
+    for row in rows:
+        print(f"{row['name'][:24]:<24} {row['chunks']:>6} {row['calls']:>5} {row['tokens']:>8} "
+              + ' '.join(f"{row['seconds'].get(stage, 0.0):>10.3f}" for stage in stage_names))
+
+    throughput = len(rows) / elapsed if elapsed else 0.0
+    print(f"\n⏱️ {len(rows)} submissions in {elapsed:.2f}s ({throughput:.3f}/s), "
+          f"{sum(r['calls'] for r in rows)} calls, {sum(r['tokens'] for r in rows):,} tokens")
+
+    failed = False
+    completions = evaluator.completions.completions
+    if not args.record:
+        print(f"📼 {completions.replayed} calls replayed, {completions.misses} missing from {args.cassette}")
+        failed |= completions.misses > 0
+
+    report = {'latency_scale': args.latency_scale, 'throughput': round(throughput, 4), 'samples': rows}
+    if args.baseline and not args.update_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            problems = compare_to_baseline(rows, throughput, args.latency_scale, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"❌ Regression: {problem}")
+        if not problems:
+            print(f"✅ No regression against {args.baseline}")
+        failed |= bool(problems)
+    elif args.baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline written to {args.baseline}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Small-submission latency under mixed load: fair-share vs FIFO call slots
+
+Simulates large submissions fanning out hundreds of chunk calls while
+small submissions (a couple of calls each) keep arriving, all sharing the
+same number of LLM call slots. Calls are simulated with sleeps, so no
+network access or API key is needed.
+
+    python bench_scheduler.py [--slots 4] [--large-jobs 3] [--large-calls 200] [--small-jobs 40]
+"""
+
+import argparse
+import contextvars
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from scheduler import FairScheduler
+
+
+class FifoSlots:
+    """Baseline: strict first-come-first-served call slots"""
+
+    def __init__(self, max_concurrent):
+        self.max_concurrent = max_concurrent
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._active = 0
+
+    @contextmanager
+    def job(self, key=None, group=None, expected_calls=1):
+        yield None
+
+    @contextmanager
+    def slot(self):
+        ticket = object()
+        with self._cond:
+            self._queue.append(ticket)
+            while self._active >= self.max_concurrent or self._queue[0] is not ticket:
+                self._cond.wait()
+            self._queue.popleft()
+            self._active += 1
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+
+def run_job(scheduler, key, calls, fan_out, call_latency):
+    """One submission: `calls` simulated LLM calls, at most `fan_out` in flight"""
+    started = time.monotonic()
+
+    def one_call(_):
+        with scheduler.slot():
+            time.sleep(call_latency)
+
+    with scheduler.job(key, 'hackathon', calls):
+        with ThreadPoolExecutor(max_workers=fan_out) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, one_call, i) for i in range(calls)]
+            for future in futures:
+                future.result()
+    return time.monotonic() - started
+
+
+def run_mixed_load(scheduler, args):
+    small_latencies = []
+    large_jobs = [
+        threading.Thread(target=run_job, args=(scheduler, f'large-{i}', args.large_calls, args.fan_out, args.call_latency))
+        for i in range(args.large_jobs)
+    ]
+    for thread in large_jobs:
+        thread.start()
+    time.sleep(args.call_latency)  # Let the large job fill the queue first
+
+    small_threads = []
+    for i in range(args.small_jobs):
+        thread = threading.Thread(target=lambda i=i: small_latencies.append(
+            run_job(scheduler, f'small-{i}', 2, 2, args.call_latency)))
+        thread.start()
+        small_threads.append(thread)
+        time.sleep(args.arrival_interval)
+
+    for thread in small_threads:
+        thread.join()
+    for thread in large_jobs:
+        thread.join()
+    return small_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--slots', type=int, default=4)
+    parser.add_argument('--large-jobs', type=int, default=3)
+    parser.add_argument('--large-calls', type=int, default=200)
+    parser.add_argument('--fan-out', type=int, default=8, help='Chunk calls each large job keeps in flight')
+    parser.add_argument('--small-jobs', type=int, default=40)
+    parser.add_argument('--call-latency', type=float, default=0.05)
+    parser.add_argument('--arrival-interval', type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"🏁 {args.slots} call slots, {args.large_jobs} large jobs ({args.large_calls} calls) + "
+          f"{args.small_jobs} small jobs (2 calls), {args.call_latency * 1000:.0f}ms per call")
+    results = {}
+    for label, scheduler in (('fifo', FifoSlots(args.slots)), ('fair-share', FairScheduler(args.slots))):
+        small = run_mixed_load(scheduler, args)
+        small.sort()
+        results[label] = statistics.median(small)
+        p95 = small[min(len(small) - 1, int(0.95 * len(small)))]
+        print(f"   {label:<11} small-job latency p50 {results[label]:.3f}s  p95 {p95:.3f}s")
+
+    ok = results['fair-share'] < results['fifo']
+    print(f"{'✅' if ok else '❌'} median small-job latency {results['fifo']:.3f}s -> {results['fair-share']:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
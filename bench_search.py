@@ -0,0 +1,122 @@
+"""
+Latency benchmark for GET /api/hackathon/<id>/search
+
+Seeds a throwaway SQLite database with one hackathon of N evaluated
+submissions (the search index is maintained by the after_flush hook while
+seeding, as in production) and times the endpoint for common words, rare
+words, phrases and prefixes:
+
+    python bench_search.py [--submissions 10000] [--code] [--max-p95-ms 100]
+
+Exits 1 if the p95 latency of any query is above --max-p95-ms.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from config import Config
+
+WORDS = ('react flask django fastapi svelte vue node express postgres sqlite redis kafka docker kubernetes '
+         'tensorflow pytorch llm agent chatbot dashboard telemetry sensor robot drone blockchain wallet '
+         'payments maps weather health fitness music video game education climate energy farming').split()
+FILLER = ('the team built a prototype that helps users with their daily tasks using a simple interface '
+          'and a backend service which stores data and exposes an api for the mobile client').split()
+
+QUERIES = [
+    'api',                  # Filler word: matches every document (worst case)
+    'react dashboard',
+    'kubernetes drone',
+    '"mobile client"',      # Phrase
+    'tele*',                # Prefix
+    'nonexistentword',
+]
+
+
+def _text(rng, stack, length):
+    """Filler prose mentioning the project's own technologies"""
+    return ' '.join(rng.choice(FILLER) if rng.random() < 0.9 else rng.choice(stack) for _ in range(length))
+
+
+def seed(submissions, rng):
+    """One hackathon with `submissions` evaluated submissions; returns its id"""
+    from models import db, Hackathon, Submission, Evaluation
+
+    hackathon = Hackathon(name='Search benchmark', description='Benchmark event',
+                          evaluation_prompt='Evaluate.', criteria='[]')
+    db.session.add(hackathon)
+    db.session.flush()
+    for start in range(0, submissions, 500):
+        batch = []
+        stacks = []
+        for index in range(start, min(start + 500, submissions)):
+            stack = rng.sample(WORDS, 4)  # Each project uses a few technologies
+            stacks.append(stack)
+            batch.append(Submission(
+                hackathon_id=hackathon.id, team_name=f'Team {index}', participant_email='bench@example.com',
+                project_name=f'{stack[0].title()} {stack[1]} {index}',
+                project_description=_text(rng, stack, 60),
+                documentation_content=_text(rng, stack, 800),
+                code_content='def handler(request):\n    return respond(request)\n' * 200,
+                evaluated=True, status='evaluated'
+            ))
+        db.session.add_all(batch)
+        db.session.flush()
+        db.session.add_all(Evaluation(submission_id=submission.id, overall_score=round(rng.uniform(3, 9), 1),
+                                      feedback=_text(rng, stack, 150)) for submission, stack in zip(batch, stacks))
+        db.session.commit()
+    return hackathon.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the full-text search endpoint')
+    parser.add_argument('--submissions', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50, help='Requests per query')
+    parser.add_argument('--code', action='store_true', help='Index extracted code too (SEARCH_INDEX_CODE)')
+    parser.add_argument('--max-p95-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='evalai-search-')
+    try:
+        Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        Config.UPLOAD_FOLDER = os.path.join(workdir, 'uploads')
+        Config.MAINTENANCE_INTERVAL = 0
+        Config.SEARCH_INDEX_CODE = args.code
+
+        import app as app_module
+        from models import ensure_schema
+
+        api_app = app_module.create_app(Config)
+        client = api_app.test_client()
+        with api_app.app_context():
+            ensure_schema()
+            started = time.perf_counter()
+            hackathon_id = seed(args.submissions, random.Random(7))
+            print(f"🌱 Seeded {args.submissions} submissions in {time.perf_counter() - started:.1f}s "
+                  f"({os.path.getsize(os.path.join(workdir, 'bench.db')) / 2**20:.0f}MB database)")
+
+        failed = False
+        print(f"{'query':<20} {'hits':>6} {'p50 ms':>8} {'p95 ms':>8}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                response = client.get(f'/api/hackathon/{hackathon_id}/search', query_string={'q': query})
+                timings.append((time.perf_counter() - started) * 1000)
+            body = response.get_json()
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f"{query:<20} {body['total']:>6} {statistics.median(timings):>8.2f} {p95:>8.2f}")
+            failed |= p95 > args.max_p95_ms
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("❌ p95 above" if failed else "✅ p95 within", f"{args.max_p95_ms}ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Record/replay of chat completions for deterministic offline runs
+
+In record mode every chat-completions call made by AIEvaluator is passed
+through to the provider and appended to a JSONL cassette together with its
+latency. In replay mode the cassette answers instead of the provider, after
+sleeping for the recorded latency times LLM_CASSETTE_LATENCY_SCALE (0 makes
+replay instant), so a corpus can be re-run without network access or an
+API key.
+
+Requests are matched on their content (model, messages, sampling
+parameters; the client timeout is ignored). Identical requests are replayed
+in recording order, the last recording repeating once they run out.
+
+Usage:
+    completions = RecordingCompletions(client.chat.completions, Cassette(path))
+    completions = ReplayCompletions(Cassette(path), latency_scale=0)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from openai.types.chat import ChatCompletion
+
+IGNORED_REQUEST_KEYS = {'timeout'}
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recording for a request (the prompt changed since recording)"""
+
+
+def request_key(kwargs):
+    """Stable hash of a chat-completions request"""
+    request = {key: value for key, value in kwargs.items() if key not in IGNORED_REQUEST_KEYS}
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """Append-only JSONL file of recorded calls, indexed by request key"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = defaultdict(list)  # request key -> recordings in order
+        self._replayed = defaultdict(int)  # request key -> recordings served
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry['key']].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def append(self, kwargs, response, latency):
+        entry = {
+            'key': request_key(kwargs),
+            'model': kwargs.get('model'),
+            'prompt_chars': sum(len(message.get('content') or '') for message in kwargs.get('messages', [])),
+            'latency': round(latency, 4),
+            'response': response.model_dump(mode='json'),
+        }
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)  # One line per call: a crash loses at most the call in flight
+            self._entries[entry['key']].append(entry)
+
+    def lookup(self, kwargs):
+        """
+        Next recording for a request
+
+        Raises:
+            CassetteMiss: The request was never recorded
+        """
+        key = request_key(kwargs)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded call for request {key[:12]} in {self.path}")
+            index = min(self._replayed[key], len(entries) - 1)
+            self._replayed[key] += 1
+            return entries[index]
+
+
+class RecordingCompletions:
+    """Pass-through to client.chat.completions that records every successful call"""
+
+    def __init__(self, completions, cassette):
+        self.completions = completions
+        self.cassette = cassette
+
+    def create(self, **kwargs):
+        started = time.monotonic()
+        response = self.completions.create(**kwargs)
+        self.cassette.append(kwargs, response, time.monotonic() - started)
+        return response
+
+
+class ReplayCompletions:
+    """Serves client.chat.completions calls from a cassette, with recorded (scaled) latency"""
+
+    def __init__(self, cassette, latency_scale=1.0):
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.replayed = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        try:
+            entry = self.cassette.lookup(kwargs)
+        except CassetteMiss:
+            with self._lock:
+                self.misses += 1
+            raise
+        with self._lock:
+            self.replayed += 1
+        if self.latency_scale > 0:
+            time.sleep(entry['latency'] * self.latency_scale)
+        return ChatCompletion.model_validate(entry['response'])
+
+
+def cassette_completions(completions, mode, path, latency_scale=1.0):
+    """
+    Wrap raw chat completions for the configured cassette mode
+
+    Args:
+        completions: client.chat.completions, or None in replay mode
+        mode (str): 'off', 'record' or 'replay'
+        path (str): Cassette file
+        latency_scale (float): Replayed latency multiplier
+
+    Returns:
+        The object AIEvaluator should send calls to
+    """
+    if mode == 'record':
+        return RecordingCompletions(completions, Cassette(path))
+    if mode == 'replay':
+        return ReplayCompletions(Cassette(path), latency_scale)
+    return completions
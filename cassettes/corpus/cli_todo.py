@@ -0,0 +1,47 @@
+"""Minimal command-line to-do list stored in a JSON file"""
+
+import argparse
+import json
+import os
+
+STORE = os.path.expanduser('~/.todo.json')
+
+
+def load():
+    if not os.path.exists(STORE):
+        return []
+    with open(STORE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save(items):
+    with open(STORE, 'w', encoding='utf-8') as f:
+        json.dump(items, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiny to-do list')
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add')
+    add.add_argument('text')
+    done = sub.add_parser('done')
+    done.add_argument('index', type=int)
+    sub.add_parser('list')
+    args = parser.parse_args()
+
+    items = load()
+    if args.command == 'add':
+        items.append({'text': args.text, 'done': False})
+    elif args.command == 'done':
+        if not 0 < args.index <= len(items):
+            parser.error(f'no item {args.index}')
+        items[args.index - 1]['done'] = True
+    else:
+        for number, item in enumerate(items, 1):
+            print(f"{number:>3}. [{'x' if item['done'] else ' '}] {item['text']}")
+        return
+    save(items)
+
+
+if __name__ == '__main__':
+    main()
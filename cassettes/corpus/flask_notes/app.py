@@ -0,0 +1,81 @@
+from flask import Flask, abort, jsonify, request
+from models import Note, Tag, db
+
+
+def create_app(database_url='sqlite:///notes.db'):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+
+    def note_or_404(note_id):
+        note = db.session.get(Note, note_id)
+        if note is None:
+            abort(404, description=f'Note {note_id} not found')
+        return note
+
+    def validated(payload, partial=False):
+        if not isinstance(payload, dict):
+            abort(400, description='JSON object expected')
+        if not partial and not (payload.get('title') or '').strip():
+            abort(400, description='title is required')
+        tags = payload.get('tags', [])
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            abort(400, description='tags must be a list of strings')
+        return payload
+
+    @app.errorhandler(400)
+    @app.errorhandler(404)
+    def error(e):
+        return jsonify({'error': e.description}), e.code
+
+    @app.get('/notes')
+    def list_notes():
+        query = Note.query.order_by(Note.updated_at.desc())
+        tag = request.args.get('tag')
+        if tag:
+            query = query.filter(Note.tags.any(Tag.name == tag.lower()))
+        text = request.args.get('q')
+        if text:
+            pattern = f'%{text}%'
+            query = query.filter(db.or_(Note.title.ilike(pattern), Note.body.ilike(pattern)))
+        return jsonify([note.to_dict() for note in query.limit(100)])
+
+    @app.post('/notes')
+    def create_note():
+        payload = validated(request.get_json(silent=True))
+        note = Note(title=payload['title'].strip(), body=payload.get('body', ''))
+        note.set_tags(payload.get('tags', []))
+        db.session.add(note)
+        db.session.commit()
+        return jsonify(note.to_dict()), 201
+
+    @app.get('/notes/<int:note_id>')
+    def get_note(note_id):
+        return jsonify(note_or_404(note_id).to_dict())
+
+    @app.put('/notes/<int:note_id>')
+    def update_note(note_id):
+        note = note_or_404(note_id)
+        payload = validated(request.get_json(silent=True), partial=True)
+        if 'title' in payload:
+            note.title = payload['title'].strip()
+        if 'body' in payload:
+            note.body = payload['body']
+        if 'tags' in payload:
+            note.set_tags(payload['tags'])
+        db.session.commit()
+        return jsonify(note.to_dict())
+
+    @app.delete('/notes/<int:note_id>')
+    def delete_note(note_id):
+        db.session.delete(note_or_404(note_id))
+        db.session.commit()
+        return '', 204
+
+    return app
+
+
+if __name__ == '__main__':
+    create_app().run(debug=True)
@@ -0,0 +1,50 @@
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+
+note_tags = db.Table(
+    'note_tags',
+    db.Column('note_id', db.Integer, db.ForeignKey('notes.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+)
+
+
+class Tag(db.Model):
+    __tablename__ = 'tags'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    @classmethod
+    def get_or_create(cls, name):
+        name = name.strip().lower()
+        tag = cls.query.filter_by(name=name).first()
+        if tag is None:
+            tag = cls(name=name)
+            db.session.add(tag)
+        return tag
+
+
+class Note(db.Model):
+    __tablename__ = 'notes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, default='')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    tags = db.relationship('Tag', secondary=note_tags, lazy='joined')
+
+    def set_tags(self, names):
+        self.tags = [Tag.get_or_create(name) for name in names if name.strip()]
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'body': self.body,
+            'tags': sorted(tag.name for tag in self.tags),
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+        }
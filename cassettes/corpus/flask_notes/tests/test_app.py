@@ -0,0 +1,42 @@
+import pytest
+from app import create_app
+
+
+@pytest.fixture
+def client():
+    app = create_app('sqlite://')
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+def create(client, **fields):
+    payload = {'title': 'Standup', 'body': 'Daily meeting notes', 'tags': ['work']}
+    payload.update(fields)
+    return client.post('/notes', json=payload)
+
+
+def test_create_and_get(client):
+    created = create(client).get_json()
+    assert created['tags'] == ['work']
+    fetched = client.get(f"/notes/{created['id']}").get_json()
+    assert fetched['title'] == 'Standup'
+
+
+def test_title_required(client):
+    response = create(client, title='  ')
+    assert response.status_code == 400
+
+
+def test_filter_by_tag_and_text(client):
+    create(client)
+    create(client, title='Groceries', body='milk, eggs', tags=['home'])
+    assert [n['title'] for n in client.get('/notes?tag=home').get_json()] == ['Groceries']
+    assert [n['title'] for n in client.get('/notes?q=meeting').get_json()] == ['Standup']
+
+
+def test_update_and_delete(client):
+    note_id = create(client).get_json()['id']
+    updated = client.put(f'/notes/{note_id}', json={'tags': ['work', 'urgent']}).get_json()
+    assert updated['tags'] == ['urgent', 'work']
+    assert client.delete(f'/notes/{note_id}').status_code == 204
+    assert client.get(f'/notes/{note_id}').status_code == 404
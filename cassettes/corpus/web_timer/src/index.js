@@ -0,0 +1,38 @@
+import { PHASES, Timer, formatClock } from './timer.js';
+
+const $ = (id) => document.getElementById(id);
+
+function render(timer) {
+  $('phase').textContent = PHASES[timer.phase];
+  $('clock').textContent = formatClock(timer.remaining);
+  $('sessions').textContent = String(timer.sessions);
+  $('toggle').textContent = timer.running ? 'Pause' : 'Start';
+  document.title = `${formatClock(timer.remaining)} · ${PHASES[timer.phase]}`;
+}
+
+function notify(ended) {
+  const message = ended === 'work' ? 'Time for a break' : 'Back to work';
+  if ('Notification' in window && Notification.permission === 'granted') {
+    new Notification(message);
+  }
+}
+
+const timer = new Timer({ onTick: render, onPhaseEnd: notify });
+
+$('toggle').addEventListener('click', () => {
+  if ('Notification' in window && Notification.permission === 'default') {
+    Notification.requestPermission();
+  }
+  timer.running ? timer.pause() : timer.start();
+  render(timer);
+});
+
+$('reset').addEventListener('click', () => timer.reset());
+
+for (const id of ['work', 'break']) {
+  $(id).addEventListener('change', () => {
+    timer.setLengths(Number($('work').value) || 25, Number($('break').value) || 5);
+  });
+}
+
+render(timer);
@@ -0,0 +1,57 @@
+export const PHASES = { work: 'Work', break: 'Break' };
+
+export class Timer {
+  constructor({ workMinutes = 25, breakMinutes = 5, onTick, onPhaseEnd } = {}) {
+    this.lengths = { work: workMinutes * 60, break: breakMinutes * 60 };
+    this.phase = 'work';
+    this.remaining = this.lengths.work;
+    this.sessions = 0;
+    this.onTick = onTick ?? (() => {});
+    this.onPhaseEnd = onPhaseEnd ?? (() => {});
+    this.handle = null;
+  }
+
+  get running() {
+    return this.handle !== null;
+  }
+
+  start() {
+    if (this.running) return;
+    this.handle = setInterval(() => this.tick(), 1000);
+  }
+
+  pause() {
+    clearInterval(this.handle);
+    this.handle = null;
+  }
+
+  reset() {
+    this.pause();
+    this.phase = 'work';
+    this.remaining = this.lengths.work;
+    this.onTick(this);
+  }
+
+  setLengths(workMinutes, breakMinutes) {
+    this.lengths = { work: workMinutes * 60, break: breakMinutes * 60 };
+    if (!this.running) this.remaining = this.lengths[this.phase];
+    this.onTick(this);
+  }
+
+  tick() {
+    this.remaining -= 1;
+    if (this.remaining <= 0) {
+      if (this.phase === 'work') this.sessions += 1;
+      const ended = this.phase;
+      this.phase = ended === 'work' ? 'break' : 'work';
+      this.remaining = this.lengths[this.phase];
+      this.onPhaseEnd(ended, this);
+    }
+    this.onTick(this);
+  }
+}
+
+export function formatClock(seconds) {
+  const minutes = Math.floor(seconds / 60);
+  return `${String(minutes).padStart(2, '0')}:${String(seconds % 60).padStart(2, '0')}`;
+}
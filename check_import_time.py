@@ -0,0 +1,88 @@
+"""
+Enforce the cold-start import budget
+
+Runs `python -X importtime -c "import wsgi"` in a fresh interpreter and fails
+(exit code 1) when importing the serving entry point exceeds the budget or
+pulls in modules that must stay lazy (the OpenAI SDK is only imported when
+the evaluator is first built).
+
+    python check_import_time.py [--budget-ms 1000] [--module wsgi]
+    python -m pytest -q check_import_time.py  # Same check with the defaults, as a test
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Heavy modules that must only load on first use / warm-up
+LAZY_MODULES = {'openai', 'evaluator', 'llm_client', 'httpx'}
+DEFAULT_BUDGET_MS = 1000.0
+DEFAULT_RUNS = 3
+
+
+def measure(module):
+    """
+    Returns:
+        tuple: (cumulative import time of `module` in microseconds, set of imported module names)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(f"❌ import {module} failed")
+
+    imported = set()
+    cumulative = None
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = [part.strip() for part in line[len('import time:'):].split('|')]
+        if not parts[1].isdigit():
+            continue  # Header line
+        name = parts[2]
+        imported.add(name)
+        if name == module:
+            cumulative = int(parts[1])
+    return cumulative, imported
+
+
+def check(module='wsgi', runs=DEFAULT_RUNS):
+    """
+    Returns:
+        tuple: (best import time in ms, list of per-run times in ms, sorted lazy modules imported eagerly)
+    """
+    timings = []
+    for _ in range(runs):
+        cumulative, imported = measure(module)
+        timings.append(cumulative / 1000.0)
+    return min(timings), timings, sorted(LAZY_MODULES & imported)
+
+
+def test_import_time_budget():
+    best, timings, eager = check()
+    assert not eager, f"Heavy modules imported eagerly: {', '.join(eager)}"
+    assert best <= DEFAULT_BUDGET_MS, f"import wsgi took {best:.0f}ms (budget {DEFAULT_BUDGET_MS:.0f}ms)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import-time budget of the serving entry point')
+    parser.add_argument('--module', default='wsgi')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='Best of N runs, to ignore a cold disk cache')
+    args = parser.parse_args()
+
+    best, timings, eager = check(args.module, args.runs)
+    print(f"⏱️ import {args.module}: {best:.0f}ms (budget {args.budget_ms:.0f}ms, runs: {', '.join(f'{t:.0f}' for t in timings)})")
+    if eager:
+        print(f"❌ Heavy modules imported eagerly: {', '.join(eager)}")
+    if best > args.budget_ms:
+        print("❌ Import-time budget exceeded")
+    if eager or best > args.budget_ms:
+        sys.exit(1)
+    print("✅ Within budget")
+
+
+if __name__ == '__main__':
+    main()
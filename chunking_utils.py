@@ -2,6 +2,13 @@
 Utilities for chunking large code content for AI evaluation
 """
 
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+
 def chunk_text(text, max_chunk_size=3000, overlap=200):
     """
     Split text into overlapping chunks
@@ -46,69 +53,309 @@ def chunk_text(text, max_chunk_size=3000, overlap=200):
     
     return chunks
 
-def chunk_code_content(code_content, max_chunk_size=3000):
+FILE_HEADER_PREFIX = '# File: '  # Written by utils when concatenating extracted files
+
+# Lines that start a top-level definition in common languages: preferred split points
+DEFINITION_RE = re.compile(
+    r'(?:async\s+def|def|class|function|export|const|let|var|public|private|protected|static|'
+    r'func|fn|pub|impl|struct|enum|interface|type|module|namespace|package|@)\b'
+)
+NON_BLANK_RE = re.compile(r'\S')
+
+def iter_file_spans(code_content):
+    """
+    Locate the file sections of extracted code without copying them
+    
+    Only the `# File: <path>` headers written during extraction start a new
+    section, so markdown rules or YAML separators inside a file never do.
+    
+    Args:
+        code_content (str): Concatenated extraction output
+    
+    Yields:
+        tuple: (path, start, end) offsets of each section, header line included
+    """
+    start = 0
+    while start < len(code_content):
+        next_header = code_content.find('\n' + FILE_HEADER_PREFIX, start)
+        end = len(code_content) if next_header == -1 else next_header + 1
+        
+        # Same trimming as text.strip('\n'), on offsets
+        first, last = start, end
+        while first < last and code_content[first] == '\n':
+            first += 1
+        while last > first and code_content[last - 1] == '\n':
+            last -= 1
+        if NON_BLANK_RE.search(code_content, first, last):
+            yield _section_path(code_content, first, last), first, last
+        start = end
+
+def split_file_sections(code_content):
+    """
+    Split extracted code into one section per file
+    
+    Args:
+        code_content (str): Concatenated extraction output
+    
+    Returns:
+        list: (path, text) tuples, text including its header line
+    """
+    return [(path, code_content[start:end]) for path, start, end in iter_file_spans(code_content)]
+
+def _section_header(code_content, start, end):
+    """Header line of the section at start, or '' for text before the first header"""
+    if not code_content.startswith(FILE_HEADER_PREFIX, start, end):
+        return ''
+    line_end = code_content.find('\n', start, end)
+    return code_content[start:end if line_end == -1 else line_end]
+
+def _section_path(code_content, start, end):
+    header = _section_header(code_content, start, end)
+    if not header:
+        return ''
+    path = header[len(FILE_HEADER_PREFIX):]
+    for marker in (' [PRIORITY]', ' (SKIPPED', ' (ERROR'):
+        path = path.split(marker)[0]
+    return path.strip()
+
+def split_at_boundaries(code_content, start, end, max_chunk_size):
+    """
+    Split one oversized file section at syntactic boundaries
+    
+    Cuts preferably before a top-level definition, else before an unindented
+    line following a blank line, else at a blank line; only a single line
+    longer than the budget is cut mid-line. Every part repeats the file
+    header so the model knows where it comes from.
+    
+    Args:
+        code_content (str): Concatenated extraction output
+        start (int): Offset of the section's header line
+        end (int): End offset of the section
+        max_chunk_size (int): Maximum characters per part, header included
+    
+    Returns:
+        list: (header, start, end) parts; content is header + code_content[start:end]
+    """
+    header = _section_header(code_content, start, end)
+    body_start = start + len(header) + 1 if header else start
+    budget = max(200, max_chunk_size - len(header) - 20)  # Room for the "(part i/n)" suffix
+    
+    spans = []
+    part_start, lines = body_start, 0  # Current part: start offset, number of lines
+    best, previous = {}, None  # boundary strength -> (offset, line index); (start, end) of the line before
+    position = body_start
+    while position <= end:
+        line_end = code_content.find('\n', position, end)
+        line_end = end if line_end == -1 else line_end
+        
+        while line_end - position > budget:
+            if position > part_start:
+                spans.append((part_start, position))
+            spans.append((position, position + budget))
+            position += budget
+            part_start, lines, best, previous = position, 0, {}, None
+        
+        while position > part_start and line_end + 1 - part_start > budget:
+            cut = next((best[k][0] for k in (2, 1, 0) if k in best and best[k][1] >= lines // 2), position)
+            spans.append((part_start, cut))
+            part_start, lines, best, previous = cut, 0, {}, None
+            scan = cut
+            while scan < position:
+                scan_end = code_content.find('\n', scan, position)
+                if previous is not None:
+                    _record_boundary(best, code_content, previous, (scan, scan_end), lines)
+                previous = (scan, scan_end)
+                lines += 1
+                scan = scan_end + 1
+        
+        if previous is not None:
+            _record_boundary(best, code_content, previous, (position, line_end), lines)
+        previous = (position, line_end)
+        lines += 1
+        position = line_end + 1
+    if part_start < end:
+        spans.append((part_start, end))
+    
+    parts = []
+    for first, last in spans:
+        # Same trimming as part.strip('\n'); whitespace-only parts are dropped
+        while first < last and code_content[first] == '\n':
+            first += 1
+        while last > first and code_content[last - 1] == '\n':
+            last -= 1
+        if NON_BLANK_RE.search(code_content, first, last):
+            parts.append((first, last))
+    
+    suffix = ' [PRIORITY]' if header.endswith(' [PRIORITY]') else ''
+    base = header[:-len(suffix)] if suffix else header
+    return [(f"{base} (part {i}/{len(parts)}){suffix}\n", first, last)
+            for i, (first, last) in enumerate(parts, 1)]
+
+def _record_boundary(best, code_content, previous, line, index):
+    """Remember line (a (start, end) span, index-th of its part) as a split point if it starts something new"""
+    start, end = line
+    if not NON_BLANK_RE.search(code_content, start, end):
+        return
+    previous_blank = not NON_BLANK_RE.search(code_content, *previous)
+    if code_content[start] not in ' \t}])':
+        if DEFINITION_RE.match(code_content, start, end):
+            best[2] = start, index
+        elif previous_blank:
+            best[1] = start, index
+    if previous_blank:
+        best[0] = start, index
+
+def _directory_affinity(a, b):
+    """Number of leading directory components two paths share"""
+    shared = 0
+    for x, y in zip(a.split('/')[:-1], b.split('/')[:-1]):
+        if x != y:
+            break
+        shared += 1
+    return shared
+
+def pack_sections(sections, max_chunk_size):
+    """
+    Bin-pack file sections into as few near-full chunks as possible
+    
+    First-fit decreasing: sections are placed largest first into the bin
+    with room that shares the most leading directories with them (ties go
+    to the earliest bin), so sibling files end up in the same chunk.
+    
+    Args:
+        sections (list): (path, size) tuples, each size at most max_chunk_size
+        max_chunk_size (int): Bin capacity in characters
+    
+    Returns:
+        list: Bins, each a list of section indices in their original order
+    """
+    bins = []  # [used size, [section index], representative path]
+    open_bins = []  # Bins that can still take the smallest section, in creation order
+    ordered = sorted(range(len(sections)), key=lambda index: (-sections[index][1], index))
+    smallest = sections[ordered[-1]][1] + 1 if sections else 0
+    for index in ordered:
+        path, size = sections[index]
+        size += 1  # Joined with a newline
+        best = None
+        for candidate in open_bins:
+            if candidate[0] + size > max_chunk_size:
+                continue
+            if best is None or _directory_affinity(path, candidate[2]) > _directory_affinity(path, best[2]):
+                best = candidate
+        if best is None:
+            best = [0, [], path]
+            bins.append(best)
+            open_bins.append(best)
+        best[0] += size
+        best[1].append(index)
+        if best[0] + smallest > max_chunk_size:
+            open_bins.remove(best)  # Full for good: skip it when placing the rest
+    
+    # Keep extraction order (priority files first, file parts in sequence) within and across chunks
+    packed = [sorted(indices) for _, indices, _ in bins]
+    packed.sort(key=lambda indices: indices[0])
+    return packed
+
+class CodeChunk(dict):
+    """
+    Chunk metadata that slices its content out of the source on access
+    
+    chunk['content'] is rebuilt from (header, start, end) spans each time it
+    is read, so a planned submission holds offsets rather than a second
+    copy of its code.
+    """
+    
+    def __init__(self, code_content, spans, **metadata):
+        super().__init__(**metadata)
+        self._code_content = code_content
+        self._spans = spans
+    
+    def __missing__(self, key):
+        if key != 'content':
+            raise KeyError(key)
+        return '\n'.join(header + self._code_content[start:end] for header, start, end in self._spans)
+
+def _section_hash(code_content, header, start, end):
+    """Short content hash identifying a section across extractions"""
+    hasher = hashlib.sha256(header.encode('utf-8'))
+    hasher.update(code_content[start:end].encode('utf-8'))
+    return hasher.hexdigest()[:16]
+
+def keep_previous_bins(hashes, previous_layout):
     """
-    Intelligently chunk code content, trying to preserve function/class boundaries
+    Bins of an earlier chunking whose sections are all still present, unchanged
+    
+    Args:
+        hashes (list): Section hashes of the current content, by section index
+        previous_layout (list): Section-hash lists of the earlier chunks
+    
+    Returns:
+        list: Kept bins as lists of current section indices
+    """
+    available = {}
+    for index, digest in enumerate(hashes):
+        available.setdefault(digest, []).append(index)
+    kept = []
+    for previous in previous_layout:
+        if previous and all(len(available.get(digest, ())) >= previous.count(digest) for digest in set(previous)):
+            kept.append([available[digest].pop(0) for digest in previous])
+    return kept
+
+def chunk_code_content(code_content, max_chunk_size=3000, previous_layout=None):
+    """
+    Plan chunks for extracted code: split per file, bin-pack small files together
     
     Args:
         code_content (str): Code content to chunk
         max_chunk_size (int): Maximum characters per chunk
+        previous_layout (list): `sections` of an earlier version's chunks; chunks
+            whose sections are all unchanged are kept as they were (so their
+            content, and any result keyed by it, is identical) and only the
+            rest is packed anew
     
     Returns:
-        list: List of code chunks with metadata
+        list: Chunks with metadata (content, chunk_id, size, files, priority,
+              sections (hashes), total_chunks)
     """
     if len(code_content) <= max_chunk_size:
         return [{
             'content': code_content,
             'chunk_id': 1,
             'total_chunks': 1,
-            'size': len(code_content)
+            'size': len(code_content),
+            'files': [path for path, _, _ in iter_file_spans(code_content)],
+            'priority': '[PRIORITY]' in code_content,
+            'sections': [_section_hash(code_content, '', 0, len(code_content))]
         }]
     
-    # Split by files first (if multiple files are concatenated)
-    file_sections = []
-    current_section = ""
-    
-    lines = code_content.split('\n')
-    for line in lines:
-        # Look for file separators or headers
-        if line.startswith('===') or line.startswith('---') or 'File:' in line:
-            if current_section.strip():
-                file_sections.append(current_section.strip())
-            current_section = line + '\n'
+    sections = []  # (path, header, start, end); content is header + code_content[start:end]
+    for path, start, end in iter_file_spans(code_content):
+        if end - start + 1 <= max_chunk_size:
+            sections.append((path, '', start, end))
         else:
-            current_section += line + '\n'
+            sections.extend((path, *part) for part in split_at_boundaries(code_content, start, end, max_chunk_size - 1))
+    hashes = [_section_hash(code_content, header, start, end) for _, header, start, end in sections]
     
-    # Add the last section
-    if current_section.strip():
-        file_sections.append(current_section.strip())
+    bins = keep_previous_bins(hashes, previous_layout) if previous_layout else []
+    kept = {index for indices in bins for index in indices}
+    remaining = [index for index in range(len(sections)) if index not in kept]
+    packed = pack_sections([(sections[index][0], len(sections[index][1]) + sections[index][3] - sections[index][2])
+                            for index in remaining], max_chunk_size)
+    bins = [sorted(indices) for indices in bins] + [[remaining[index] for index in indices] for indices in packed]
+    bins.sort(key=lambda indices: indices[0])
     
-    # If no file sections found, treat as single content
-    if len(file_sections) <= 1:
-        file_sections = [code_content]
-    
-    # Chunk each file section
     all_chunks = []
-    chunk_counter = 1
-    
-    for section in file_sections:
-        if len(section) <= max_chunk_size:
-            all_chunks.append({
-                'content': section,
-                'chunk_id': chunk_counter,
-                'size': len(section)
-            })
-            chunk_counter += 1
-        else:
-            # Split large sections into smaller chunks
-            text_chunks = chunk_text(section, max_chunk_size, overlap=300)
-            for chunk_text in text_chunks:
-                all_chunks.append({
-                    'content': chunk_text,
-                    'chunk_id': chunk_counter,
-                    'size': len(chunk_text)
-                })
-                chunk_counter += 1
+    for chunk_counter, indices in enumerate(bins, 1):
+        items = [sections[index] for index in indices]
+        all_chunks.append(CodeChunk(
+            code_content,
+            [(header, start, end) for _, header, start, end in items],
+            chunk_id=chunk_counter,
+            size=sum(len(header) + end - start + 1 for _, header, start, end in items) - 1,
+            files=sorted({path for path, _, _, _ in items}),
+            priority=any(_is_priority(code_content, header, start, end) for _, header, start, end in items),
+            sections=[hashes[index] for index in indices]
+        ))
     
     # Add total_chunks to all chunks
     total_chunks = len(all_chunks)
@@ -117,6 +364,9 @@ def chunk_code_content(code_content, max_chunk_size=3000):
     
     return all_chunks
 
+def _is_priority(code_content, header, start, end):
+    return (header or _section_header(code_content, start, end)).rstrip('\n').endswith(' [PRIORITY]')
+
 def create_chunk_summary(chunks):
     """
     Create a summary of all chunks for context
@@ -144,17 +394,147 @@ Chunk breakdown:
     
     return summary
 
-def combine_chunk_evaluations(chunk_results):
+def prioritize_chunks(chunks):
+    """
+    Order chunks for adaptive (early-stopping) evaluation
+    
+    Chunks holding priority files (README, entry points, manifests) go first;
+    the rest follow in a deterministic shuffle so that any prefix of the order
+    is a representative sample rather than one directory of the repo.
+    
+    Args:
+        chunks (list): Chunk dictionaries from chunk_code_content
+    
+    Returns:
+        list: The same chunk dictionaries in evaluation order
+    """
+    priority = [chunk for chunk in chunks if chunk['priority']]
+    remaining = [chunk for chunk in chunks if not chunk['priority']]
+    random.Random(len(chunks)).shuffle(remaining)
+    return priority + remaining
+
+class RunningScoreEstimate:
+    """
+    Size-weighted running mean and confidence interval per criterion
+    
+    Treats evaluated chunks as a weighted sample of all chunks. The interval
+    shrinks with the effective sample size and with a finite-population
+    correction, so it reaches zero once every chunk has been scored.
+    """
+    
+    def __init__(self, score_keys, total_weight, z=1.96):
+        self.score_keys = list(score_keys)
+        self.total_weight = total_weight
+        self.z = z
+        self.samples = []  # (weight, result) pairs
+    
+    def add(self, result, weight):
+        self.samples.append((weight, result))
+    
+    @property
+    def count(self):
+        return len(self.samples)
+    
+    def interval(self, score_key):
+        """
+        Returns:
+            tuple: (weighted mean, half-width of the confidence interval)
+        """
+        points = [(w, r[score_key]) for w, r in self.samples if score_key in r]
+        sum_w = sum(w for w, _ in points)
+        if not points or not sum_w:
+            return 5.0, float('inf')
+        
+        mean = sum(w * x for w, x in points) / sum_w
+        if len(points) < 2:
+            return mean, float('inf')
+        
+        sum_w2 = sum(w * w for w, _ in points)
+        n_eff = sum_w * sum_w / sum_w2
+        # Reliability-weighted (unbiased) variance
+        variance = sum(w * (x - mean) ** 2 for w, x in points) / (sum_w - sum_w2 / sum_w)
+        fpc = max(0.0, 1.0 - sum_w / self.total_weight) if self.total_weight else 1.0
+        return mean, self.z * math.sqrt(variance / n_eff * fpc)
+    
+    def max_width(self):
+        """Widest full interval (2 x half-width) across criteria"""
+        return max(2 * self.interval(key)[1] for key in self.score_keys)
+    
+    def summary(self):
+        return {key: round(2 * self.interval(key)[1], 3) for key in self.score_keys}
+
+class ChunkResultCache:
+    """
+    LLM results of one evaluation, keyed by the hash of what was evaluated
+
+    Seeded with the results stored for an earlier version of the same
+    project (a previous commit), so calls whose prompt content is unchanged
+    are answered from it. Collects every result used, reused or new, plus
+    the chunk layout, for the next version to start from. Shared by the
+    chunk-evaluation threads of one submission.
+    """
+
+    def __init__(self, previous=None):
+        previous = previous or {}
+        self.previous = previous.get('results', {})
+        self.previous_layout = previous.get('chunks', [])
+        self.results = {}
+        self.layout = []
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self.previous or key in self.results
+
+    def get(self, key):
+        """Stored result for key (a copy), or None"""
+        with self._lock:
+            result = self.results.get(key) or self.previous.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.results[key] = result
+        return dict(result)
+
+    def put(self, key, result):
+        stored = {name: value for name, value in result.items() if name not in ('usage', 'chunk_id', 'chunk_weight')}
+        with self._lock:
+            self.results[key] = stored
+
+    def to_dict(self):
+        with self._lock:
+            return {'results': dict(self.results), 'chunks': list(self.layout)}
+
+    def summary(self):
+        with self._lock:
+            return {'reused_calls': self.hits, 'new_calls': self.misses}
+
+SCORE_KEYS = [
+    'relevance_score',
+    'technical_complexity_score',
+    'creativity_score',
+    'documentation_score',
+    'productivity_score'
+]
+
+def combine_chunk_evaluations(chunk_results, documentation_result=None):
     """
     Combine evaluation results from multiple chunks
     
+    Chunk results may cover only the code-centric criteria; scores present in
+    documentation_result (relevance and documentation, scored once per
+    submission) take precedence over any chunk-level values.
+    
     Args:
         chunk_results (list): List of evaluation results from each chunk
+        documentation_result (dict): Optional result of the per-submission documentation call
     
     Returns:
         dict: Combined evaluation result
     """
-    if not chunk_results:
+    if not chunk_results and not documentation_result:
         return {
             'relevance_score': 5.0,
             'technical_complexity_score': 5.0,
@@ -166,34 +546,53 @@ def combine_chunk_evaluations(chunk_results):
             'detailed_scores': '{}'
         }
     
-    if len(chunk_results) == 1:
+    if len(chunk_results) == 1 and documentation_result is None:
         return chunk_results[0]
     
-    # Calculate weighted averages based on chunk sizes
-    total_weight = sum(result.get('chunk_weight', 1) for result in chunk_results)
+    documentation_result = documentation_result or {}
     
-    combined_scores = {
-        'relevance_score': 0,
-        'technical_complexity_score': 0,
-        'creativity_score': 0,
-        'documentation_score': 0,
-        'productivity_score': 0
-    }
+    # Calculate weighted averages based on chunk sizes, per criterion, over the chunks that scored it
+    combined_scores = {}
+    
+    for score_key in SCORE_KEYS:
+        if score_key in documentation_result:
+            combined_scores[score_key] = documentation_result[score_key]
+            continue
+        
+        scored = [result for result in chunk_results if score_key in result]
+        total_weight = sum(result.get('chunk_weight', 1) for result in scored)
+        if not total_weight:
+            combined_scores[score_key] = 5.0
+            continue
+        
+        combined_scores[score_key] = sum(
+            result[score_key] * result.get('chunk_weight', 1) for result in scored
+        ) / total_weight
     
     feedbacks = []
+    if documentation_result.get('feedback'):
+        feedbacks.append(f"Documentation & relevance: {documentation_result['feedback']}")
     
     for result in chunk_results:
-        weight = result.get('chunk_weight', 1) / total_weight
-        
-        for score_key in combined_scores:
-            combined_scores[score_key] += result.get(score_key, 5.0) * weight
-        
         if result.get('feedback'):
             feedbacks.append(f"Chunk {result.get('chunk_id', '?')}: {result['feedback']}")
     
     # Calculate overall score
     overall_score = sum(combined_scores.values()) / len(combined_scores)
     
+    # Sum token usage across all calls (fallback results carry none)
+    usage = {}
+    for result in chunk_results + [documentation_result]:
+        for key, value in (result.get('usage') or {}).items():
+            usage[key] = usage.get(key, 0) + value
+    
+    # Justifications: documentation call plus the largest chunk's code assessment
+    detailed_scores = {'note': 'Combined from multiple chunks'}
+    if chunk_results:
+        heaviest = max(chunk_results, key=lambda result: result.get('chunk_weight', 1))
+        detailed_scores.update(_load_detailed_scores(heaviest))
+    detailed_scores.update(_load_detailed_scores(documentation_result))
+    
     # Combine feedback
     combined_feedback = f"""
 Multi-chunk evaluation completed ({len(chunk_results)} chunks analyzed):
@@ -208,7 +607,16 @@ Multi-chunk evaluation completed ({len(chunk_results)} chunks analyzed):
         'productivity_score': round(combined_scores['productivity_score'], 1),
         'overall_score': round(overall_score, 1),
         'feedback': combined_feedback,
-        'detailed_scores': '{"note": "Combined from multiple chunks"}'
+        'detailed_scores': json.dumps(detailed_scores),
+        'usage': usage
     }
 
-
+def _load_detailed_scores(result):
+    """
+    Parse a result's detailed_scores JSON string, tolerating bad input
+    """
+    try:
+        detailed = json.loads(result.get('detailed_scores') or '{}')
+    except ValueError:
+        return {}
+    return detailed if isinstance(detailed, dict) else {}
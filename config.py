@@ -8,7 +8,25 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///evalai_new.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     UPLOAD_FOLDER = 'uploads'
+    SEARCH_INDEX_CODE = os.getenv('SEARCH_INDEX_CODE', 'false').lower() == 'true'  # Also full-text index extracted code (flask reindex-search after changing)
+    SEARCH_PAGE_SIZE = 20
+    SEARCH_MAX_PAGE_SIZE = 100
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', '2048'))  # Serialized result responses kept per process
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller responses are sent uncompressed
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Recommended part size for resumable uploads
+    BACKGROUND_EVALUATION_WORKERS = int(os.getenv('BACKGROUND_EVALUATION_WORKERS', '4'))  # Finalized uploads evaluated concurrently per process
+    UPLOAD_SESSION_TTL_HOURS = float(os.getenv('UPLOAD_SESSION_TTL_HOURS', '24'))  # Resumable uploads idle this long are expired
+    UPLOAD_RETENTION_DAYS = float(os.getenv('UPLOAD_RETENTION_DAYS', '30'))  # Raw uploads older than this are compacted (0 disables)
+    COMPACTION_MAX_BYTES = int(os.getenv('COMPACTION_MAX_BYTES', str(256 * 1024 * 1024)))  # Upload bytes compressed per maintenance pass; larger files are never compacted
+    COMPACTION_XZ_PRESET = 1  # Fast xz level: source uploads compress well even at low presets
+    MAINTENANCE_INTERVAL = int(os.getenv('MAINTENANCE_INTERVAL', '900'))  # Seconds between background GC passes (0 disables)
+    MAINTENANCE_BUDGET_SECONDS = float(os.getenv('MAINTENANCE_BUDGET_SECONDS', '10'))  # Max duration of one pass
+    MAINTENANCE_GRACE_SECONDS = 3600  # Folders/blobs younger than this are never treated as orphans
     MAX_CONTENT_LENGTH = 5 * 1024 * 1024 * 1024  # 5GB max file size
+    MAX_CODE_CONTENT_SIZE = int(os.getenv('MAX_CODE_CONTENT_SIZE', str(100 * 1024 * 1024)))  # Characters of code kept per submission; lowered further to fit SUBMISSION_MEMORY_CEILING_MB
+    SUBMISSION_MEMORY_CEILING_MB = int(os.getenv('SUBMISSION_MEMORY_CEILING_MB', '256'))  # Peak Python heap of one submission's extraction and evaluation (0 disables)
+    MEMORY_CEILING_FACTOR = 2.5  # Peak heap per byte of kept code: stored code_content + one transient copy + slack (checked by bench_memory.py)
+    MEMORY_CEILING_OVERHEAD_MB = 32  # Peak heap independent of code size
     ALLOWED_EXTENSIONS = {
         # Core programming languages
         'py', 'js', 'ts', 'jsx', 'tsx', 'java', 'cpp', 'c', 'h', 'hpp', 'cs', 'php', 'rb', 'go', 'rs', 'swift', 'kt', 'scala', 'r', 'matlab', 'm',
@@ -48,6 +66,7 @@ class Config:
     # EVALUATION_MODEL = 'opensource'  # 'opensource' (Llama-3-8B) or 'openai' (GPT-4) ⭐ USING OPENAI
     EVALUATION_MODEL = 'openai'  # 'opensource' (Llama-3-8B) or 'openai' (GPT-4) ⭐ USING OPENAI
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')  # Set in environment or .env file
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # Override for proxies or a local stub server
     EMBEDDING_MODEL = 'all-MiniLM-L6-v2'  # Can use 'microsoft/unixcoder-base' for code-specific
     CHUNK_SIZE = 512  # Token size for chunks
     CHUNK_OVERLAP = 128  # Overlap between chunks
@@ -60,4 +79,70 @@ class Config:
     LLM_MAX_TOKENS = 512  # Max tokens in response
     USE_QUANTIZATION = True  # Use 4-bit quantization (faster & uses ~4GB VRAM instead of 16GB)
 
+    # Startup
+    WARMUP_ON_READY = os.getenv('WARMUP_ON_READY', 'true').lower() == 'true'  # /api/ready initializes the evaluator
+
+    # Static analysis (CPU-side metrics computed before any LLM call)
+    STATIC_ANALYSIS_WORKERS = int(os.getenv('STATIC_ANALYSIS_WORKERS', '0'))  # 0 = one worker per core
+
+    # Adaptive (early-stopping) chunked evaluation
+    ADAPTIVE_CHUNKING = os.getenv('ADAPTIVE_CHUNKING', 'false').lower() == 'true'
+    ADAPTIVE_TOLERANCE = float(os.getenv('ADAPTIVE_TOLERANCE', '0.5'))  # Stop when every 95% interval is narrower than this (score points)
+    ADAPTIVE_MIN_CHUNKS = int(os.getenv('ADAPTIVE_MIN_CHUNKS', '5'))  # Always evaluate at least this many chunks
+    ADAPTIVE_MAX_CHUNK_CALLS = int(os.getenv('ADAPTIVE_MAX_CHUNK_CALLS', '60'))  # Hard cap on chunk calls per submission
+
+    # LLM budgets per submission (hackathon totals and overrides live on the Hackathon row); 0 = unlimited
+    SUBMISSION_TOKEN_BUDGET = int(os.getenv('SUBMISSION_TOKEN_BUDGET', '250000'))
+    SUBMISSION_CALL_BUDGET = int(os.getenv('SUBMISSION_CALL_BUDGET', '80'))
+    BUDGET_RESERVATION_TTL_SECONDS = int(os.getenv('BUDGET_RESERVATION_TTL_SECONDS', '3600'))  # Reservations of evaluations that never finished stop counting after this
+
+    # Dry-run estimates
+    ESTIMATE_CALL_SECONDS = float(os.getenv('ESTIMATE_CALL_SECONDS', '8'))  # Assumed call latency until enough calls have been observed
+
+    # LLM call deadlines and hedging
+    LLM_CALL_DEADLINE = float(os.getenv('LLM_CALL_DEADLINE', '120'))  # Seconds before a call is abandoned
+    LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', '0.95'))  # Hedge calls slower than this observed percentile
+    LLM_HEDGE_MAX_RATE = float(os.getenv('LLM_HEDGE_MAX_RATE', '0.1'))  # At most this fraction of calls get a hedge (0 disables hedging)
+    LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', '20'))  # Latency samples needed before hedging starts
+    LLM_HEDGE_POOL_SIZE = int(os.getenv('LLM_HEDGE_POOL_SIZE', '32'))  # Threads available for in-flight attempts
+
+    # Streaming and repair of LLM responses
+    LLM_STREAM_RESPONSES = os.getenv('LLM_STREAM_RESPONSES', 'true').lower() == 'true'  # Stream calls: partial output kept on disconnect
+    LLM_FIELD_RETRIES = int(os.getenv('LLM_FIELD_RETRIES', '1'))  # Follow-up calls asking only for the fields a response is missing
+    LLM_FIELD_RETRY_MAX_TOKENS = 600  # Completion limit of a follow-up (scores and feedback only)
+    LLM_FIELD_RETRY_RESERVE = float(os.getenv('LLM_FIELD_RETRY_RESERVE', '0.1'))  # Share of a budgeted evaluation's planned calls kept for follow-ups (at least one)
+
+    # Record/replay of LLM calls (offline benchmarks and regression runs)
+    LLM_CASSETTE_MODE = os.getenv('LLM_CASSETTE_MODE', 'off').lower()  # off, record (pass through and save) or replay (no network)
+    LLM_CASSETTE_PATH = os.getenv('LLM_CASSETTE_PATH', 'cassettes/llm_calls.jsonl')
+    LLM_CASSETTE_LATENCY_SCALE = float(os.getenv('LLM_CASSETTE_LATENCY_SCALE', '1.0'))  # Replayed latency multiplier (0 = instant)
+
+    # On-demand profiling (disabled unless an admin token is set)
+    PROFILING_ADMIN_TOKEN = os.getenv('PROFILING_ADMIN_TOKEN', '')  # X-Admin-Token for /api/debug/profiles and X-Profile requests
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER', 'profiles')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', '50'))  # Newest profiles kept on disk
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))  # Seconds between stack samples
+
+    # Admission control for POST /api/submissions (per process; 0 disables a check)
+    ADMISSION_MAX_INFLIGHT = int(os.getenv('ADMISSION_MAX_INFLIGHT', '6'))  # Evaluations running at once (request threads + background)
+    ADMISSION_MAX_QUEUED_TOKENS = int(os.getenv('ADMISSION_MAX_QUEUED_TOKENS', '2000000'))  # LLM tokens active evaluations still have to spend
+    ADMISSION_TOKENS_PER_CALL = int(os.getenv('ADMISSION_TOKENS_PER_CALL', '2000'))  # Estimate used to turn pending calls into tokens
+    ADMISSION_MIN_FREE_DISK_MB = int(os.getenv('ADMISSION_MIN_FREE_DISK_MB', '1024'))  # Free space kept on the upload volume
+    ADMISSION_DEFAULT_EVALUATION_SECONDS = 30  # Retry-After basis until evaluations have been timed
+    ADMISSION_MAX_RETRY_AFTER = 300  # Seconds
+    EVALUATION_ABANDON_SECONDS = int(os.getenv('EVALUATION_ABANDON_SECONDS', '3600'))  # A submission 'processing' longer than this lost its worker; a retry takes over its idempotency key
+
+    # Git repository submissions (POST /api/hackathon/<id>/submit/github)
+    GIT_BINARY = os.getenv('GIT_BINARY', 'git')
+    GIT_LOCAL_ROOTS = [root for root in os.getenv('GIT_LOCAL_ROOTS', '').split(os.pathsep) if root]  # Directories local repositories and bundles may be submitted from (none by default)
+    GIT_REMOTE_HOSTS = {host.strip().lower() for host in os.getenv('GIT_REMOTE_HOSTS', 'github.com').split(',') if host.strip()}  # https hosts repositories may be fetched from
+    GIT_CACHE_FOLDER = os.getenv('GIT_CACHE_FOLDER', 'repositories')  # Bare mirrors of fetched bundles and remotes
+    GIT_COMMAND_TIMEOUT = int(os.getenv('GIT_COMMAND_TIMEOUT', '120'))  # Seconds per git command
+
+    # Fair-share scheduling of LLM calls across concurrent submissions (per process)
+    LLM_MAX_CONCURRENT_CALLS = int(os.getenv('LLM_MAX_CONCURRENT_CALLS', '16'))  # Call slots shared by all submissions
+    LLM_CHUNK_CONCURRENCY = int(os.getenv('LLM_CHUNK_CONCURRENCY', '8'))  # Chunk calls one submission keeps in flight
+    LLM_SMALL_JOB_CALLS = 3  # Submissions expected to need at most this many calls count as small
+    LLM_SMALL_JOB_WEIGHT = float(os.getenv('LLM_SMALL_JOB_WEIGHT', '4'))  # Fair-share weight of small submissions
+
 
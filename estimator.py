@@ -0,0 +1,92 @@
+"""
+Dry-run capacity planning: cost and latency projections without LLM calls
+
+AIEvaluator.plan_submission produces the calls one submission would make;
+this module turns plans into wall-clock projections and collects sample
+archives from disk for workload-level estimates.
+"""
+
+import math
+import os
+from config import Config
+from utils import allowed_file
+
+
+def default_call_seconds(evaluator=None):
+    """Median observed call latency of the live evaluator, else the configured guess"""
+    completions = getattr(evaluator, 'completions', None)
+    if completions is not None:
+        latency = completions.stats()['call_latency']
+        if latency.get('count', 0) >= Config.LLM_HEDGE_MIN_SAMPLES and latency.get('p50'):
+            return latency['p50']
+    return Config.ESTIMATE_CALL_SECONDS
+
+
+def plan_calls(plan):
+    """Calls of a plan, follow-ups for incomplete responses included"""
+    return plan['llm_calls'] + plan.get('field_retry_calls', 0)
+
+
+def submission_seconds(plan, concurrency, call_seconds):
+    """Wall-clock of one submission: its calls in waves of the usable parallelism"""
+    parallel = max(1, min(plan['max_parallel_calls'], concurrency))
+    return math.ceil(plan_calls(plan) / parallel) * call_seconds
+
+
+def project_workload(plans, concurrency, call_seconds):
+    """
+    Totals and projected wall-clock for a set of submissions arriving together
+
+    Args:
+        plans (list): plan_submission results
+        concurrency (int): LLM call slots available (LLM_MAX_CONCURRENT_CALLS x workers)
+        call_seconds (float): Latency of one call
+
+    Returns:
+        dict: Summed calls (field-retry allowance included)/tokens and projected seconds (slot-bound or longest-submission-bound)
+    """
+    concurrency = max(1, concurrency)
+    total_calls = sum(plan_calls(plan) for plan in plans)
+    longest = max((submission_seconds(plan, concurrency, call_seconds) for plan in plans), default=0)
+    return {
+        'submissions': len(plans),
+        'llm_calls': total_calls,
+        'input_tokens': sum(plan['input_tokens'] for plan in plans),
+        'output_tokens': sum(plan['output_tokens'] for plan in plans),
+        'field_retry_calls': sum(plan.get('field_retry_calls', 0) for plan in plans),
+        'field_retry_tokens': sum(plan.get('field_retry_tokens', 0) for plan in plans),
+        'chunks_total': sum(plan['chunks_total'] for plan in plans),
+        'degraded_submissions': sum(1 for plan in plans if plan['degradation_level']),
+        'budget_exhausted_submissions': sum(1 for plan in plans if plan.get('budget_exhausted')),
+        'concurrency': concurrency,
+        'call_seconds': round(call_seconds, 3),
+        'projected_seconds': round(max(math.ceil(total_calls / concurrency) * call_seconds, longest), 1)
+    }
+
+
+def collect_samples(path):
+    """
+    Group files under path into sample submissions
+
+    A file is one submission; in a directory, every uploadable file is one
+    submission and every sub-directory (all files inside it) is one more.
+
+    Returns:
+        list: (name, [file paths]) pairs
+    """
+    if os.path.isfile(path):
+        return [(os.path.basename(path), [path])]
+
+    samples = []
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.is_file() and allowed_file(entry.name):
+            samples.append((entry.name, [entry.path]))
+        elif entry.is_dir():
+            files = [
+                os.path.join(root, name)
+                for root, _, names in os.walk(entry.path)
+                for name in sorted(names) if allowed_file(name)
+            ]
+            if files:
+                samples.append((entry.name, files))
+    return samples
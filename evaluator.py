@@ -2,51 +2,411 @@ import os
 import openai
 from openai import OpenAI
 import json
-import re
+import math
+import contextvars
+import functools
+import hashlib
+import itertools
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
-from chunking_utils import chunk_code_content, combine_chunk_evaluations, create_chunk_summary
+from chunking_utils import (
+    chunk_code_content, combine_chunk_evaluations, create_chunk_summary,
+    prioritize_chunks, RunningScoreEstimate
+)
+from static_analysis import format_metrics_summary
+from llm_client import HedgedCompletions
+from llm_stream import StreamingCompletions, extract_json_fields
+from cassette import cassette_completions
+from scheduler import llm_scheduler
+from admission import BudgetExhausted
+
+# Rough token accounting for budget planning (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+ESTIMATED_COMPLETION_TOKENS = 600
+
+# Budget degradation levels, recorded on each Evaluation
+DEGRADATION_LEVELS = {
+    0: 'full',
+    1: 'fewer_chunks',
+    2: 'priority_files_only',
+    3: 'truncated_single_call'
+}
+BUDGET_MIN_CHUNKS = 3  # Fewer sampled chunks than this is not worth it: fall back to priority files
+PREFIX_CACHE_SIZE = 64  # Prompt prefixes kept (one per hackathon context and prompt mode)
+
+
+# ChunkResultCache of the evaluation running in this context (copied into the chunk threads)
+_result_cache = contextvars.ContextVar('result_cache', default=None)
+# Follow-up calls the budget still allows this evaluation (Semaphore; None = unlimited)
+_field_retries = contextvars.ContextVar('field_retries', default=None)
+
+SYSTEM_PROMPT = "You are a STRICT technical evaluator and hackathon judge. You must be critical, use the full scoring range 0-10, and provide differentiated scores. DO NOT give grade inflation. Most projects should score in the 4-7 range. Be harsh but fair."
+
+# Static parts of every evaluation prompt. Keep them first and byte-stable so
+# the provider can serve them from its prompt prefix cache.
+RUBRIC_HEADER = """
+# STRICT Hackathon Evaluation - NO GRADE INFLATION
+
+## CRITICAL EVALUATION INSTRUCTIONS
+
+You are a STRICT technical evaluator. Use the FULL range of scores 0-10. DO NOT give similar scores to different projects.
+
+### SCORING GUIDELINES (BE HARSH AND REALISTIC):
+
+**0-2: Poor/Failing**
+- Major issues, non-functional, or completely irrelevant
+- Severe security vulnerabilities or broken code
+- No documentation or completely unclear
+
+**3-4: Below Average**
+- Basic functionality but significant flaws
+- Poor code quality, structure, or practices
+- Minimal effort or incomplete implementation
+
+**5-6: Average/Acceptable**
+- Works as intended with minor issues
+- Standard implementation, nothing special
+- Adequate documentation and code quality
+
+**7-8: Good/Above Average**
+- Well-implemented with good practices
+- Shows clear understanding and effort
+- Good documentation and structure
+
+**9-10: Excellent/Outstanding**
+- Exceptional quality, innovative approach
+- Production-ready code with best practices
+- Comprehensive documentation and testing
+"""
+
+MANDATORY_REQUIREMENTS = """
+## MANDATORY REQUIREMENTS:
+- VARY your scores significantly between projects
+- Use decimals (e.g., 3.2, 6.7, 8.1) for precision
+- Be CRITICAL and identify real weaknesses
+- NO GRADE INFLATION - most projects should score 4-7 range
+- Only exceptional projects deserve 8-10
+- Don't hesitate to give low scores (1-3) for poor work
+"""
+
+RUBRIC_TRAILER = """
+The hackathon context follows, then the submission to evaluate (always last).
+"""
+
+EVALUATION_RUBRIC = RUBRIC_HEADER + """
+## STRICT EVALUATION CRITERIA:
+
+1. **Relevance (0-10)**: Does it ACTUALLY solve the problem stated? Is it directly related to the theme?
+2. **Technical Complexity (0-10)**: How sophisticated is the implementation? Rate based on actual technical depth, not just lines of code.
+3. **Creativity (0-10)**: Is this a unique approach or just a standard tutorial implementation?
+4. **Documentation (0-10)**: Is there proper README, comments, setup instructions? Can someone else run this?
+5. **Productivity (0-10)**: Code organization, error handling, scalability, maintainability.
+
+## ADDITIONAL KEY-POINT ANALYSIS (brief, 1-2 sentences each):
+- Out of the box thinking: How original/novel is the approach?
+- Problem-solving skills: How effectively does the code decompose and solve the problem?
+- Research capabilities: Evidence of learning, citations, comparisons, benchmarking, or exploration
+- Understanding the business: Does it align with real user/business needs and constraints?
+- Use of non-famous tools or frameworks: Any lesser-known tech used purposefully
+""" + MANDATORY_REQUIREMENTS + """
+## Response Format (STRICT JSON):
+
+```json
+{
+  "relevance_score": <precise score 0-10 with 1 decimal>,
+  "technical_complexity_score": <precise score 0-10 with 1 decimal>,
+  "creativity_score": <precise score 0-10 with 1 decimal>,
+  "documentation_score": <precise score 0-10 with 1 decimal>,
+  "productivity_score": <precise score 0-10 with 1 decimal>,
+  "overall_score": <calculated average with 1 decimal>,
+  "feedback": "<HONEST, CRITICAL feedback. Point out specific flaws, missing features, and areas for improvement. Don't sugarcoat.>",
+  "detailed_scores": {
+    "relevance_justification": "<specific reasons for this score>",
+    "technical_justification": "<specific technical assessment>",
+    "creativity_justification": "<specific creativity assessment>",
+    "documentation_justification": "<specific documentation assessment>",
+    "productivity_justification": "<specific code quality assessment>",
+
+    "out_of_box_thinking": "<1-2 sentence assessment>",
+    "problem_solving_skills": "<1-2 sentence assessment>",
+    "research_capabilities": "<1-2 sentence assessment>",
+    "business_understanding": "<1-2 sentence assessment>",
+    "non_famous_tools_usage": "<1-2 sentence assessment>"
+  }
+}
+```
+""" + RUBRIC_TRAILER
+
+# Code chunks are judged on code-centric criteria only; documentation and
+# relevance are scored once per submission (see DOCUMENTATION_RUBRIC).
+CODE_RUBRIC = RUBRIC_HEADER + """
+## STRICT EVALUATION CRITERIA (CODE EXCERPT ONLY):
+
+You are shown ONE excerpt of a larger codebase. Judge only what the code shows; documentation and theme relevance are assessed separately.
+
+1. **Technical Complexity (0-10)**: How sophisticated is the implementation? Rate based on actual technical depth, not just lines of code.
+2. **Creativity (0-10)**: Is this a unique approach or just a standard tutorial implementation?
+3. **Productivity (0-10)**: Code organization, error handling, scalability, maintainability.
+
+## ADDITIONAL KEY-POINT ANALYSIS (brief, 1-2 sentences each):
+- Out of the box thinking: How original/novel is the approach?
+- Problem-solving skills: How effectively does the code decompose and solve the problem?
+- Use of non-famous tools or frameworks: Any lesser-known tech used purposefully
+""" + MANDATORY_REQUIREMENTS + """
+## Response Format (STRICT JSON):
+
+```json
+{
+  "technical_complexity_score": <precise score 0-10 with 1 decimal>,
+  "creativity_score": <precise score 0-10 with 1 decimal>,
+  "productivity_score": <precise score 0-10 with 1 decimal>,
+  "feedback": "<HONEST, CRITICAL feedback on this code. Point out specific flaws. Don't sugarcoat.>",
+  "detailed_scores": {
+    "technical_justification": "<specific technical assessment>",
+    "creativity_justification": "<specific creativity assessment>",
+    "productivity_justification": "<specific code quality assessment>",
+
+    "out_of_box_thinking": "<1-2 sentence assessment>",
+    "problem_solving_skills": "<1-2 sentence assessment>",
+    "non_famous_tools_usage": "<1-2 sentence assessment>"
+  }
+}
+```
+""" + RUBRIC_TRAILER
+
+DOCUMENTATION_RUBRIC = RUBRIC_HEADER + """
+## STRICT EVALUATION CRITERIA (PROJECT DOCUMENTATION):
+
+You are shown the project's description, documentation and objective metrics for the whole codebase. Code quality is assessed separately.
+
+1. **Relevance (0-10)**: Does it ACTUALLY solve the problem stated? Is it directly related to the theme?
+2. **Documentation (0-10)**: Is there proper README, comments, setup instructions? Can someone else run this?
+
+## ADDITIONAL KEY-POINT ANALYSIS (brief, 1-2 sentences each):
+- Research capabilities: Evidence of learning, citations, comparisons, benchmarking, or exploration
+- Understanding the business: Does it align with real user/business needs and constraints?
+""" + MANDATORY_REQUIREMENTS + """
+## Response Format (STRICT JSON):
+
+```json
+{
+  "relevance_score": <precise score 0-10 with 1 decimal>,
+  "documentation_score": <precise score 0-10 with 1 decimal>,
+  "feedback": "<HONEST, CRITICAL feedback on relevance and documentation. Don't sugarcoat.>",
+  "detailed_scores": {
+    "relevance_justification": "<specific reasons for this score>",
+    "documentation_justification": "<specific documentation assessment>",
+
+    "research_capabilities": "<1-2 sentence assessment>",
+    "business_understanding": "<1-2 sentence assessment>"
+  }
+}
+```
+""" + RUBRIC_TRAILER
+
+RUBRICS = {
+    'full': EVALUATION_RUBRIC,
+    'code': CODE_RUBRIC,
+    'documentation': DOCUMENTATION_RUBRIC
+}
+
+# Score keys each prompt mode is expected to return
+SCORE_KEYS = {
+    'full': ['relevance_score', 'technical_complexity_score', 'creativity_score', 'documentation_score', 'productivity_score'],
+    'code': ['technical_complexity_score', 'creativity_score', 'productivity_score'],
+    'documentation': ['relevance_score', 'documentation_score']
+}
+
+@functools.lru_cache(maxsize=PREFIX_CACHE_SIZE)
+def _prompt_prefix(mode, name, description, evaluation_prompt):
+    """
+    Static rubric + JSON schema followed by the hackathon context, built once per context (LRU-bounded)
+    """
+    return RUBRICS[mode] + f"""
+## Hackathon Information
+**Name**: {name}
+**Theme/Description**: {description}
+
+## Hackathon-Specific Evaluation Criteria
+{evaluation_prompt}
+"""
+
 
 class AIEvaluator:
-    def __init__(self):
+    def __init__(self, offline=False):
+        """
+        offline=True builds no client: the instance can plan and estimate
+        evaluations (prompts, chunks, budgets) but never calls the LLM.
+        """
         self.model = Config.EVALUATION_MODEL
-        if self.model == 'openai':
+        self.scheduler = llm_scheduler  # Fair share of LLM call slots across submissions
+        self.streaming = None  # StreamingCompletions under the cassette, when streaming is on
+        self.response_stats = Counter()  # How responses were parsed: json, repaired, partial, field_retries, ...
+        self._stats_lock = threading.Lock()
+        if self.model == 'openai' and not offline and Config.LLM_CASSETTE_MODE == 'replay':
+            # Recorded responses stand in for the provider: no client, no API key
+            self.client = None
+            self.completions = HedgedCompletions(cassette_completions(
+                None, 'replay', Config.LLM_CASSETTE_PATH, Config.LLM_CASSETTE_LATENCY_SCALE))
+            print(f"📼 Replaying LLM calls from {Config.LLM_CASSETTE_PATH}")
+        elif self.model == 'openai' and not offline:
             # Set API key for OpenAI
             if not Config.OPENAI_API_KEY:
                 raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY in your environment or .env file.")
             
             try:
                 # Initialize OpenAI client (v1.0+ style)
-                self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+                self.client = OpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL)
+                completions = self.client.chat.completions
+                if Config.LLM_STREAM_RESPONSES:
+                    # Streamed, then reassembled: the layers above see plain ChatCompletions
+                    self.streaming = completions = StreamingCompletions(completions)
+                # Deadlines + hedging around every chat completion (recorded to a cassette if enabled)
+                self.completions = HedgedCompletions(cassette_completions(
+                    completions, Config.LLM_CASSETTE_MODE, Config.LLM_CASSETTE_PATH))
+                if Config.LLM_CASSETTE_MODE == 'record':
+                    print(f"📼 Recording LLM calls to {Config.LLM_CASSETTE_PATH}")
                 print("✅ OpenAI client initialized successfully")
             except Exception as e:
                 print(f"❌ Error initializing OpenAI client: {e}")
                 raise e
     
-    def evaluate_submission(self, submission, hackathon):
+    def evaluate_submission(self, submission, hackathon, budget=None, result_cache=None, reserve=None):
         """
         Evaluate a submission based on the hackathon criteria
+
+        budget ({'tokens': int or None, 'calls': int or None}) limits the LLM
+        work; when the full evaluation would not fit, it degrades to fewer
+        chunks, then priority files only, then one truncated call. When not
+        even that call fits, BudgetExhausted is raised before any call.
+
+        result_cache (ChunkResultCache) answers calls whose content was
+        already evaluated for an earlier version of the project, and keeps
+        the chunk layout and results of this one.
+
+        reserve(tokens, calls) is given the planned spend, field-retry
+        allowance included, before the first call; returning False (the
+        hackathon totals are taken) raises BudgetExhausted.
         """
+        if self.model == 'openai' and result_cache is not None:
+            token = _result_cache.set(result_cache)
+            try:
+                result = self.evaluate_submission(submission, hackathon, budget, reserve=reserve)
+            finally:
+                _result_cache.reset(token)
+            result['result_cache'] = result_cache.summary()
+            return result
         if self.model == 'openai':
             # Check if content is too large and needs chunking
-            code_content = submission.code_content or ""
-            doc_content = submission.documentation_content or ""
-            total_content = code_content + doc_content
+            # Lengths only: a large submission is never copied into one combined string
+            code_length = len(submission.code_content or "")
+            total_length = code_length + len(submission.documentation_content or "")
             
-            # If content is large, use chunked evaluation
-            if len(total_content) > 3000:  # 3K characters threshold (force chunking earlier)
-                print(f"📊 Large content detected ({len(total_content):,} chars), using chunked evaluation...")
-                return self._evaluate_with_chunking(submission, hackathon)
-            else:
-                print(f"📊 Standard evaluation for content ({len(total_content):,} chars)...")
-                return self._evaluate_with_openai(submission, hackathon)
+            budget = budget or {'tokens': None, 'calls': None}
+            chunked = total_length > 3000  # 3K characters threshold (force chunking earlier)
+            retries_token = _field_retries.set(None)
+            try:
+                if not chunked:
+                    self._reserve(reserve, self._plan_single_call(submission, hackathon, budget), budget)
+                expected_calls = 1 + math.ceil(code_length / 4000) if chunked else 1
+                if budget['calls'] is not None:
+                    expected_calls = min(expected_calls, max(1, budget['calls']))
+                
+                with self.scheduler.job(getattr(submission, 'id', None), getattr(hackathon, 'id', None), expected_calls) as job:
+                    # If content is large, use chunked evaluation
+                    if chunked:
+                        print(f"📊 Large content detected ({total_length:,} chars), using chunked evaluation...")
+                        result = self._evaluate_with_chunking(submission, hackathon, budget, reserve)
+                    else:
+                        print(f"📊 Standard evaluation for content ({total_length:,} chars)...")
+                        result = self._evaluate_with_openai(submission, hackathon)
+                        result['degradation_level'] = 0
+            finally:
+                _field_retries.reset(retries_token)
+            
+            result['budget'] = budget
+            result['scheduling'] = job.summary()
+            return result
         else:
             return self._evaluate_with_unixcoder(submission, hackathon)
     
-    def _evaluate_with_openai(self, submission, hackathon):
+    def plan_submission(self, submission, hackathon, budget=None):
+        """
+        Dry run of evaluate_submission: the calls it would make, without making them
+
+        Follows the same chunking threshold, chunker, budget degradation and
+        prompt builders, and estimates tokens from the prompts themselves.
+
+        Returns:
+            dict: chunks_total, chunks_planned, degradation_level, llm_calls,
+                  input/output token estimates and the per-call fan-out
+        """
+        code_content = submission.code_content or ""
+        total_length = len(code_content) + len(submission.documentation_content or "")
+        plan = {'chunks_total': 0, 'chunks_planned': 0, 'degradation_level': 0, 'adaptive_max_chunk_calls': None,
+                'budget_exhausted': False}
+        
+        # Token estimates are taken one prompt at a time; the prompts are not kept
+        parallel = 1
+        if total_length <= 3000:
+            try:
+                self._plan_single_call(submission, hackathon, budget)
+                prompts = [self._build_evaluation_prompt(submission, hackathon)]
+            except BudgetExhausted:
+                plan['budget_exhausted'] = True
+                prompts = []
+        else:
+            chunks = chunk_code_content(code_content, max_chunk_size=4000)
+            level, planned, _ = self._plan_within_budget(submission, hackathon, chunks, budget)
+            plan.update(chunks_total=len(chunks), chunks_planned=len(planned), degradation_level=level)
+            if level is None:
+                plan['budget_exhausted'] = True
+                prompts = []
+            elif level == 3:
+                prompts = [self._build_evaluation_prompt(self._truncated_submission(submission), hackathon)]
+            else:
+                prompts = itertools.chain([self._build_evaluation_prompt(submission, hackathon, 'documentation')], (
+                    self._build_evaluation_prompt(self._chunk_submission(submission, chunk, i), hackathon, 'code')
+                    for i, chunk in enumerate(planned, 1)
+                ))
+                parallel = max(1, Config.LLM_CHUNK_CONCURRENCY)
+                if Config.ADAPTIVE_CHUNKING and len(planned) > Config.ADAPTIVE_MIN_CHUNKS:
+                    # Upper bound: adaptive mode may stop well before this
+                    plan['adaptive_max_chunk_calls'] = min(len(planned), Config.ADAPTIVE_MAX_CHUNK_CALLS)
+        
+        input_tokens = [self._estimate_call_tokens(prompt) - ESTIMATED_COMPLETION_TOKENS for prompt in prompts]
+        output_tokens = len(input_tokens) * ESTIMATED_COMPLETION_TOKENS
+        # Follow-ups for incomplete responses: the allowance a budgeted evaluation keeps for them
+        retry_tokens, retry_calls = self._retry_allowance((sum(input_tokens) + output_tokens, len(input_tokens)),
+                                                          self._budget_limits(budget))
+        plan.update(
+            llm_calls=len(input_tokens),
+            input_tokens=sum(input_tokens),
+            output_tokens=output_tokens,
+            field_retry_calls=retry_calls,
+            field_retry_tokens=retry_tokens,
+            max_parallel_calls=min(parallel, len(input_tokens))
+        )
+        return plan
+    
+    def _evaluate_with_openai(self, submission, hackathon, mode='full'):
         """
         Use OpenAI GPT-4 to evaluate the submission
+
+        mode selects the rubric: 'full' (all criteria), 'code' (code-centric
+        criteria for one chunk) or 'documentation' (relevance + documentation).
         """
-        evaluation_prompt = self._build_evaluation_prompt(submission, hackathon)
+        result_cache = _result_cache.get()
+        if result_cache is not None:
+            cache_key = self._result_key(submission, hackathon, mode)
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                print(f"♻️ Content unchanged since the previous version: reusing its {mode} result")
+                return cached
+        
+        evaluation_prompt = self._build_evaluation_prompt(submission, hackathon, mode)
         
         print("📋 EVALUATION PROMPT BEING SENT:")
         print("=" * 60)
@@ -57,18 +417,21 @@ class AIEvaluator:
             print("🚀 Sending request to OpenAI GPT-4o...")
             print(f"📝 Evaluation prompt length: {len(evaluation_prompt)} characters")
             
-            # Use OpenAI client to generate evaluation
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # Using GPT-4o for best quality and speed
-                messages=[
-                    {"role": "system", "content": "You are a STRICT technical evaluator and hackathon judge. You must be critical, use the full scoring range 0-10, and provide differentiated scores. DO NOT give grade inflation. Most projects should score in the 4-7 range. Be harsh but fair."},
-                    {"role": "user", "content": evaluation_prompt}
-                ],
-                temperature=0.1,  # Lower temperature for more consistent, strict evaluation
-                max_tokens=2000
-            )
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": evaluation_prompt}
+            ]
+            # Use OpenAI client to generate evaluation (waits for a fair-share call slot)
+            with self.scheduler.slot():
+                response = self.completions.create(
+                    model="gpt-4o",  # Using GPT-4o for best quality and speed
+                    messages=messages,
+                    temperature=0.1,  # Lower temperature for more consistent, strict evaluation
+                    max_tokens=2000
+                )
             
             result_text = response.choices[0].message.content
+            usage = self._extract_usage(response)
             print("✅ OpenAI Response received!")
             print("=" * 80)
             print("🤖 OPENAI GPT-4o RESPONSE:")
@@ -76,9 +439,28 @@ class AIEvaluator:
             print(result_text)
             print("=" * 80)
             print(f"📊 Response length: {len(result_text)} characters")
-            print(f"💰 Tokens used: {response.usage.total_tokens if hasattr(response, 'usage') else 'Unknown'}")
+            print(f"💰 Tokens used: {usage['total_tokens']} (prompt {usage['prompt_tokens']}, "
+                  f"cached {usage['cached_prompt_tokens']}, completion {usage['completion_tokens']})")
+            
+            fields = self._parse_response_fields(result_text, response)
+            missing = self._missing_fields(fields, mode)
+            retries = _field_retries.get()
+            for _ in range(Config.LLM_FIELD_RETRIES if missing else 0):
+                if retries is not None and not retries.acquire(blocking=False):
+                    print(f"💸 Budget allows no more follow-up calls: {', '.join(missing)} left missing")
+                    self._count_response('field_retries_skipped')
+                    break
+                retried_fields, retry_usage = self._request_missing_fields(messages, result_text, missing)
+                fields.update(retried_fields)
+                usage = {key: usage[key] + retry_usage[key] for key in usage}
+                missing = self._missing_fields(fields, mode)
+                if not missing:
+                    break
             
-            parsed_result = self._parse_evaluation_result(result_text)
+            parsed_result = self._parse_evaluation_result(fields, mode)
+            parsed_result['usage'] = usage
+            if result_cache is not None and not missing:
+                result_cache.put(cache_key, parsed_result)
             print("✅ Response parsed successfully!")
             print(f"📈 Parsed scores: {parsed_result}")
             
@@ -87,76 +469,333 @@ class AIEvaluator:
         except Exception as e:
             print(f"❌ Error in OpenAI evaluation: {str(e)}")
             print("🔄 Falling back to default scores...")
-            return self._generate_fallback_scores()
+            return self._generate_fallback_scores(mode)
     
-    def _evaluate_with_chunking(self, submission, hackathon):
+    def _evaluate_with_chunking(self, submission, hackathon, budget=None, reserve=None):
         """
         Evaluate large submissions by chunking the content
+
+        Documentation and relevance are scored once per submission in a
+        dedicated call; code chunks are scored on code-centric criteria only.
+        An error falls back to one truncated call, recorded as `fallback`.
         """
+        level = 0
         try:
             # Chunk the code content
             code_content = submission.code_content or ""
-            chunks = chunk_code_content(code_content, max_chunk_size=4000)
+            result_cache = _result_cache.get()
+            all_chunks = chunk_code_content(code_content, max_chunk_size=4000,
+                                            previous_layout=result_cache.previous_layout if result_cache else None)
+            if result_cache is not None:
+                result_cache.layout = [chunk['sections'] for chunk in all_chunks]
             
-            print(f"📦 Created {len(chunks)} chunks for evaluation")
-            print(create_chunk_summary(chunks))
+            print(f"📦 Created {len(all_chunks)} chunks for evaluation")
+            print(create_chunk_summary(all_chunks))
+            
+            # Fit the work into the budget before spending anything
+            level, chunks, spend = self._plan_within_budget(submission, hackathon, all_chunks, budget)
+            if level is None:
+                print(f"💸 Budget {budget} cannot cover a single call: not evaluating")
+                raise BudgetExhausted(budget)
+            self._reserve(reserve, spend, budget)
+            if level == 3:
+                print(f"💸 Budget {budget} too small for chunked evaluation: one truncated call")
+                result = self._evaluate_with_openai_truncated(submission, hackathon)
+                result.update(chunks_total=len(all_chunks), chunks_evaluated=0, degradation_level=3)
+                return result
+            if level:
+                print(f"💸 Budget {budget}: degrading to level {level} ({DEGRADATION_LEVELS[level]}), "
+                      f"{len(chunks)}/{len(all_chunks)} chunks")
             
             chunk_results = []
             
-            for i, chunk in enumerate(chunks, 1):
-                print(f"🔍 Evaluating chunk {i}/{len(chunks)} ({chunk['size']:,} chars)...")
-                
-                # Create a temporary submission object for this chunk
-                chunk_submission = type('ChunkSubmission', (), {
-                    'code_content': chunk['content'],
-                    'documentation_content': submission.documentation_content or "",
-                    'project_name': f"{submission.project_name} (Chunk {i})",
-                    'project_description': submission.project_description,
-                    'team_name': submission.team_name,
-                    'participant_email': submission.participant_email
-                })()
-                
-                # Evaluate this chunk
-                chunk_result = self._evaluate_with_openai(chunk_submission, hackathon)
-                
-                # Add chunk metadata
-                chunk_result['chunk_id'] = i
-                chunk_result['chunk_weight'] = chunk['size']  # Weight by content size
+            # Adaptive mode: priority order + stop once the per-criterion interval is tight enough
+            adaptive = Config.ADAPTIVE_CHUNKING and len(chunks) > Config.ADAPTIVE_MIN_CHUNKS
+            if adaptive:
+                chunks = prioritize_chunks(chunks)
+                estimate = RunningScoreEstimate(SCORE_KEYS['code'], sum(chunk['size'] for chunk in all_chunks))
+                print(f"🎲 Adaptive chunk evaluation: tolerance {Config.ADAPTIVE_TOLERANCE}, "
+                      f"max {Config.ADAPTIVE_MAX_CHUNK_CALLS} calls")
+            stop_reason = 'exhausted'
+            
+            # Calls fan out to a per-submission pool; the scheduler decides whose call runs next
+            concurrency = max(1, Config.LLM_CHUNK_CONCURRENCY)
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='chunk-eval') as pool:
+                # Score documentation/relevance once instead of re-sending the README with every chunk
+                print("📄 Evaluating documentation and relevance...")
+                documentation_future = pool.submit(contextvars.copy_context().run, self._evaluate_with_openai,
+                                                   submission, hackathon, 'documentation')
                 
-                chunk_results.append(chunk_result)
+                # Non-adaptive: everything at once. Adaptive: batches, re-checking convergence between them
+                next_index = 0
+                while next_index < len(chunks):
+                    batch_size = len(chunks) - next_index
+                    if adaptive:
+                        batch_size = min(batch_size, concurrency, Config.ADAPTIVE_MAX_CHUNK_CALLS - next_index)
+                    batch = list(enumerate(chunks[next_index:next_index + batch_size], next_index + 1))
+                    futures = [
+                        pool.submit(contextvars.copy_context().run, self._evaluate_chunk, submission, hackathon, chunk, i)
+                        for i, chunk in batch
+                    ]
+                    next_index += batch_size
+                    
+                    for (i, chunk), future in zip(batch, futures):
+                        chunk_result = future.result()
+                        chunk_results.append(chunk_result)
+                        print(f"✅ Chunk {i}/{len(chunks)} evaluated: {chunk_result['overall_score']}/10")
+                        if adaptive:
+                            estimate.add(chunk_result, chunk['size'])
+                    
+                    if adaptive:
+                        width = estimate.max_width()
+                        evaluated = len(chunk_results)
+                        remaining = len(chunks) - evaluated
+                        if remaining and evaluated >= Config.ADAPTIVE_MIN_CHUNKS and width <= Config.ADAPTIVE_TOLERANCE:
+                            stop_reason = 'converged'
+                        elif remaining and evaluated >= Config.ADAPTIVE_MAX_CHUNK_CALLS:
+                            stop_reason = 'call_budget'
+                        if stop_reason != 'exhausted':
+                            print(f"⏹️ Stopping early after {evaluated}/{len(chunks)} chunks ({stop_reason}, interval width {width:.2f})")
+                            break
                 
-                print(f"✅ Chunk {i} evaluated: {chunk_result['overall_score']}/10")
+                documentation_result = documentation_future.result()
             
             # Combine results from all chunks
             print("🔄 Combining results from all chunks...")
-            combined_result = combine_chunk_evaluations(chunk_results)
+            combined_result = combine_chunk_evaluations(chunk_results, documentation_result)
+            combined_result['chunks_total'] = len(all_chunks)
+            combined_result['chunks_evaluated'] = len(chunk_results)
+            combined_result['degradation_level'] = level
+            if adaptive:
+                combined_result['chunk_stop_reason'] = stop_reason
+                combined_result['chunk_intervals'] = estimate.summary()
             
+            usage = combined_result.get('usage')
+            if usage:
+                print(f"💰 Chunked evaluation used {usage['total_tokens']:,} tokens over {usage['calls']} calls "
+                      f"({usage['cached_prompt_tokens']:,}/{usage['prompt_tokens']:,} prompt tokens cached)")
             print(f"🎯 Final combined score: {combined_result['overall_score']}/10")
             return combined_result
             
+        except BudgetExhausted:
+            raise
         except Exception as e:
             print(f"❌ Error in chunked evaluation: {str(e)}")
             print("🔄 Falling back to standard evaluation...")
             # Fallback to standard evaluation with truncated content
-            return self._evaluate_with_openai_truncated(submission, hackathon)
+            result = self._evaluate_with_openai_truncated(submission, hackathon)
+            result['degradation_level'] = level  # What the budget allowed, not what the error forced
+            result['fallback'] = str(e) or type(e).__name__
+            return result
     
-    def _evaluate_with_openai_truncated(self, submission, hackathon):
+    def _evaluate_chunk(self, submission, hackathon, chunk, index):
         """
-        Evaluate with truncated content as fallback
+        Score one code chunk with the code-centric rubric
+        """
+        print(f"🔍 Evaluating chunk {index} ({chunk['size']:,} chars)...")
+        
+        chunk_submission = self._chunk_submission(submission, chunk, index)
+        chunk_result = self._evaluate_with_openai(chunk_submission, hackathon, mode='code')
+        
+        # Add chunk metadata
+        chunk_result['chunk_id'] = index
+        chunk_result['chunk_weight'] = chunk['size']  # Weight by content size
+        return chunk_result
+    
+    def _truncated_submission(self, submission):
+        """
+        Submission view with content cut to a single-call size
         """
         # Truncate content to manageable size
         code_content = (submission.code_content or "")[:4000]
         doc_content = (submission.documentation_content or "")[:2000]
         
-        # Create truncated submission
-        truncated_submission = type('TruncatedSubmission', (), {
+        return type('TruncatedSubmission', (), {
             'code_content': code_content,
             'documentation_content': doc_content,
             'project_name': submission.project_name,
             'project_description': submission.project_description,
             'team_name': submission.team_name,
-            'participant_email': submission.participant_email
+            'participant_email': submission.participant_email,
+            'static_metrics': getattr(submission, 'static_metrics', None)
+        })()
+    
+    def _chunk_submission(self, submission, chunk, index):
+        """
+        Create a temporary submission object for one chunk
+        """
+        return type('ChunkSubmission', (), {
+            'code_content': chunk['content'],
+            'documentation_content': "",
+            'project_name': f"{submission.project_name} (Chunk {index})",
+            'project_description': submission.project_description,
+            'team_name': submission.team_name,
+            'participant_email': submission.participant_email,
+            'static_metrics': getattr(submission, 'static_metrics', None)
         })()
+    
+    def _result_key(self, submission, hackathon, mode='full'):
+        """
+        Hash of what a call evaluates: rubric and hackathon context plus the
+        content the mode looks at. Team, project name and the whole-submission
+        metrics are left out, so an unchanged chunk of a new version matches.
+        """
+        code = (submission.code_content or "") if mode != 'documentation' else ""
+        documentation = (submission.documentation_content or "") if mode != 'code' else ""
+        hasher = hashlib.sha256(self._build_prompt_prefix(hackathon, mode).encode('utf-8'))
+        for part in (submission.project_description or "", code, documentation):
+            hasher.update(b'\0' + part.encode('utf-8'))
+        return hasher.hexdigest()
+    
+    def _estimate_call_tokens(self, prompt):
+        """
+        Estimated prompt + completion tokens of one call (system message included)
+        """
+        return (len(SYSTEM_PROMPT) + len(prompt)) // CHARS_PER_TOKEN + ESTIMATED_COMPLETION_TOKENS
+    
+    def _call_cost(self, call_submission, hackathon, mode='full'):
+        """
+        Estimated (tokens, calls) of one call; calls a result cache will answer cost nothing
+        """
+        result_cache = _result_cache.get()
+        if result_cache is not None and self._result_key(call_submission, hackathon, mode) in result_cache:
+            return 0, 0
+        return self._estimate_call_tokens(self._build_evaluation_prompt(call_submission, hackathon, mode)), 1
+    
+    def _budget_limits(self, budget):
+        """(max tokens, max calls) of a budget, inf where unlimited; None when nothing is limited"""
+        if not budget or (budget.get('tokens') is None and budget.get('calls') is None):
+            return None
+        return (budget['tokens'] if budget.get('tokens') is not None else float('inf'),
+                budget['calls'] if budget.get('calls') is not None else float('inf'))
+    
+    def _plan_single_call(self, submission, hackathon, budget):
+        """
+        Spend of a submission evaluated in one call, checked against the budget
+
+        Returns:
+            tuple: (tokens, calls), or None without a budget
+        """
+        limits = self._budget_limits(budget)
+        if limits is None:
+            return None
+        spend = self._call_cost(submission, hackathon)
+        if spend[0] > limits[0] or spend[1] > limits[1]:
+            print(f"💸 Budget {budget} cannot cover a single call: not evaluating")
+            raise BudgetExhausted(budget)
+        return spend
+    
+    def _retry_allowance(self, spend, limits=None):
+        """
+        Calls and tokens available to field retries of a planned spend
+
+        Each retry is estimated at an average call plus its follow-up
+        completion, and there are at most LLM_FIELD_RETRIES per call. Without
+        limits: the share LLM_FIELD_RETRY_RESERVE of the calls (at least one)
+        that chunk selection keeps free. With limits: whatever they leave.
+
+        Returns:
+            tuple: (tokens, calls)
+        """
+        tokens, calls = spend
+        if not Config.LLM_FIELD_RETRIES or not calls:
+            return 0, 0
+        retry_calls = calls * Config.LLM_FIELD_RETRIES
+        per_retry = tokens // calls + Config.LLM_FIELD_RETRY_MAX_TOKENS
+        if limits is None:
+            retry_calls = min(retry_calls, max(1, math.ceil(calls * Config.LLM_FIELD_RETRY_RESERVE)))
+        else:
+            max_tokens, max_calls = limits
+            retry_calls = max(0, int(min(retry_calls, max_calls - calls, (max_tokens - tokens) // per_retry)))
+        return retry_calls * per_retry, retry_calls
+    
+    def _reserve(self, reserve, spend, budget):
+        """
+        Reserve the planned spend plus its field-retry allowance; BudgetExhausted if it is refused
+
+        Follow-up calls of this evaluation then draw from the allowance.
+        """
+        limits = self._budget_limits(budget)
+        if spend is None or limits is None:
+            return
+        retry_tokens, retry_calls = self._retry_allowance(spend, limits)
+        _field_retries.set(threading.Semaphore(retry_calls))
+        tokens, calls = spend[0] + retry_tokens, spend[1] + retry_calls
+        if reserve is None or not calls:
+            return
+        if not reserve(tokens, calls):
+            print(f"💸 Hackathon budget taken by concurrent evaluations: {calls} calls, ~{tokens:,} tokens not reserved")
+            raise BudgetExhausted(budget)
+    
+    def _plan_within_budget(self, submission, hackathon, chunks, budget):
+        """
+        Choose the degradation level and the chunks to evaluate
+
+        Prompts are built exactly as they will be sent, so the estimate covers
+        the rubric prefix and the static metrics summary of every call. Chunks
+        are chosen leaving room for the field-retry allowance; the truncated
+        call of level 3 only has to fit by itself.
+
+        Returns:
+            tuple: (degradation level 0-3 or None when not even the truncated
+                   call fits, chunks to evaluate, planned (tokens, calls) or
+                   None without a budget)
+        """
+        limits = self._budget_limits(budget)
+        if limits is None:
+            return 0, chunks, None
+        max_tokens, max_calls = limits
+        
+        documentation_cost = self._call_cost(submission, hackathon, 'documentation')
+        chunk_cost = {
+            id(chunk): self._call_cost(self._chunk_submission(submission, chunk, i), hackathon, 'code')
+            for i, chunk in enumerate(chunks, 1)
+        }
+        
+        def fits(tokens, calls):
+            """Whether a spend fits together with its field-retry allowance"""
+            retry_tokens, retry_calls = self._retry_allowance((tokens, calls))
+            return tokens + retry_tokens <= max_tokens and calls + retry_calls <= max_calls
+        
+        def fit(candidates):
+            """Longest prefix of candidates that fits next to the documentation call, and its spend"""
+            (tokens, calls), selected = documentation_cost, []
+            if not fits(tokens, calls):
+                return [], None
+            for chunk in candidates:
+                chunk_tokens, chunk_calls = chunk_cost[id(chunk)]
+                if not fits(tokens + chunk_tokens, calls + chunk_calls):
+                    break
+                tokens += chunk_tokens
+                calls += chunk_calls
+                selected.append(chunk)
+            return selected, (tokens, calls)
+        
+        selected, spend = fit(chunks)
+        if len(selected) == len(chunks) and spend is not None:
+            return 0, chunks, spend
+        
+        # Level 1: a representative sample (priority files first, then a deterministic shuffle)
+        selected, spend = fit(prioritize_chunks(chunks))
+        if len(selected) >= min(BUDGET_MIN_CHUNKS, len(chunks)) and spend is not None:
+            return 1, selected, spend
+        
+        # Level 2: only chunks holding priority files (README, entry points, manifests)
+        selected, spend = fit([chunk for chunk in chunks if chunk['priority']])
+        if selected:
+            return 2, selected, spend
+        
+        # Level 3: one call on truncated content, if even that fits
+        spend = self._call_cost(self._truncated_submission(submission), hackathon)
+        if spend[0] <= max_tokens and spend[1] <= max_calls:
+            return 3, [], spend
+        return None, [], None
+    
+    def _evaluate_with_openai_truncated(self, submission, hackathon):
+        """
+        Evaluate with truncated content as fallback
+        """
+        truncated_submission = self._truncated_submission(submission)
         
         print("⚠️ Using truncated content for evaluation")
         result = self._evaluate_with_openai(truncated_submission, hackathon)
@@ -164,27 +803,34 @@ class AIEvaluator:
         # Keep feedback as-is without prefixing a truncation note
         return result
     
-    def _build_evaluation_prompt(self, submission, hackathon):
+    def _build_evaluation_prompt(self, submission, hackathon, mode='full'):
         """
         Build the prompt for AI evaluation
-        """
-        criteria = json.loads(hackathon.criteria) if hackathon.criteria else self._get_default_criteria()
-        
-        prompt = f"""
-# STRICT Hackathon Evaluation - NO GRADE INFLATION
 
-## Hackathon Information
-**Name**: {hackathon.name}
-**Theme/Description**: {hackathon.description}
+        Layout is cache-friendly: the static rubric/schema and the per-hackathon
+        context come first and are byte-identical for every chunk of every
+        submission in a hackathon; only the trailing submission section varies.
+        """
+        return self._build_prompt_prefix(hackathon, mode) + self._build_submission_section(submission, mode)
 
-## Evaluation Criteria
-{hackathon.evaluation_prompt}
+    def _build_prompt_prefix(self, hackathon, mode='full'):
+        """
+        Static rubric + JSON schema followed by the hackathon context
+        """
+        return _prompt_prefix(mode, hackathon.name, hackathon.description, hackathon.evaluation_prompt)
 
+    def _build_submission_section(self, submission, mode='full'):
+        """
+        Variable, per-submission (or per-chunk) part of the prompt
+        """
+        section = f"""
 ## Submission to Evaluate
 **Team**: {submission.team_name}
 **Project Name**: {submission.project_name}
 **Description**: {submission.project_description}
-
+"""
+        if mode == 'full':
+            section += f"""
 ### Code Content
 ```
 {self._truncate_content(submission.code_content, 3000)}
@@ -194,91 +840,45 @@ class AIEvaluator:
 ```
 {self._truncate_content(submission.documentation_content, 2000)}
 ```
-
-## CRITICAL EVALUATION INSTRUCTIONS
-
-You are a STRICT technical evaluator. Use the FULL range of scores 0-10. DO NOT give similar scores to different projects.
-
-### SCORING GUIDELINES (BE HARSH AND REALISTIC):
-
-**0-2: Poor/Failing**
-- Major issues, non-functional, or completely irrelevant
-- Severe security vulnerabilities or broken code
-- No documentation or completely unclear
-
-**3-4: Below Average**
-- Basic functionality but significant flaws
-- Poor code quality, structure, or practices
-- Minimal effort or incomplete implementation
-
-**5-6: Average/Acceptable**
-- Works as intended with minor issues
-- Standard implementation, nothing special
-- Adequate documentation and code quality
-
-**7-8: Good/Above Average**
-- Well-implemented with good practices
-- Shows clear understanding and effort
-- Good documentation and structure
-
-**9-10: Excellent/Outstanding**
-- Exceptional quality, innovative approach
-- Production-ready code with best practices
-- Comprehensive documentation and testing
-
-        ## STRICT EVALUATION CRITERIA:
-
-1. **Relevance (0-10)**: Does it ACTUALLY solve the problem stated? Is it directly related to the theme?
-2. **Technical Complexity (0-10)**: How sophisticated is the implementation? Rate based on actual technical depth, not just lines of code.
-3. **Creativity (0-10)**: Is this a unique approach or just a standard tutorial implementation?
-4. **Documentation (0-10)**: Is there proper README, comments, setup instructions? Can someone else run this?
-5. **Productivity (0-10)**: Code organization, error handling, scalability, maintainability.
-
-        ## ADDITIONAL KEY-POINT ANALYSIS (brief, 1-2 sentences each):
-        - Out of the box thinking: How original/novel is the approach?
-        - Problem-solving skills: How effectively does the code decompose and solve the problem?
-        - Research capabilities: Evidence of learning, citations, comparisons, benchmarking, or exploration
-        - Understanding the business: Does it align with real user/business needs and constraints?
-        - Use of non-famous tools or frameworks: Any lesser-known tech used purposefully
-
-        ## MANDATORY REQUIREMENTS:
-- VARY your scores significantly between projects
-- Use decimals (e.g., 3.2, 6.7, 8.1) for precision
-- Be CRITICAL and identify real weaknesses
-- NO GRADE INFLATION - most projects should score 4-7 range
-- Only exceptional projects deserve 8-10
-- Don't hesitate to give low scores (1-3) for poor work
-
-        ## Response Format (STRICT JSON):
-
-```json
-{{
-  "relevance_score": <precise score 0-10 with 1 decimal>,
-  "technical_complexity_score": <precise score 0-10 with 1 decimal>,
-  "creativity_score": <precise score 0-10 with 1 decimal>,
-  "documentation_score": <precise score 0-10 with 1 decimal>,
-  "productivity_score": <precise score 0-10 with 1 decimal>,
-  "overall_score": <calculated average with 1 decimal>,
-  "feedback": "<HONEST, CRITICAL feedback. Point out specific flaws, missing features, and areas for improvement. Don't sugarcoat.>",
-  "detailed_scores": {{
-    "relevance_justification": "<specific reasons for this score>",
-    "technical_justification": "<specific technical assessment>",
-    "creativity_justification": "<specific creativity assessment>",
-    "documentation_justification": "<specific documentation assessment>",
-            "productivity_justification": "<specific code quality assessment>",
-            
-            "out_of_box_thinking": "<1-2 sentence assessment>",
-            "problem_solving_skills": "<1-2 sentence assessment>",
-            "research_capabilities": "<1-2 sentence assessment>",
-            "business_understanding": "<1-2 sentence assessment>",
-            "non_famous_tools_usage": "<1-2 sentence assessment>"
-  }}
-}}
+"""
+        elif mode == 'code':
+            # The chunk is the whole payload now, so send all of it (chunks are <= 4000 chars)
+            section += f"""
+### Code Content (one excerpt of the codebase)
+```
+{self._truncate_content(submission.code_content, 4000)}
+```
+"""
+        else:
+            section += f"""
+### Documentation
+```
+{self._truncate_content(submission.documentation_content, 6000)}
 ```
+"""
+        section += f"""
+### Static Analysis (objective metrics for the WHOLE submission)
+{format_metrics_summary(getattr(submission, 'static_metrics', None)) or "Not available"}
+
+Use these metrics to ground the Technical Complexity and Documentation scores; the content above is only an excerpt.
 
 REMEMBER: Be a tough but fair judge. Real-world projects have flaws - identify them!
 """
-        return prompt
+        return section
+    
+    def _extract_usage(self, response):
+        """
+        Token usage of a completion, including prompt tokens served from the provider's prefix cache
+        """
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return {
+            'calls': 1,
+            'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+            'cached_prompt_tokens': getattr(details, 'cached_tokens', 0) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+            'total_tokens': getattr(usage, 'total_tokens', 0) or 0
+        }
     
     def _truncate_content(self, content, max_length=2000):
         """
@@ -291,37 +891,99 @@ REMEMBER: Be a tough but fair judge. Real-world projects have flaws - identify t
             return content[:max_length] + "\n... [content truncated]"
         return content
     
-    def _parse_evaluation_result(self, result_text):
+    def _count_response(self, outcome):
+        with self._stats_lock:
+            self.response_stats[outcome] += 1
+    
+    def _parse_response_fields(self, result_text, response=None):
+        """
+        Top-level JSON fields of a response, repaired locally when it is malformed or cut off
+        """
+        fields, how = extract_json_fields(result_text)
+        truncated = response is not None and getattr(response.choices[0], 'finish_reason', None) == 'length'
+        self._count_response(how or 'unparseable')
+        if how != 'json' or truncated:
+            print(f"🩹 {'Truncated' if truncated else 'Malformed'} response: "
+                  f"{'recovered ' + str(len(fields)) + ' fields' if fields else 'no JSON fields recovered'} ({how})")
+        return fields
+    
+    def _missing_fields(self, fields, mode='full'):
         """
-        Parse the AI response into structured scores
+        Required fields a response did not (validly) provide: the mode's scores and feedback
         """
+        missing = []
+        for key in SCORE_KEYS[mode]:
+            try:
+                float(fields[key])
+            except (KeyError, TypeError, ValueError):
+                missing.append(key)
+        if not isinstance(fields.get('feedback'), str) or not fields['feedback'].strip():
+            missing.append('feedback')
+        return missing
+    
+    def _request_missing_fields(self, messages, result_text, missing):
+        """
+        Follow-up call asking only for the missing fields of a response
+
+        The earlier answer stays in the conversation (and the prompt prefix
+        in the provider's cache), so the model completes it instead of
+        re-evaluating from scratch, with a small completion budget.
+
+        Returns:
+            tuple: (fields dict, usage dict); no fields if the call failed
+        """
+        print(f"🔁 Requesting missing fields only: {', '.join(missing)}")
+        self._count_response('field_retries')
+        template = ', '.join(f'"{key}": <precise score 0-10 with 1 decimal>' if key.endswith('_score')
+                             else f'"{key}": "<text>"' for key in missing)
+        follow_up = messages + [
+            {"role": "assistant", "content": result_text or ""},
+            {"role": "user", "content": "Your response was incomplete or not valid JSON. Reply with ONLY this "
+                                        "JSON object, keeping the assessment you already made:\n"
+                                        f"```json\n{{{template}}}\n```"}
+        ]
         try:
-            # Try to extract JSON from the response
-            json_match = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-            else:
-                # Try to find any JSON object in the response
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                json_str = json_match.group(0) if json_match else result_text
-            
-            scores = json.loads(json_str)
-            
-            # Validate and normalize scores
-            return {
-                'relevance_score': self._normalize_score(scores.get('relevance_score', 5.0)),
-                'technical_complexity_score': self._normalize_score(scores.get('technical_complexity_score', 5.0)),
-                'creativity_score': self._normalize_score(scores.get('creativity_score', 5.0)),
-                'documentation_score': self._normalize_score(scores.get('documentation_score', 5.0)),
-                'productivity_score': self._normalize_score(scores.get('productivity_score', 5.0)),
-                'overall_score': self._normalize_score(scores.get('overall_score', 5.0)),
-                'feedback': scores.get('feedback', 'Evaluation completed.'),
-                'detailed_scores': json.dumps(scores.get('detailed_scores', {}))
-            }
+            with self.scheduler.slot():
+                response = self.completions.create(
+                    model="gpt-4o",
+                    messages=follow_up,
+                    temperature=0.1,
+                    max_tokens=Config.LLM_FIELD_RETRY_MAX_TOKENS
+                )
         except Exception as e:
-            print(f"Error parsing evaluation result: {str(e)}")
-            # Return fallback scores if parsing fails
-            return self._generate_fallback_scores()
+            print(f"❌ Missing-field request failed: {str(e)}")
+            return {}, {key: 0 for key in ('calls', 'prompt_tokens', 'cached_prompt_tokens', 'completion_tokens', 'total_tokens')}
+        fields = self._parse_response_fields(response.choices[0].message.content, response)
+        return {key: fields[key] for key in missing if key in fields}, self._extract_usage(response)
+    
+    def _parse_evaluation_result(self, fields, mode='full'):
+        """
+        Turn the parsed response fields into structured scores
+
+        Scores still missing after the follow-up default to 5.0 and are
+        listed in detailed_scores; without any score at all the whole
+        result falls back to estimated scores.
+        """
+        missing = self._missing_fields(fields, mode)
+        if len(set(missing) & set(SCORE_KEYS[mode])) == len(SCORE_KEYS[mode]):
+            print("Error parsing evaluation result: no scores in the response")
+            self._count_response('fallbacks')
+            return self._generate_fallback_scores(mode)
+        
+        # Validate and normalize scores
+        result = {key: self._normalize_score(fields.get(key, 5.0)) for key in SCORE_KEYS[mode]}
+        if mode == 'full' and 'overall_score' in fields:
+            result['overall_score'] = self._normalize_score(fields['overall_score'])
+        else:
+            # Partial rubrics have no overall; use the mean of the criteria they cover
+            result['overall_score'] = round(sum(result.values()) / len(result), 1)
+        result['feedback'] = fields.get('feedback') if 'feedback' not in missing else 'Evaluation completed.'
+        detailed_scores = fields.get('detailed_scores')
+        detailed_scores = dict(detailed_scores) if isinstance(detailed_scores, dict) else {}
+        if missing:
+            detailed_scores['missing_fields'] = missing
+        result['detailed_scores'] = json.dumps(detailed_scores)
+        return result
     
     def _normalize_score(self, score):
         """
@@ -333,7 +995,7 @@ REMEMBER: Be a tough but fair judge. Real-world projects have flaws - identify t
         except:
             return 5.0
     
-    def _generate_fallback_scores(self):
+    def _generate_fallback_scores(self, mode='full'):
         """
         Generate varied fallback scores when evaluation fails
         """
@@ -348,6 +1010,8 @@ REMEMBER: Be a tough but fair judge. Real-world projects have flaws - identify t
             'productivity_score': round(random.uniform(3.5, 6.0), 1)
         }
         
+        scores = {key: scores[key] for key in SCORE_KEYS[mode]}
+        
         # Calculate overall as average
         overall = sum(scores.values()) / len(scores)
         
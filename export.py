@@ -0,0 +1,126 @@
+"""
+Streaming export of hackathon results (CSV / NDJSON)
+
+Rows are read in keyset-paginated pages of plain columns (never the code or
+documentation blobs) with a streaming cursor, and written out one at a time,
+so memory stays constant regardless of hackathon size.
+"""
+
+import csv
+import io
+import json
+from models import db, Submission, Evaluation
+
+SCORE_COLUMNS = [
+    'relevance_score',
+    'technical_complexity_score',
+    'creativity_score',
+    'documentation_score',
+    'productivity_score',
+    'overall_score',
+]
+
+BASE_COLUMNS = [
+    'submission_id', 'team_name', 'project_name', 'participant_email',
+    'submitted_at', 'status', *SCORE_COLUMNS, 'evaluated_at', 'feedback',
+]
+
+# Justification keys produced by the evaluation prompt (detailed_scores)
+JUSTIFICATION_COLUMNS = [
+    'relevance_justification',
+    'technical_justification',
+    'creativity_justification',
+    'documentation_justification',
+    'productivity_justification',
+    'out_of_box_thinking',
+    'problem_solving_skills',
+    'research_capabilities',
+    'business_understanding',
+    'non_famous_tools_usage',
+]
+
+EXPORT_PAGE_SIZE = 500
+
+
+def iter_export_rows(hackathon_id, include_justifications=False, page_size=EXPORT_PAGE_SIZE):
+    """
+    Yield one dict per submission, ordered by submission id
+
+    Args:
+        hackathon_id (int): Hackathon to export
+        include_justifications (bool): Also parse detailed_scores per row
+        page_size (int): Rows fetched per keyset page
+    """
+    columns = [
+        Submission.id, Submission.team_name, Submission.project_name, Submission.participant_email,
+        Submission.submitted_at, Submission.status, Submission.evaluated,
+        *[getattr(Evaluation, name) for name in SCORE_COLUMNS],
+        Evaluation.evaluated_at, Evaluation.feedback,
+    ]
+    if include_justifications:
+        columns.append(Evaluation.detailed_scores)
+
+    last_id = 0
+    while True:
+        page = db.session.query(*columns).outerjoin(
+            Evaluation, Evaluation.submission_id == Submission.id
+        ).filter(
+            Submission.hackathon_id == hackathon_id,
+            Submission.id > last_id
+        ).order_by(Submission.id).limit(page_size).execution_options(yield_per=page_size)
+
+        count = 0
+        for row in page:
+            count += 1
+            last_id = row.id
+            yield _row_to_dict(row, include_justifications)
+
+        if count < page_size:
+            return
+
+
+def _row_to_dict(row, include_justifications):
+    record = {
+        'submission_id': row.id,
+        'team_name': row.team_name,
+        'project_name': row.project_name,
+        'participant_email': row.participant_email,
+        'submitted_at': row.submitted_at.isoformat() if row.submitted_at else None,
+        'status': row.status or ('evaluated' if row.evaluated else 'pending'),
+        **{name: getattr(row, name) for name in SCORE_COLUMNS},
+        'evaluated_at': row.evaluated_at.isoformat() if row.evaluated_at else None,
+        'feedback': row.feedback,
+    }
+    if include_justifications:
+        try:
+            detailed = json.loads(row.detailed_scores) if row.detailed_scores else {}
+        except ValueError:
+            detailed = {}
+        record['detailed_scores'] = detailed if isinstance(detailed, dict) else {}
+    return record
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def stream_csv(rows, include_justifications=False):
+    """Write CSV one row at a time through a small reusable buffer"""
+    fieldnames = BASE_COLUMNS + (JUSTIFICATION_COLUMNS if include_justifications else [])
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction='ignore')
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writeheader()
+    yield drain()
+    for row in rows:
+        if include_justifications:
+            row.update(row.pop('detailed_scores', {}))
+        writer.writerow(row)
+        yield drain()
@@ -0,0 +1,312 @@
+"""
+Submissions from git repositories, read straight from the object store
+
+A repository is given as the path of a local repository or git bundle
+(under one of GIT_LOCAL_ROOTS) or as an https URL on one of
+GIT_REMOTE_HOSTS. Local repositories are read in place. Bundles and remote
+repositories are fetched into a bare mirror under GIT_CACHE_FOLDER, which
+keeps the objects of earlier fetches, so a new commit only transfers what
+changed. Nothing is checked out: `git ls-tree` lists the commit's files and
+`git cat-file --batch` streams the blobs, with the same filters, priority
+order and size caps as ZIP uploads (iter_zip_sections).
+
+Given the previous evaluated submission of the same repository, files
+whose blob is unchanged take their text from that submission instead of
+the object store; only changed blobs are read.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+from collections import defaultdict, namedtuple
+from urllib.parse import urlparse
+from config import Config
+from chunking_utils import FILE_HEADER_PREFIX, split_file_sections
+from static_analysis import analyze_contents
+from utils import allowed_file, code_content_limit, is_documentation_file, should_prioritize_file, should_skip_directory
+
+MAX_FILE_SIZE = 500 * 1024  # Same per-file cap as ZIP extraction
+MIRROR_REF = 'refs/autoeval/head'  # Where a mirror keeps the fetched commit
+REF_RE = re.compile(r'^[\w][\w./@{}^~-]*$')  # Branch, tag, commit or HEAD; never an option
+
+TreeEntry = namedtuple('TreeEntry', 'path blob size priority')
+
+_mirror_locks = defaultdict(threading.Lock)  # mirror path -> lock held while fetching into it
+_mirror_locks_lock = threading.Lock()
+
+
+class RepositoryError(ValueError):
+    """A repository that cannot be read: location not allowed, not a repository, unknown ref"""
+
+
+def _run(command, input=None):
+    env = {**os.environ, 'GIT_TERMINAL_PROMPT': '0'}  # Never wait for credentials
+    try:
+        completed = subprocess.run(command, input=input, capture_output=True, env=env,
+                                   timeout=Config.GIT_COMMAND_TIMEOUT)
+    except FileNotFoundError:
+        raise RepositoryError(f"git executable not found ({Config.GIT_BINARY})")
+    except subprocess.TimeoutExpired:
+        raise RepositoryError(f"git {command[-1]} took longer than {Config.GIT_COMMAND_TIMEOUT}s")
+    if completed.returncode != 0:
+        message = completed.stderr.decode('utf-8', errors='replace').strip().splitlines()
+        raise RepositoryError(message[-1] if message else f"git exited with status {completed.returncode}")
+    return completed.stdout
+
+
+class GitRepository:
+    """Read-only access to one object store through the git CLI"""
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+
+    def git(self, *args, input=None):
+        # Repositories under the configured roots may belong to another user; they are only read
+        return _run([Config.GIT_BINARY, '-c', 'safe.directory=*', '--git-dir', self.git_dir, *args], input)
+
+    def resolve(self, ref='HEAD'):
+        """Commit id a ref points to"""
+        return self.git('rev-parse', '--verify', '--quiet', f'{ref}^{{commit}}').decode().strip()
+
+    def list_files(self, commit):
+        """
+        Files of a commit that extraction would read, priority files first
+
+        Same filters as ZIP uploads: skipped directories at any depth, allowed
+        extensions, at most 500KB. Symlinks and submodules are left out.
+
+        Returns:
+            list: TreeEntry tuples
+        """
+        priority, others = [], []
+        for record in self.git('ls-tree', '-r', '-l', '-z', '--full-tree', commit).split(b'\0'):
+            if not record:
+                continue
+            meta, path = record.split(b'\t', 1)
+            mode, kind, blob, size = meta.split()
+            if kind != b'blob' or mode == b'120000':
+                continue
+            path = path.decode('utf-8', errors='replace')
+            parts = path.split('/')
+            if any(should_skip_directory(part) for part in parts[:-1]) or not allowed_file(parts[-1]):
+                continue
+            if int(size) > MAX_FILE_SIZE:
+                continue
+            entry = TreeEntry(path, blob.decode(), int(size), should_prioritize_file(path))
+            (priority if entry.priority else others).append(entry)
+        return priority + others
+
+    def read_blobs(self, blobs):
+        """
+        Yield (blob id, bytes) for each blob, from one `git cat-file --batch` process
+
+        The ids are written from a separate thread so a large batch cannot
+        fill both pipes and deadlock.
+        """
+        if not blobs:
+            return
+        process = subprocess.Popen(
+            [Config.GIT_BINARY, '-c', 'safe.directory=*', '--git-dir', self.git_dir, 'cat-file', '--batch'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+        def write_ids():
+            try:
+                process.stdin.write(''.join(f'{blob}\n' for blob in blobs).encode())
+                process.stdin.close()
+            except (BrokenPipeError, ValueError):
+                pass
+
+        writer = threading.Thread(target=write_ids, name='git-cat-file', daemon=True)
+        writer.start()
+        try:
+            for blob in blobs:
+                header = process.stdout.readline().split()
+                if len(header) != 3:
+                    raise RepositoryError(f"object {blob} is missing from the repository")
+                size = int(header[2])
+                data = process.stdout.read(size)
+                process.stdout.read(1)  # Trailing newline
+                yield blob, data
+        finally:
+            process.kill()
+            process.stdout.close()
+            process.wait()
+            writer.join()
+
+
+def _allowed_local_path(path):
+    """Real path of a submitted location, provided it lies under GIT_LOCAL_ROOTS"""
+    real = os.path.realpath(path)
+    for root in Config.GIT_LOCAL_ROOTS:
+        root = os.path.realpath(root)
+        if os.path.commonpath([root, real]) == root:
+            if not os.path.exists(real):
+                raise RepositoryError(f"Repository not found: {path}")
+            return real
+    raise RepositoryError('Local repositories can only be submitted from the directories in GIT_LOCAL_ROOTS')
+
+
+def _fetch_into_mirror(source, ref, remote=False):
+    """
+    Fetch a bundle or remote into its bare mirror; returns (mirror, commit id)
+
+    A remote is asked for the one ref, shallow. A bundle is fetched whole, so
+    any ref expression (HEAD~1, a tag, a commit id) resolves in the mirror.
+    """
+    name = hashlib.sha256(source.encode('utf-8')).hexdigest()[:24]
+    mirror = os.path.join(Config.GIT_CACHE_FOLDER, f'{name}.git')
+    with _mirror_locks_lock:
+        lock = _mirror_locks[mirror]
+    with lock:
+        if not os.path.isdir(mirror):
+            os.makedirs(Config.GIT_CACHE_FOLDER, exist_ok=True)
+            _run([Config.GIT_BINARY, 'init', '--quiet', '--bare', mirror])
+        repository = GitRepository(mirror)
+        fetch = ['-c', 'gc.auto=0', 'fetch', '--quiet', '--no-tags', '--force']
+        if remote:
+            repository.git(*fetch, '--depth=1', source, f'{ref}:{MIRROR_REF}')
+            return repository, repository.resolve(MIRROR_REF)
+        heads = repository.git('bundle', 'list-heads', source).decode().split()
+        refspecs = ['+refs/*:refs/*'] + ([f'+HEAD:{MIRROR_REF}'] if 'HEAD' in heads else [])
+        repository.git(*fetch, source, *refspecs)
+        try:
+            return repository, repository.resolve(MIRROR_REF if ref == 'HEAD' else ref)
+        except RepositoryError:
+            raise RepositoryError(f"Unknown ref {ref} in the bundle")
+
+
+def open_repository(location, ref=None):
+    """
+    Object store and commit of a submitted repository
+
+    Args:
+        location (str): Local repository or bundle path (or file:// URL), or an https URL
+        ref (str): Branch, tag or commit; HEAD by default
+
+    Returns:
+        tuple: (GitRepository, commit id)
+
+    Raises:
+        RepositoryError: The location is not allowed or not readable, or the ref is unknown
+    """
+    location = (location or '').strip()
+    ref = (ref or '').strip() or 'HEAD'
+    if not location:
+        raise RepositoryError('A repository URL or path is required')
+    if not REF_RE.match(ref):
+        raise RepositoryError(f"Invalid ref: {ref}")
+
+    parsed = urlparse(location)
+    if parsed.scheme in ('http', 'https', 'ssh', 'git'):
+        host = (parsed.hostname or '').lower()
+        if parsed.scheme != 'https' or host not in Config.GIT_REMOTE_HOSTS:
+            raise RepositoryError(f"Only https repositories on {', '.join(Config.GIT_REMOTE_HOSTS) or 'no hosts'} "
+                                  f"can be fetched")
+        print(f"🌐 Fetching {ref} from {location}")
+        return _fetch_into_mirror(location, ref, remote=True)
+
+    path = _allowed_local_path(parsed.path if parsed.scheme == 'file' else location)
+    if os.path.isfile(path):
+        print(f"📦 Fetching {ref} from bundle {path}")
+        return _fetch_into_mirror(path, ref)
+
+    git_dir = _run([Config.GIT_BINARY, '-c', 'safe.directory=*', '-C', path, 'rev-parse', '--absolute-git-dir'])
+    repository = GitRepository(_allowed_local_path(git_dir.decode().strip()))
+    try:
+        return repository, repository.resolve(ref)
+    except RepositoryError:
+        raise RepositoryError(f"Unknown ref {ref} in {location}")
+
+
+def tree_content_hash(entries):
+    """Content hash of the extractable files of a commit (paths and blob ids)"""
+    hasher = hashlib.sha256()
+    for entry in sorted(entries):
+        hasher.update(f'{entry.path}\0{entry.blob}\n'.encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def _previous_texts(previous):
+    """
+    Extracted text of each blob of the previous version, by blob id
+
+    Only used when its code_content splits back into exactly the files of
+    its source tree (no size-limit marker, no file whose text looks like a
+    section header); otherwise every blob is read again.
+    """
+    if previous is None or not previous.source_tree or not previous.code_content:
+        return {}
+    tree = json.loads(previous.source_tree)
+    sections = split_file_sections(previous.code_content)
+    if len(sections) != len(tree) or {path for path, _ in sections} != tree.keys():
+        return {}
+    return {tree[path]: text.split('\n', 1)[1] if '\n' in text else '' for path, text in sections}
+
+
+def extract_commit(repository, entries, project_description='', previous=None):
+    """
+    Extract code, documentation and static metrics of a commit like an uploaded archive
+
+    File text is stored without trailing newlines, the form the chunker
+    sees anyway, so a file reused from the previous version produces the
+    same content (and the same chunks) as one read from the object store.
+
+    Args:
+        repository (GitRepository): Object store holding the commit
+        entries (list): TreeEntry tuples from list_files, priority files first
+        project_description (str): Included at the top of the documentation
+        previous (Submission): Earlier evaluated submission of the same repository
+
+    Returns:
+        dict: code_content, documentation_content, static_metrics, source_tree
+              ({path: blob} of extracted files), files_read, files_reused
+    """
+    max_total_size = code_content_limit()
+    extracted, total_size = [], 0
+    for priority in (True, False):
+        for entry in entries:
+            if entry.priority != priority:
+                continue
+            if total_size + entry.size > max_total_size:
+                if not priority:
+                    extracted.append(None)  # Size limit marker
+                break
+            extracted.append(entry)
+            total_size += entry.size
+    # Documentation comes from the files kept within the limit, never from the skipped rest
+    documents = [entry for entry in extracted if entry is not None and is_documentation_file(entry.path)]
+
+    texts = _previous_texts(previous)
+    reused = {entry.blob for entry in extracted if entry is not None and entry.blob in texts}
+    wanted = list(dict.fromkeys(entry.blob for entry in extracted
+                                if entry is not None and entry.blob not in texts))
+    for blob, data in repository.read_blobs(wanted):
+        texts[blob] = data.decode('utf-8', errors='ignore').rstrip('\n')
+
+    sections = []
+    for entry in extracted:
+        if entry is None:
+            sections.append("# Remaining files skipped - size limit reached\n")
+            continue
+        marker = ' [PRIORITY]' if entry.priority else ''
+        sections.append(f"{FILE_HEADER_PREFIX}{entry.path}{marker}\n{texts[entry.blob]}\n")
+    code_content = "\n\n".join(sections)
+
+    documentation = [f"Project Description:\n{project_description}\n\n"]
+    documentation.extend(f"# {os.path.basename(entry.path)}\n{texts[entry.blob]}\n" for entry in documents)
+
+    files = [entry for entry in extracted if entry is not None]
+    print(f"🌿 Git extraction: {len(files)} files, {len(code_content)//1024}KB "
+          f"({len(wanted)} blobs read, {len(reused)} reused from the previous version)")
+    return {
+        'code_content': code_content,
+        'documentation_content': "\n\n".join(documentation),
+        'static_metrics': analyze_contents((entry.path, texts[entry.blob]) for entry in files),
+        'source_tree': {entry.path: entry.blob for entry in files},
+        'files_read': len(wanted),
+        'files_reused': len(reused)
+    }
@@ -0,0 +1,108 @@
+"""
+Gunicorn configuration for production serving
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Threaded workers (gthread): one process per core, several threads per
+process, because evaluation requests spend most of their time waiting on
+the LLM. Every knob can be overridden through the environment.
+"""
+
+import multiprocessing
+import os
+import signal
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '7860')}"
+
+# Workers derived from cores; threads cover the I/O-bound evaluation requests
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+backlog = int(os.getenv('GUNICORN_BACKLOG', '2048'))
+
+# Keep-alive: reuse connections from the reverse proxy / polling frontend
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# With gthread the timeout is a heartbeat, not a cap on request duration,
+# so long synchronous evaluations are not killed
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Graceful shutdown: stop accepting, then give in-flight evaluations time to finish.
+# The container runtime must allow at least as long (see the Dockerfile): Docker
+# kills after 10s and Kubernetes after 30s by default
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '600'))
+
+# Recycle workers periodically to bound memory growth from large submissions
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+# Heartbeat files on tmpfs so a slow disk cannot trigger false worker timeouts
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None  # Empty string disables access logging
+errorlog = '-'
+
+
+# Shutdown bookkeeping of this worker process (set by the hooks below)
+DRAIN_MARGIN = 5  # Seconds kept back so the worker exits before the arbiter's SIGKILL
+_shutdown = {'started': None, 'quick': False, 'heartbeat_fd': None}
+
+
+def post_worker_init(worker):
+    """
+    Note when SIGTERM arrives: the arbiter's graceful_timeout counts from there
+
+    Also keeps a duplicate of the heartbeat file descriptor; gunicorn closes
+    its own before worker_exit runs, and without heartbeats a worker that is
+    draining during a reload or max_requests recycle is killed after `timeout`.
+    """
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def handle_term(sig, frame):
+        if _shutdown['started'] is None:
+            _shutdown['started'] = time.monotonic()
+        previous(sig, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
+    signal.siginterrupt(signal.SIGTERM, False)
+    _shutdown['heartbeat_fd'] = os.dup(worker.tmp.fileno())
+
+
+def worker_int(worker):
+    """SIGINT/SIGQUIT: quick shutdown, the arbiter waits only a moment"""
+    _shutdown['quick'] = True
+
+
+def worker_exit(server, worker):
+    """
+    Drain evaluations still running outside the request cycle before the worker exits
+
+    In-flight requests have already used part of graceful_timeout, so only
+    what is left of it (since SIGTERM, or since now for a self-initiated
+    exit) is spent here.
+    """
+    from app import drain_evaluations, inflight_evaluations
+    from static_analysis import shutdown_pool
+
+    try:
+        _drain(server, worker, drain_evaluations, inflight_evaluations)
+    finally:
+        shutdown_pool()  # Static-analysis processes of this worker
+
+
+def _drain(server, worker, drain_evaluations, inflight_evaluations):
+    if not inflight_evaluations() or _shutdown['quick']:
+        return
+    started = _shutdown['started'] or time.monotonic()
+    deadline = started + graceful_timeout - DRAIN_MARGIN
+    server.log.info("Worker %s draining %d in-flight evaluation(s) for up to %.0fs",
+                    worker.pid, inflight_evaluations(), max(0.0, deadline - time.monotonic()))
+    remaining = inflight_evaluations()
+    while remaining and time.monotonic() < deadline:
+        remaining = drain_evaluations(min(1.0, max(0.0, deadline - time.monotonic())))
+        if _shutdown['heartbeat_fd'] is not None:
+            now = time.monotonic()
+            os.utime(_shutdown['heartbeat_fd'], (now, now))  # Same clock as WorkerTmp.notify
+    if remaining:
+        server.log.warning("Worker %s exiting with %d evaluation(s) unfinished", worker.pid, remaining)
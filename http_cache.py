@@ -0,0 +1,103 @@
+"""
+HTTP caching helpers for immutable evaluation results
+
+- ResponseCache: in-process LRU of serialized JSON bodies, keyed by
+  submission id and validated against a version string, so a stale entry
+  (e.g. after re-evaluation in another worker) is never served.
+- init_compression: gzip/brotli for large JSON responses.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from flask import request
+from config import Config
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+
+class ResponseCache:
+    """Thread-safe LRU of (version, serialized body) entries"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Cached body for key if it was stored for exactly this version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, body):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+
+result_cache = ResponseCache(maxsize=Config.RESULT_CACHE_SIZE)
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """after_request hook: compress large JSON/text bodies the client accepts"""
+    if (response.status_code < 200 or response.status_code >= 300
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or not (response.mimetype or '').startswith(('application/json', 'text/'))):
+        return response
+
+    body = response.get_data()
+    if len(body) < Config.COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=5)
+    else:
+        compressed = gzip.compress(body, compresslevel=6)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The compressed bytes differ from the identity representation: downgrade to a weak validator
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
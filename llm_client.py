@@ -0,0 +1,178 @@
+"""
+Deadline- and hedging-aware wrapper around chat completions
+
+Every call gets a hard deadline. Once enough latency samples exist, a call
+that runs longer than the observed p95 gets a duplicate ("hedge"); whichever
+attempt finishes first wins. Hedges are capped to a fraction of all calls so
+a slow provider cannot double our traffic. Latencies are kept in fixed-bucket
+histograms for reporting.
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import Config
+
+# Histogram bucket upper bounds in seconds (roughly x1.5 steps from 100ms to 10min)
+LATENCY_BUCKETS = [round(0.1 * 1.5 ** i, 3) for i in range(22)]
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram plus a window of recent samples
+
+    The buckets are cheap to report; the recent window gives exact
+    percentiles for hedging decisions that track the provider's current speed.
+    """
+
+    def __init__(self, window=500):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.recent = deque(maxlen=window)
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.recent.append(seconds)
+            self.total += 1
+            self.sum += seconds
+
+    def percentile(self, p):
+        """Percentile (0-1) over the recent window, None if there are no samples"""
+        with self._lock:
+            samples = sorted(self.recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(p * len(samples)))
+        return samples[index]
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.total
+            mean = self.sum / total if total else 0.0
+        buckets = {f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS, counts)}
+        buckets['le_inf'] = counts[-1]
+        return {
+            'count': total,
+            'mean': round(mean, 3),
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': buckets
+        }
+
+
+class HedgedCompletions:
+    """
+    Drop-in for client.chat.completions with deadlines and hedging
+
+    Usage:
+        completions = HedgedCompletions(client.chat.completions)
+        response = completions.create(model=..., messages=...)
+    """
+
+    def __init__(self, completions, deadline=None, hedge_percentile=None,
+                 hedge_max_rate=None, hedge_min_samples=None, max_workers=None):
+        self.completions = completions
+        self.deadline = deadline or Config.LLM_CALL_DEADLINE
+        self.hedge_percentile = hedge_percentile or Config.LLM_HEDGE_PERCENTILE
+        self.hedge_max_rate = Config.LLM_HEDGE_MAX_RATE if hedge_max_rate is None else hedge_max_rate
+        self.hedge_min_samples = hedge_min_samples or Config.LLM_HEDGE_MIN_SAMPLES
+        self.attempt_latency = LatencyHistogram()  # Every finished attempt
+        self.call_latency = LatencyHistogram()  # End-to-end, as seen by the caller
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or Config.LLM_HEDGE_POOL_SIZE,
+            thread_name_prefix='llm-call'
+        )
+
+    def _attempt(self, kwargs):
+        started = time.monotonic()
+        response = self.completions.create(timeout=self.deadline, **kwargs)
+        self.attempt_latency.record(time.monotonic() - started)
+        return response
+
+    def _hedge_delay(self):
+        """Observed p95 latency, or None until there are enough samples to trust it"""
+        if self.attempt_latency.total < self.hedge_min_samples:
+            return None
+        return self.attempt_latency.percentile(self.hedge_percentile)
+
+    def _reserve_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.calls * self.hedge_max_rate:
+                return False
+            self.hedges += 1
+            return True
+
+    def create(self, **kwargs):
+        """
+        Run a chat completion under the deadline, hedging slow calls
+
+        Raises:
+            TimeoutError: No attempt finished before the deadline
+            Exception: The last attempt's error when every attempt failed
+        """
+        with self._lock:
+            self.calls += 1
+
+        started = time.monotonic()
+        deadline_at = started + self.deadline
+        futures = [self._executor.submit(self._attempt, kwargs)]
+
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is not None and hedge_delay < self.deadline:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done and self._reserve_hedge():
+                print(f"🪁 LLM call slower than p{int(self.hedge_percentile * 100)} "
+                      f"({hedge_delay:.1f}s), issuing hedge request")
+                futures.append(self._executor.submit(self._attempt, kwargs))
+
+        last_error = None
+        pending = set(futures)
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    last_error = future.exception()
+                    continue
+                if future is not futures[0]:
+                    with self._lock:
+                        self.hedge_wins += 1
+                self.call_latency.record(time.monotonic() - started)
+                return future.result()
+
+        if last_error is not None and not pending:
+            raise last_error
+
+        # Losing attempts are left to finish (or hit the client timeout) in the background
+        with self._lock:
+            self.timeouts += 1
+        raise TimeoutError(f"LLM call exceeded its {self.deadline:.0f}s deadline")
+
+    def stats(self):
+        with self._lock:
+            counters = {
+                'calls': self.calls,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'timeouts': self.timeouts,
+                'hedge_rate': round(self.hedges / self.calls, 4) if self.calls else 0.0
+            }
+        return {
+            **counters,
+            'call_latency': self.call_latency.snapshot(),
+            'attempt_latency': self.attempt_latency.snapshot()
+        }
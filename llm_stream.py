@@ -0,0 +1,233 @@
+"""
+Streamed chat completions and tolerant parsing of the JSON they carry
+
+StreamingCompletions asks the provider for a streamed response and
+reassembles the chunks into an ordinary ChatCompletion, so the hedging and
+cassette layers above it (and everything that reads `choices[0].message`)
+see no difference. If the connection drops mid-response, the text received
+so far is returned as a truncated response instead of losing the call.
+
+extract_json_fields recovers the fields of a finished response: strict JSON
+first, then json-repair for malformed or truncated output (unclosed strings
+and objects at max_tokens, trailing commas, comments), then whatever
+complete fields a JSONFieldStream reads from it. The evaluator asks the
+model again only for the fields that are still missing.
+"""
+
+import json
+import re
+import threading
+import time
+from openai.types.chat import ChatCompletion
+from llm_client import LatencyHistogram
+
+try:
+    import json_repair  # Optional: pip install json-repair
+except ImportError:
+    json_repair = None
+
+# Object in a ```json fence (the closing fence may be missing when output was cut off)
+FENCED_JSON_RE = re.compile(r'```(?:json)?\s*(\{.*?)\s*(?:```|$)', re.DOTALL)
+
+
+class JSONFieldStream:
+    """
+    Incremental reader of the top-level fields of a JSON object arriving in pieces
+
+    Text before the first '{' (a code fence, a preamble) is skipped. A field
+    is reported once the ',' or '}' after its value arrives; nested values
+    (detailed_scores) are reported whole.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+        self.closed = False  # The top-level object has ended
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    def feed(self, delta):
+        """
+        Append a piece of the response
+
+        Returns:
+            list: (key, value) pairs completed by this piece
+        """
+        self.text += delta
+        completed = []
+        text = self.text
+        for index in range(self._pos, len(text)):
+            if self.closed:
+                break
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = self._decode(text[self._key_start:index + 1])
+                        self._key_start = None
+            elif self._depth == 0:
+                if char == '{':
+                    self._depth = 1
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = index
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]' and self._depth > 1:
+                self._depth -= 1
+            elif self._depth == 1 and char == ':' and self._key is not None:
+                self._value_start = index + 1
+            elif self._depth == 1 and char in ',}':
+                if self._key is not None and self._value_start is not None:
+                    value = self._decode(text[self._value_start:index])
+                    if value is not None:
+                        self.fields[self._key] = value
+                        completed.append((self._key, value))
+                self._key = self._value_start = None
+                self.closed = char == '}'
+        self._pos = len(text)
+        return completed
+
+    @staticmethod
+    def _decode(fragment):
+        try:
+            return json.loads(fragment)
+        except ValueError:
+            return None
+
+
+def extract_json_fields(text):
+    """
+    Top-level fields of the JSON object in a model response, repairing it if needed
+
+    Returns:
+        tuple: (fields dict, how) where how is 'json', 'repaired', 'partial'
+               (complete fields of a broken object) or None (nothing usable)
+    """
+    text = text or ''
+    match = FENCED_JSON_RE.search(text)
+    if match:
+        candidate = match.group(1)
+    else:
+        start = text.find('{')
+        candidate = text[start:] if start >= 0 else text
+
+    try:
+        value = json.loads(candidate)
+        if isinstance(value, dict):
+            return value, 'json'
+    except ValueError:
+        end = candidate.rfind('}')
+        try:
+            value = json.loads(candidate[:end + 1]) if end >= 0 else None  # Trailing prose after the object
+            if isinstance(value, dict):
+                return value, 'json'
+        except ValueError:
+            pass
+
+    reader = JSONFieldStream()
+    reader.feed(text)
+    if json_repair is not None:
+        try:
+            value = json_repair.loads(candidate)
+        except Exception:
+            value = None
+        if isinstance(value, dict) and value:
+            if not reader.closed:
+                # Cut off: a number at the very end may have lost digits, so only complete ones are kept
+                value = {key: item for key, item in value.items()
+                         if key in reader.fields or not isinstance(item, (int, float))}
+            return value, 'repaired'
+    return reader.fields, ('partial' if reader.fields else None)
+
+
+class StreamingCompletions:
+    """
+    Drop-in for client.chat.completions that streams every call
+
+    Usage:
+        completions = StreamingCompletions(client.chat.completions)
+        response = completions.create(model=..., messages=...)  # a ChatCompletion
+    """
+
+    def __init__(self, completions):
+        self.completions = completions
+        self.response_latency = LatencyHistogram()  # Call start -> last chunk
+        self.streams = 0
+        self.truncated = 0  # Stopped at max_tokens
+        self.interrupted = 0  # Connection lost mid-response, partial response kept
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        """
+        Stream a chat completion and return it reassembled
+
+        Raises:
+            Exception: The provider's error if it failed before sending any content
+        """
+        started = time.monotonic()
+        stream = self.completions.create(stream=True, stream_options={'include_usage': True}, **kwargs)
+        if isinstance(stream, ChatCompletion):
+            return stream  # Backend without streaming support answered in one piece
+
+        parts = []
+        response = {'id': '', 'created': int(time.time()), 'model': kwargs.get('model', ''),
+                    'system_fingerprint': None, 'usage': None}
+        finish_reason = None
+        interrupted = False
+        try:
+            for chunk in stream:
+                response.update(id=chunk.id or response['id'], created=chunk.created or response['created'],
+                                model=chunk.model or response['model'])
+                response['system_fingerprint'] = chunk.system_fingerprint or response['system_fingerprint']
+                if chunk.usage is not None:
+                    response['usage'] = chunk.usage.model_dump(mode='json')
+                for choice in chunk.choices:
+                    if choice.index != 0:
+                        continue
+                    if choice.delta.content:
+                        parts.append(choice.delta.content)
+                    finish_reason = choice.finish_reason or finish_reason
+        except Exception as e:
+            if not parts:
+                raise
+            print(f"⚠️ LLM stream interrupted after {sum(map(len, parts))} characters ({e}); keeping the partial response")
+            finish_reason = 'length'
+            interrupted = True
+        finally:
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+
+        self.response_latency.record(time.monotonic() - started)
+        with self._lock:
+            self.streams += 1
+            if interrupted:
+                self.interrupted += 1
+            elif finish_reason == 'length':
+                self.truncated += 1
+        response.update(object='chat.completion', choices=[{
+            'index': 0,
+            'finish_reason': finish_reason or 'stop',
+            'message': {'role': 'assistant', 'content': ''.join(parts)}
+        }])
+        return ChatCompletion.model_validate(response)
+
+    def stats(self):
+        with self._lock:
+            counters = {'streams': self.streams, 'truncated': self.truncated, 'interrupted': self.interrupted}
+        return {
+            **counters,
+            'response_latency': self.response_latency.snapshot()
+        }
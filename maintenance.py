@@ -0,0 +1,401 @@
+"""
+Upload retention, compaction and disk garbage collection
+
+One pass walks the upload folder and:
+- removes `submission_<id>` folders whose submission row no longer exists
+  (e.g. the request rolled back after the files were saved)
+- removes `*_extracted` directories left behind by crashed ZIP extractions
+- expires resumable uploads that stopped receiving parts and drops their `.part` file
+- compresses raw uploads older than UPLOAD_RETENTION_DAYS once per blob:
+  content every link of which belongs to such a submission is stored as
+  `blobs/<sha256[:2]>/<sha256>.xz` and each upload becomes `<name>.xz`, a
+  hard link to it, so a compacted submission's `file_paths` no longer exist
+  on disk until `flask gc --restore <id>` (restore_archived_upload) puts the
+  raw files back. Content still shared with a newer submission and
+  already-compressed formats are left alone
+- removes blobs no submission folder links to any more
+
+Every step checks a time budget, so a pass stops early and the next one
+continues where the work is left; nothing here blocks request handling.
+"""
+
+import lzma
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from config import Config
+from models import db, Submission, UploadSession
+from utils import blob_path, hash_file, link_into_blob_store, submission_folder_path
+
+try:
+    import fcntl  # Unix only: keeps gunicorn workers from collecting at the same time
+except ImportError:
+    fcntl = None
+
+SUBMISSION_DIR_RE = re.compile(r'^submission_(\d+)$')
+COMPACTED_SUFFIX = '.xz'
+# Uploads in these formats are already compressed: xz would cost CPU for next to nothing
+COMPRESSED_EXTENSIONS = {'zip', 'gz', 'tgz', 'bz2', 'xz', '7z', 'rar', 'jar', 'pdf', 'docx', 'pptx', 'xlsx'}
+COMPACTION_BLOCK_SIZE = 1024 * 1024
+EXTRACTED_SUFFIX = '_extracted'
+
+_last_report = None
+_maintenance_thread = None
+
+
+class _Pass:
+    """Budget and bookkeeping for one garbage-collection pass"""
+
+    def __init__(self, budget_seconds, dry_run):
+        self.deadline = time.monotonic() + budget_seconds
+        self.dry_run = dry_run
+        self.report = {
+            'orphan_folders': 0,
+            'stale_extractions': 0,
+            'expired_uploads': 0,
+            'compacted_files': 0,
+            'unreferenced_blobs': 0,
+            'reclaimed_bytes': 0,
+            'complete': True,
+            'dry_run': dry_run,
+        }
+
+    def out_of_time(self):
+        if time.monotonic() >= self.deadline:
+            self.report['complete'] = False
+            return True
+        return False
+
+    def remove_tree(self, path, counter):
+        """Delete a file or directory tree, counting bytes actually freed"""
+        freed = _freed_bytes(path)
+        if not self.dry_run:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+        self.report[counter] += 1
+        self.report['reclaimed_bytes'] += freed
+
+
+def _freed_bytes(path):
+    """Bytes released by deleting path (hard-linked files still referenced elsewhere free nothing)"""
+    if not os.path.isdir(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return 0
+        return st.st_size if st.st_nlink <= 1 else 0
+
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += _freed_bytes(os.path.join(root, name))
+    return total
+
+
+def _is_older_than(path, seconds):
+    try:
+        return time.time() - os.path.getmtime(path) > seconds
+    except OSError:
+        return False
+
+
+def _scan_upload_folder(gc):
+    """Orphaned submission folders and stale extraction directories"""
+    grace = Config.MAINTENANCE_GRACE_SECONDS
+    upload_root = Config.UPLOAD_FOLDER
+
+    for entry in os.scandir(upload_root):
+        if gc.out_of_time():
+            return
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+
+        match = SUBMISSION_DIR_RE.match(entry.name)
+        if not match:
+            continue
+
+        if not _is_older_than(entry.path, grace):
+            continue  # Possibly still being written by an in-flight request
+
+        submission_id = int(match.group(1))
+        if db.session.query(Submission.id).filter(Submission.id == submission_id).first() is None:
+            gc.remove_tree(entry.path, 'orphan_folders')
+            continue
+
+        for child in os.scandir(entry.path):
+            if child.is_dir(follow_symlinks=False) and child.name.endswith(EXTRACTED_SUFFIX) \
+                    and _is_older_than(child.path, grace):
+                gc.remove_tree(child.path, 'stale_extractions')
+
+
+def _expire_abandoned_uploads(gc):
+    """Resumable uploads with no new part for UPLOAD_SESSION_TTL_HOURS"""
+    from resumable_upload import partial_path, discard_upload_state
+
+    cutoff = datetime.utcnow() - timedelta(hours=Config.UPLOAD_SESSION_TTL_HOURS)
+    stale = UploadSession.query.filter(
+        UploadSession.status == 'uploading',
+        UploadSession.updated_at < cutoff
+    ).order_by(UploadSession.updated_at).limit(100).all()
+
+    for session in stale:
+        if gc.out_of_time():
+            break
+        gc.remove_tree(partial_path(session), 'expired_uploads')
+        if not gc.dry_run:
+            session.status = 'expired'
+            session.submission.status = 'failed'
+            discard_upload_state(session.id)
+
+    if not gc.dry_run:
+        db.session.commit()
+
+
+def _blob_index(gc):
+    """(device, inode) -> digest of every uncompressed blob in the store"""
+    index = {}
+    blob_root = os.path.join(Config.UPLOAD_FOLDER, 'blobs')
+    if not os.path.isdir(blob_root):
+        return index
+    for shard in os.scandir(blob_root):
+        if gc.out_of_time():
+            return None
+        if not shard.is_dir(follow_symlinks=False):
+            continue
+        for blob in os.scandir(shard.path):
+            if not blob.name.endswith(COMPACTED_SUFFIX) and blob.is_file(follow_symlinks=False):
+                st = blob.stat(follow_symlinks=False)
+                index[(st.st_dev, st.st_ino)] = blob.name
+    return index
+
+
+def _compress(gc, source, destination):
+    """
+    xz-compress source into destination, checking the pass deadline between blocks
+
+    Returns:
+        bool: False if the budget ran out (nothing is left behind)
+    """
+    temp_path = destination + '.tmp'
+    compressor = lzma.LZMACompressor(preset=Config.COMPACTION_XZ_PRESET)
+    try:
+        with open(source, 'rb') as src, open(temp_path, 'wb') as out:
+            while True:
+                if gc.out_of_time():
+                    raise TimeoutError
+                block = src.read(COMPACTION_BLOCK_SIZE)
+                if not block:
+                    break
+                out.write(compressor.compress(block))
+            out.write(compressor.flush())
+        os.replace(temp_path, destination)
+        return True
+    except TimeoutError:
+        os.remove(temp_path)
+        return False
+
+
+def _compact_old_uploads(gc):
+    """
+    Compress the raw uploads of finished submissions older than the retention age, once per blob
+
+    Uploads are hard links into the blob store, so archiving a submission
+    folder would free nothing while the blob (or an identical upload of
+    another submission) still holds the content. Content is compressed only
+    when every link to it is an old, finished submission's upload; each of
+    those is replaced by a link to the compressed blob, and the original
+    blob is removed. At most COMPACTION_MAX_BYTES of input are compressed
+    per pass; larger files are never compacted.
+    """
+    if Config.UPLOAD_RETENTION_DAYS <= 0:
+        return
+
+    cutoff = datetime.utcnow() - timedelta(days=Config.UPLOAD_RETENTION_DAYS)
+    candidates = db.session.query(Submission.id).filter(
+        Submission.submitted_at < cutoff,
+        or_(Submission.status.in_(['evaluated', 'failed']), Submission.evaluated.is_(True))
+    ).order_by(Submission.id)
+
+    # Old uploads grouped by content (inode): paths, size, link count
+    links = {}
+    for (submission_id,) in candidates.yield_per(500):
+        if gc.out_of_time():
+            return
+        folder = submission_folder_path(submission_id)
+        if not os.path.isdir(folder):
+            continue
+        for entry in os.scandir(folder):
+            extension = entry.name.rsplit('.', 1)[-1].lower() if '.' in entry.name else ''
+            if not entry.is_file(follow_symlinks=False) or extension in COMPRESSED_EXTENSIONS:
+                continue
+            st = entry.stat(follow_symlinks=False)
+            if st.st_size > Config.COMPACTION_MAX_BYTES:
+                continue
+            group = links.setdefault((st.st_dev, st.st_ino), {'paths': [], 'size': st.st_size, 'nlink': st.st_nlink})
+            group['paths'].append(entry.path)
+    if not links:
+        return
+
+    blobs = _blob_index(gc)
+    if blobs is None:
+        return
+    budget = Config.COMPACTION_MAX_BYTES
+    for key, group in links.items():
+        digest = blobs.get(key)
+        # Every link must be accounted for: one left elsewhere (a newer upload) keeps the content alive
+        if len(group['paths']) + (1 if digest else 0) != group['nlink']:
+            continue
+        if group['size'] > budget:
+            gc.report['complete'] = False
+            return
+        if gc.dry_run:
+            gc.report['compacted_files'] += len(group['paths'])
+            gc.report['reclaimed_bytes'] += group['size']
+            continue
+
+        source = group['paths'][0]
+        digest = digest or hash_file(source).hexdigest()
+        compressed = blob_path(digest) + COMPACTED_SUFFIX
+        os.makedirs(os.path.dirname(compressed), exist_ok=True)
+        created = not os.path.exists(compressed)  # Else an identical upload was compacted before
+        if created and not _compress(gc, source, compressed):
+            return
+        budget -= group['size']
+
+        for path in group['paths']:
+            temp_link = path + COMPACTED_SUFFIX + '.tmp'
+            os.link(compressed, temp_link)
+            os.replace(temp_link, path + COMPACTED_SUFFIX)
+            os.remove(path)
+        if os.path.exists(blob_path(digest)):
+            os.remove(blob_path(digest))
+        gc.report['compacted_files'] += len(group['paths'])
+        gc.report['reclaimed_bytes'] += group['size'] - (os.path.getsize(compressed) if created else 0)
+
+
+def restore_archived_upload(submission_id):
+    """
+    Put a compacted submission's raw uploads back in place (re-linked into the blob store)
+
+    Compaction renames each upload to `<name>.xz`, so the submission's
+    `file_paths` are stale until this has run; call it before reading them
+    again (e.g. to re-extract or re-evaluate an old submission).
+
+    Returns:
+        bool: True if anything was restored
+    """
+    restored = False
+    folder = submission_folder_path(submission_id)
+    if not os.path.isdir(folder):
+        return restored
+    for entry in os.scandir(folder):
+        if not entry.name.endswith(COMPACTED_SUFFIX) or not entry.is_file(follow_symlinks=False):
+            continue
+        original = entry.path[:-len(COMPACTED_SUFFIX)]
+        temp_path = original + '.tmp'
+        with lzma.open(entry.path, 'rb') as src, open(temp_path, 'wb') as out:
+            shutil.copyfileobj(src, out, COMPACTION_BLOCK_SIZE)
+        os.replace(temp_path, original)
+        link_into_blob_store(original, hash_file(original).hexdigest())
+        os.remove(entry.path)
+        restored = True
+    return restored
+
+
+def _remove_unreferenced_blobs(gc):
+    """Blobs whose only remaining link is the store itself"""
+    blob_root = os.path.join(Config.UPLOAD_FOLDER, 'blobs')
+    if not os.path.isdir(blob_root):
+        return
+
+    grace = Config.MAINTENANCE_GRACE_SECONDS
+    for shard in os.scandir(blob_root):
+        if not shard.is_dir(follow_symlinks=False):
+            continue
+        for blob in os.scandir(shard.path):
+            if gc.out_of_time():
+                return
+            st = blob.stat(follow_symlinks=False)
+            # Grace period: an upload may be between saving its file and linking it
+            # (compressed blobs are linked before their source blob is removed)
+            if st.st_nlink <= 1 and time.time() - st.st_mtime > grace:
+                gc.remove_tree(blob.path, 'unreferenced_blobs')
+
+
+def collect_garbage(budget_seconds=None, dry_run=False):
+    """
+    Run one incremental maintenance pass (needs an app context)
+
+    Args:
+        budget_seconds (float): Stop after this long; the next pass picks up the rest
+        dry_run (bool): Only report what would be removed
+
+    Returns:
+        dict: Counts per category, reclaimed_bytes, and complete=False if the budget ran out
+    """
+    global _last_report
+    gc = _Pass(Config.MAINTENANCE_BUDGET_SECONDS if budget_seconds is None else budget_seconds, dry_run)
+    if not os.path.isdir(Config.UPLOAD_FOLDER):
+        return gc.report
+
+    lock_file = open(os.path.join(Config.UPLOAD_FOLDER, '.maintenance.lock'), 'w')
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                gc.report.update(complete=False, skipped='another process is collecting')
+                return gc.report
+
+        started = time.monotonic()
+        _scan_upload_folder(gc)
+        if not gc.out_of_time():
+            _expire_abandoned_uploads(gc)
+        if not gc.out_of_time():
+            _compact_old_uploads(gc)
+        if not gc.out_of_time():
+            _remove_unreferenced_blobs(gc)  # After compaction, which releases blob links
+        gc.report['seconds'] = round(time.monotonic() - started, 3)
+    finally:
+        lock_file.close()
+
+    report = gc.report
+    if not dry_run:
+        _last_report = {**report, 'finished_at': datetime.utcnow().isoformat()}
+    print(f"🧹 Maintenance: reclaimed {report['reclaimed_bytes']:,} bytes "
+          f"({report['orphan_folders']} orphan folders, {report['stale_extractions']} stale extractions, "
+          f"{report['expired_uploads']} expired uploads, {report['compacted_files']} compacted, "
+          f"{report['unreferenced_blobs']} blobs){'' if report['complete'] else ' - budget reached, continuing next pass'}")
+    return report
+
+
+def last_report():
+    return _last_report
+
+
+def _maintenance_loop(app, interval):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                collect_garbage()
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Maintenance pass failed: {str(e)}")
+
+
+def start_maintenance(app):
+    """Run collect_garbage every MAINTENANCE_INTERVAL seconds in a daemon thread (0 disables)"""
+    global _maintenance_thread
+    interval = app.config.get('MAINTENANCE_INTERVAL', 0)
+    if interval <= 0 or _maintenance_thread is not None:
+        return
+    _maintenance_thread = threading.Thread(target=_maintenance_loop, args=(app, interval),
+                                           name='upload-maintenance', daemon=True)
+    _maintenance_thread.start()
@@ -1,9 +1,54 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timezone
+from sqlalchemy import inspect, text, func, select, insert, delete, literal, or_
+from datetime import datetime, timedelta, timezone
 import json
+from config import Config
 
 db = SQLAlchemy()
 
+def ensure_schema():
+    """
+    Create missing tables and add columns and indexes introduced after a table was created
+
+    create_all() never alters existing tables, so new nullable columns are
+    added here with ALTER TABLE, and their indexes (including unique ones)
+    with CREATE INDEX. Also builds the full-text search index (SQLite) and
+    backfills score statistics of hackathons that have none.
+    Run explicitly (flask init-db), not at import.
+
+    Returns:
+        list: "table.column", "table.index" and search table names that were added
+    """
+    db.create_all()
+    
+    inspector = inspect(db.engine)
+    added = []
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                added.append(f"{table.name}.{column.name}")
+            indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+                    added.append(f"{table.name}.{index.name}")
+    
+    # Imported here: both modules import this one
+    from search_index import SEARCH_TABLE, ensure_search_index
+    from score_stats import rebuild_score_stats
+    if ensure_search_index():
+        added.append(SEARCH_TABLE)
+    backfilled = rebuild_score_stats()
+    if backfilled:
+        db.session.commit()
+        print(f"📊 Score statistics backfilled for {backfilled} hackathon(s)")
+    return added
+
 class Hackathon(db.Model):
     __tablename__ = 'hackathons'
     
@@ -15,10 +60,103 @@ class Hackathon(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     deadline = db.Column(db.DateTime)
     host_email = db.Column(db.String(200))
+    # LLM budgets (NULL = config default for per-submission, unlimited for hackathon totals)
+    token_budget = db.Column(db.BigInteger)  # Tokens across all submissions of the hackathon
+    call_budget = db.Column(db.Integer)  # LLM calls across all submissions of the hackathon
+    submission_token_budget = db.Column(db.Integer)
+    submission_call_budget = db.Column(db.Integer)
+    # Admission limits (NULL = only the server-wide limits apply)
+    max_inflight_evaluations = db.Column(db.Integer)  # Evaluations of this hackathon running at once
+    max_queued_tokens = db.Column(db.BigInteger)  # LLM tokens its running evaluations may still have queued
     
     submissions = db.relationship('Submission', backref='hackathon', lazy=True, cascade='all, delete-orphan')
     
-    def to_dict(self):
+    def llm_usage(self):
+        """Tokens and calls spent on this hackathon's evaluations so far"""
+        tokens, calls = db.session.query(
+            func.coalesce(func.sum(Evaluation.tokens_used), 0),
+            func.coalesce(func.sum(Evaluation.llm_calls), 0)
+        ).join(Submission, Evaluation.submission_id == Submission.id).filter(
+            Submission.hackathon_id == self.id
+        ).one()
+        return {'tokens': int(tokens), 'calls': int(calls)}
+    
+    def reserved_llm_usage(self):
+        """Tokens and calls reserved by evaluations still running"""
+        tokens, calls = db.session.query(
+            func.coalesce(func.sum(BudgetReservation.tokens), 0),
+            func.coalesce(func.sum(BudgetReservation.calls), 0)
+        ).filter(
+            BudgetReservation.hackathon_id == self.id,
+            BudgetReservation.created_at >= BudgetReservation.live_since()
+        ).one()
+        return {'tokens': int(tokens), 'calls': int(calls)}
+    
+    def submission_budget(self):
+        """
+        Budget for the next submission's evaluation: the per-submission limit,
+        capped by what is left of the hackathon total after spent and reserved usage
+
+        Returns:
+            dict: {'tokens': int or None, 'calls': int or None}; None means unlimited
+        """
+        budget = {
+            'tokens': self.submission_token_budget or Config.SUBMISSION_TOKEN_BUDGET or None,
+            'calls': self.submission_call_budget or Config.SUBMISSION_CALL_BUDGET or None
+        }
+        if self.token_budget or self.call_budget:
+            used = self.llm_usage()
+            reserved = self.reserved_llm_usage()
+            for key, total in (('tokens', self.token_budget), ('calls', self.call_budget)):
+                if total:
+                    remaining = max(0, total - used[key] - reserved[key])
+                    budget[key] = remaining if budget[key] is None else min(budget[key], remaining)
+        return budget
+    
+    def reserve_budget(self, tokens, calls):
+        """
+        Atomically set aside part of the hackathon totals for one evaluation
+
+        Runs on its own connection and commits at once, so the session's
+        objects are neither flushed nor expired (under SQLite the session must
+        hold no write lock). Expired reservations are dropped first; the check
+        against spent and reserved usage and the insert are then one
+        INSERT ... SELECT with the hackathon row locked, so two evaluations
+        can never both take the last of the budget. The caller deletes the
+        reservation in the transaction that stores the evaluation.
+
+        Returns:
+            int: BudgetReservation id, or None when the totals cannot cover it
+        """
+        live_since = BudgetReservation.live_since()
+        conditions = [Hackathon.id == self.id]
+        for amount, total, spent, reserved in (
+            (tokens, Hackathon.token_budget, Evaluation.tokens_used, BudgetReservation.tokens),
+            (calls, Hackathon.call_budget, Evaluation.llm_calls, BudgetReservation.calls)
+        ):
+            used = select(func.coalesce(func.sum(spent), 0)).join(
+                Submission, Evaluation.submission_id == Submission.id
+            ).where(Submission.hackathon_id == self.id).scalar_subquery()
+            held = select(func.coalesce(func.sum(reserved), 0)).where(
+                BudgetReservation.hackathon_id == self.id, BudgetReservation.created_at >= live_since
+            ).scalar_subquery()
+            conditions.append(or_(total.is_(None), total == 0, total - used - held >= amount))
+        
+        with db.engine.begin() as conn:
+            conn.execute(delete(BudgetReservation).where(
+                BudgetReservation.hackathon_id == self.id, BudgetReservation.created_at < live_since))
+            conn.execute(select(Hackathon.id).where(Hackathon.id == self.id).with_for_update())
+            return conn.execute(
+                insert(BudgetReservation).from_select(
+                    ['hackathon_id', 'tokens', 'calls', 'created_at'],
+                    select(Hackathon.id, literal(tokens), literal(calls), literal(datetime.utcnow())).where(*conditions)
+                ).returning(BudgetReservation.id)
+            ).scalar()
+    
+    def to_dict(self, submission_count=None):
+        if submission_count is None:
+            # COUNT query instead of len(self.submissions), which would load every submission's code blobs
+            submission_count = db.session.query(func.count(Submission.id)).filter(Submission.hackathon_id == self.id).scalar()
         return {
             'id': self.id,
             'name': self.name,
@@ -28,7 +166,17 @@ class Hackathon(db.Model):
             'created_at': self.created_at.isoformat(),
             'deadline': self.deadline.isoformat() if self.deadline else None,
             'host_email': self.host_email,
-            'submission_count': len(self.submissions)
+            'submission_count': submission_count,
+            'budget': {
+                'token_budget': self.token_budget,
+                'call_budget': self.call_budget,
+                'submission_token_budget': self.submission_token_budget,
+                'submission_call_budget': self.submission_call_budget
+            },
+            'admission': {
+                'max_inflight_evaluations': self.max_inflight_evaluations,
+                'max_queued_tokens': self.max_queued_tokens
+            }
         }
 
 
@@ -44,10 +192,19 @@ class Submission(db.Model):
     code_content = db.Column(db.Text)  # Extracted code content
     documentation_content = db.Column(db.Text)  # Extracted documentation
     file_paths = db.Column(db.Text)  # JSON string of uploaded file paths
+    static_metrics = db.Column(db.Text)  # JSON string of static analysis metrics
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     evaluated = db.Column(db.Boolean, default=False)
+    status = db.Column(db.String(20))  # uploading | processing | evaluated | failed | budget_exhausted
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the uploaded archive(s)
+    reused_from_id = db.Column(db.Integer, db.ForeignKey('submissions.id'))  # Set when content + evaluation were reused
+    idempotency_key = db.Column(db.String(255), unique=True, index=True)  # Idempotency-Key header, or derived from hackathon + team + upload
+    repository_url = db.Column(db.String(1000), index=True)  # Git submissions: repository path or URL
+    commit_sha = db.Column(db.String(64))  # Git submissions: commit evaluated
+    source_tree = db.Column(db.Text)  # Git submissions: JSON {path: blob id} of the extracted files
     
     evaluation = db.relationship('Evaluation', backref='submission', uselist=False, cascade='all, delete-orphan')
+    reused_from = db.relationship('Submission', remote_side=[id], foreign_keys=[reused_from_id])
     
     def to_dict(self):
         return {
@@ -59,7 +216,42 @@ class Submission(db.Model):
             'project_description': self.project_description,
             'submitted_at': self.submitted_at.isoformat(),
             'evaluated': self.evaluated,
-            'file_count': len(json.loads(self.file_paths)) if self.file_paths else 0
+            'status': self.status or ('evaluated' if self.evaluated else 'pending'),
+            'content_hash': self.content_hash,
+            'reused_from_id': self.reused_from_id,
+            'reused_evaluation': self.reused_from_id is not None,
+            'repository_url': self.repository_url,
+            'commit_sha': self.commit_sha,
+            'file_count': len(json.loads(self.file_paths)) if self.file_paths else 0,
+            'static_metrics': json.loads(self.static_metrics) if self.static_metrics else None
+        }
+
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    
+    id = db.Column(db.String(32), primary_key=True)  # Random hex token handed to the client
+    submission_id = db.Column(db.Integer, db.ForeignKey('submissions.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    received_size = db.Column(db.BigInteger, default=0)
+    expected_sha256 = db.Column(db.String(64))  # Optional, supplied by the client at init
+    sha256 = db.Column(db.String(64))  # Computed while streaming, set on finalize
+    status = db.Column(db.String(20), default='uploading')  # uploading | finalized
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    submission = db.relationship('Submission', backref=db.backref('upload_sessions', cascade='all, delete-orphan'))
+    
+    def to_dict(self):
+        return {
+            'upload_id': self.id,
+            'submission_id': self.submission_id,
+            'filename': self.filename,
+            'total_size': self.total_size,
+            'received_size': self.received_size,
+            'sha256': self.sha256,
+            'status': self.status
         }
 
 
@@ -67,7 +259,7 @@ class Evaluation(db.Model):
     __tablename__ = 'evaluations'
     
     id = db.Column(db.Integer, primary_key=True)
-    submission_id = db.Column(db.Integer, db.ForeignKey('submissions.id'), nullable=False)
+    submission_id = db.Column(db.Integer, db.ForeignKey('submissions.id'), nullable=False, index=True)
     relevance_score = db.Column(db.Float, default=0.0)
     technical_complexity_score = db.Column(db.Float, default=0.0)
     creativity_score = db.Column(db.Float, default=0.0)
@@ -76,6 +268,15 @@ class Evaluation(db.Model):
     overall_score = db.Column(db.Float, default=0.0)
     feedback = db.Column(db.Text)  # AI-generated feedback
     detailed_scores = db.Column(db.Text)  # JSON string of detailed criteria scores
+    chunks_total = db.Column(db.Integer)  # Chunks the code was split into (chunked evaluation only)
+    chunks_evaluated = db.Column(db.Integer)  # Chunks actually sent to the LLM (< total when stopped early)
+    tokens_used = db.Column(db.Integer)  # Prompt + completion tokens across all LLM calls
+    llm_calls = db.Column(db.Integer)
+    token_budget = db.Column(db.Integer)  # Budget applied to this evaluation (NULL = unlimited)
+    call_budget = db.Column(db.Integer)
+    degradation_level = db.Column(db.Integer)  # 0 full, 1 fewer chunks, 2 priority files only, 3 truncated single call
+    fallback_reason = db.Column(db.Text)  # Error that made chunked evaluation fall back to one truncated call (NULL = none)
+    llm_results = db.Column(db.Text)  # JSON of ChunkResultCache.to_dict(): per-call results and chunk layout, reused by the next revision
     evaluated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -90,6 +291,14 @@ class Evaluation(db.Model):
             'overall_score': self.overall_score,
             'feedback': self.feedback,
             'detailed_scores': json.loads(self.detailed_scores) if self.detailed_scores else {},
+            'chunks_total': self.chunks_total,
+            'chunks_evaluated': self.chunks_evaluated,
+            'tokens_used': self.tokens_used,
+            'llm_calls': self.llm_calls,
+            'token_budget': self.token_budget,
+            'call_budget': self.call_budget,
+            'degradation_level': self.degradation_level,
+            'fallback_reason': self.fallback_reason,
                     # Ensure UTC marker so clients can convert correctly
                     'evaluated_at': (
                         (self.evaluated_at.replace(tzinfo=timezone.utc) if self.evaluated_at.tzinfo is None else self.evaluated_at.astimezone(timezone.utc))
@@ -99,3 +308,72 @@ class Evaluation(db.Model):
         }
 
 
+
+
+class BudgetReservation(db.Model):
+    """
+    LLM spend set aside for an evaluation that is still running
+
+    Counted against the hackathon totals next to the spend of stored
+    evaluations, and deleted in the transaction that stores the evaluation.
+    Reservations older than BUDGET_RESERVATION_TTL_SECONDS (a crashed
+    worker's) no longer count.
+    """
+    __tablename__ = 'budget_reservations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hackathon_id = db.Column(db.Integer, db.ForeignKey('hackathons.id'), nullable=False, index=True)
+    tokens = db.Column(db.BigInteger, nullable=False, default=0)  # Estimated tokens of the planned calls
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    hackathon = db.relationship('Hackathon', backref=db.backref('budget_reservations', cascade='all, delete-orphan'))
+    
+    @staticmethod
+    def live_since():
+        """Oldest created_at of a reservation that still counts"""
+        return datetime.utcnow() - timedelta(seconds=Config.BUDGET_RESERVATION_TTL_SECONDS)
+
+
+class HackathonScoreStats(db.Model):
+    """
+    Running aggregates of one score column over a hackathon's evaluations
+
+    Kept in step with the evaluations table by score_stats.py, so the
+    distribution and mean of a criterion are read without scanning
+    submissions. Histogram bins are [0, 1), [1, 2), ... [9, 10].
+    """
+    __tablename__ = 'hackathon_score_stats'
+    __table_args__ = (db.UniqueConstraint('hackathon_id', 'criterion', name='uq_hackathon_score_stats'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hackathon_id = db.Column(db.Integer, db.ForeignKey('hackathons.id'), nullable=False)
+    criterion = db.Column(db.String(50), nullable=False)  # Evaluation score column, e.g. overall_score
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    total_squares = db.Column(db.Float, nullable=False, default=0.0)
+    bin_0 = db.Column(db.Integer, nullable=False, default=0)
+    bin_1 = db.Column(db.Integer, nullable=False, default=0)
+    bin_2 = db.Column(db.Integer, nullable=False, default=0)
+    bin_3 = db.Column(db.Integer, nullable=False, default=0)
+    bin_4 = db.Column(db.Integer, nullable=False, default=0)
+    bin_5 = db.Column(db.Integer, nullable=False, default=0)
+    bin_6 = db.Column(db.Integer, nullable=False, default=0)
+    bin_7 = db.Column(db.Integer, nullable=False, default=0)
+    bin_8 = db.Column(db.Integer, nullable=False, default=0)
+    bin_9 = db.Column(db.Integer, nullable=False, default=0)
+    
+    hackathon = db.relationship('Hackathon', backref=db.backref('score_stats', cascade='all, delete-orphan'))
+    
+    def histogram(self):
+        return [getattr(self, f'bin_{index}') for index in range(10)]
+    
+    def to_dict(self):
+        mean = self.total / self.count if self.count else None
+        variance = max(0.0, self.total_squares / self.count - mean * mean) if self.count else None
+        return {
+            'count': self.count,
+            'mean': round(mean, 3) if mean is not None else None,
+            'stddev': round(variance ** 0.5, 3) if variance is not None else None,
+            'histogram': self.histogram()
+        }
@@ -0,0 +1,243 @@
+"""
+Opt-in profiling of live requests and submissions
+
+Nothing here runs unless PROFILING_ADMIN_TOKEN is set: without it the
+middleware is not installed and the admin routes answer 404. With it, a
+profile is taken for
+- a request carrying `X-Profile: cprofile|sampling` and the admin token,
+- the next N requests of this worker process, once armed via the admin route,
+- the extraction and evaluation of an armed submission id (also in the
+  background worker that evaluates finalized resumable uploads).
+
+Two profilers:
+- cprofile: deterministic, the profiled thread only; stored as `.pstats`
+  (open with `python -m pstats` or snakeviz).
+- sampling: a daemon thread snapshots stacks every PROFILE_SAMPLE_INTERVAL
+  seconds, for the profiled thread plus the chunk-evaluation and LLM call
+  threads it fans out to; stored as `.collapsed` (one `a;b;c count` line per
+  stack, the input of flamegraph.pl / speedscope). Fan-out threads of other
+  submissions running at the same time are included as well; the first
+  frame of every stack is the thread name.
+
+Arming is per worker process; profiles go to PROFILE_FOLDER, shared by all
+workers, which keeps the newest PROFILE_KEEP files.
+"""
+
+import cProfile
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from config import Config
+
+PROFILE_MODES = ('cprofile', 'sampling')
+PROFILE_EXTENSIONS = {'cprofile': '.pstats', 'sampling': '.collapsed'}
+FAN_OUT_THREAD_PREFIXES = ('chunk-eval', 'llm-call')  # Threads a submission's evaluation runs on
+PROFILE_NAME_RE = re.compile(r'^[\w.-]+\.(pstats|collapsed)$')
+
+_lock = threading.Lock()
+_armed_requests = {'remaining': 0, 'mode': 'cprofile'}
+_armed_submissions = {}  # submission id -> mode
+_profiling = threading.local()  # Set while the current thread is being profiled
+
+
+def enabled():
+    return bool(Config.PROFILING_ADMIN_TOKEN)
+
+
+def is_admin(token):
+    """Constant-time check of an admin token (always False while profiling is disabled)"""
+    return enabled() and bool(token) and hmac.compare_digest(token, Config.PROFILING_ADMIN_TOKEN)
+
+
+def arm(requests=0, submission_id=None, mode='cprofile'):
+    """
+    Profile the next `requests` requests and/or the next run of a submission
+
+    Returns:
+        dict: Current arming state
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+    with _lock:
+        if requests:
+            _armed_requests.update(remaining=requests, mode=mode)
+        if submission_id is not None:
+            _armed_submissions[submission_id] = mode
+    return armed()
+
+
+def disarm():
+    with _lock:
+        _armed_requests['remaining'] = 0
+        _armed_submissions.clear()
+    return armed()
+
+
+def armed():
+    with _lock:
+        return {
+            'pid': os.getpid(),
+            'requests': dict(_armed_requests),
+            'submissions': {str(key): mode for key, mode in _armed_submissions.items()},
+        }
+
+
+class SamplingProfiler:
+    """Periodic stack snapshots of one thread and the fan-out threads, counted per collapsed stack"""
+
+    def __init__(self, thread_id, interval=None):
+        self.thread_id = thread_id
+        self.interval = interval or Config.PROFILE_SAMPLE_INTERVAL
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if ident != self.thread_id and not name.startswith(FAN_OUT_THREAD_PREFIXES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if len(stack) == 1 and stack[0].startswith('_worker '):
+                    continue  # Idle pool thread waiting for work
+                self.counts[';'.join([name] + stack[::-1])] += 1
+            self.samples += 1
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _profile_path(label, mode):
+    os.makedirs(Config.PROFILE_FOLDER, exist_ok=True)
+    stamp = time.strftime('%Y%m%dT%H%M%S')
+    name = re.sub(r'[^\w.-]+', '-', f"{stamp}-{os.getpid()}-{label}").strip('-')
+    return os.path.join(Config.PROFILE_FOLDER, name + PROFILE_EXTENSIONS[mode])
+
+
+def _prune():
+    """Keep only the newest PROFILE_KEEP profiles"""
+    profiles = sorted(list_profiles(), key=lambda p: p['modified'], reverse=True)
+    for profile in profiles[Config.PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(Config.PROFILE_FOLDER, profile['name']))
+        except OSError:
+            pass
+
+
+@contextmanager
+def profile(label, mode='cprofile'):
+    """Profile the enclosed block of the current thread and store the result"""
+    if getattr(_profiling, 'active', False):
+        yield None  # Already covered by an enclosing profile of this thread
+        return
+
+    _profiling.active = True
+    started = time.monotonic()
+    if mode == 'sampling':
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield profiler
+    finally:
+        if mode == 'sampling':
+            profiler.stop()
+        else:
+            profiler.disable()
+        _profiling.active = False
+        path = _profile_path(label, mode)
+        if mode == 'sampling':
+            profiler.dump(path)
+        else:
+            profiler.dump_stats(path)
+        print(f"🔬 Profile of {label} ({time.monotonic() - started:.2f}s, {mode}) saved to {path}")
+        _prune()
+
+
+def submission_profile(submission_id):
+    """Profile context for a submission's extraction + evaluation; a no-op unless that id is armed"""
+    if not _armed_submissions:
+        return nullcontext()
+    with _lock:
+        mode = _armed_submissions.pop(submission_id, None)
+    if mode is None:
+        return nullcontext()
+    return profile(f'submission-{submission_id}', mode)
+
+
+def _take_request_slot():
+    with _lock:
+        if _armed_requests['remaining'] <= 0:
+            return None
+        _armed_requests['remaining'] -= 1
+        return _armed_requests['mode']
+
+
+class ProfilingMiddleware:
+    """
+    WSGI wrapper that profiles requests asking for it (header) or armed ones
+
+    Installed by create_app only when PROFILING_ADMIN_TOKEN is set. Covers
+    the view up to the returned response; streamed bodies (exports) are
+    produced after that and are not included.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith('/api/debug/profiles'):
+            return self.wsgi_app(environ, start_response)
+
+        mode = environ.get('HTTP_X_PROFILE', '').lower()
+        if mode not in PROFILE_MODES or not is_admin(environ.get('HTTP_X_ADMIN_TOKEN')):
+            mode = _take_request_slot() if _armed_requests['remaining'] > 0 else None
+        if mode is None:
+            return self.wsgi_app(environ, start_response)
+
+        with profile(f"{environ.get('REQUEST_METHOD', 'GET')}-{path}", mode):
+            return self.wsgi_app(environ, start_response)
+
+
+def list_profiles():
+    if not os.path.isdir(Config.PROFILE_FOLDER):
+        return []
+    profiles = []
+    for entry in os.scandir(Config.PROFILE_FOLDER):
+        if entry.is_file() and PROFILE_NAME_RE.match(entry.name):
+            stat = entry.stat()
+            profiles.append({'name': entry.name, 'bytes': stat.st_size, 'modified': stat.st_mtime})
+    return sorted(profiles, key=lambda p: p['modified'], reverse=True)
+
+
+def profile_file(name):
+    """Absolute path of a stored profile, None for unknown or unsafe names"""
+    if not PROFILE_NAME_RE.match(name):
+        return None
+    path = os.path.join(Config.PROFILE_FOLDER, name)
+    return path if os.path.isfile(path) else None
@@ -0,0 +1,162 @@
+"""
+Resumable chunked uploads for large archives
+
+Protocol: init -> PUT byte ranges -> finalize. Ranges must continue at the
+last acknowledged offset, so a dropped connection only costs the part in
+flight: the client asks for the current offset and resumes from there.
+Bytes are streamed straight into the submission folder and hashed as they
+arrive, so server memory stays flat regardless of archive size.
+"""
+
+import os
+import re
+import hashlib
+import secrets
+import threading
+from contextlib import contextmanager
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.utils import secure_filename
+from utils import hash_file, submission_folder_path
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+STREAM_BLOCK_SIZE = 1024 * 1024  # Bytes read from the request per write
+
+# In-process incremental hash state: upload id -> (offset, hasher)
+_hash_states = {}
+_upload_locks = {}  # upload id -> [lock, requests holding or waiting for it]
+_registry_lock = threading.Lock()
+
+
+class UploadRangeError(Exception):
+    """Raised when a part does not continue the upload at the acknowledged offset"""
+
+
+def new_upload_id():
+    return secrets.token_hex(16)
+
+
+def final_path(session):
+    return os.path.join(submission_folder_path(session.submission_id), secure_filename(session.filename))
+
+
+def partial_path(session):
+    return final_path(session) + '.part'
+
+
+def parse_content_range(header):
+    """
+    Parse a `Content-Range: bytes start-end/total` header
+
+    Returns:
+        tuple: (start, end inclusive, total or None)
+    """
+    match = CONTENT_RANGE_RE.match((header or '').strip())
+    if not match:
+        raise UploadRangeError("Content-Range header must look like 'bytes <start>-<end>/<total>'")
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    if end < start:
+        raise UploadRangeError("Content-Range end is before start")
+    return start, end, None if total == '*' else int(total)
+
+
+@contextmanager
+def upload_lock(upload_id):
+    """
+    Per-upload lock so two parts of the same upload never interleave in this process
+
+    Only an optimization: parts sent to different gunicorn workers are not
+    serialized by it. Correctness comes from the conditional acknowledgement
+    (received_size only moves from the offset the part started at), which
+    lets one of two racing parts through and answers the other with 409.
+    Entries are reference-counted and removed when the last holder or waiter
+    leaves, so the registry only holds uploads with a request in progress.
+    """
+    with _registry_lock:
+        entry = _upload_locks.setdefault(upload_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _registry_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                _upload_locks.pop(upload_id, None)
+
+
+def _hasher_at(session):
+    """SHA-256 state covering exactly the acknowledged bytes"""
+    state = _hash_states.get(session.id)
+    if state is not None and state[0] == session.received_size:
+        return state[1]
+    # Earlier parts went to another worker (or the process restarted): rebuild from disk
+    if not session.received_size:
+        return hashlib.sha256()
+    return hash_file(partial_path(session), limit=session.received_size)
+
+
+def write_range(session, stream, start, length):
+    """
+    Stream one part from the request body into the partial file
+
+    Args:
+        session (UploadSession): Upload being written
+        stream: File-like request body (read incrementally, never buffered whole)
+        start (int): Offset of the first byte; must equal session.received_size
+        length (int): Number of bytes in this part
+
+    Returns:
+        int: New acknowledged size (less than start + length if the client disconnected)
+    """
+    if start != session.received_size:
+        raise UploadRangeError(f"Expected a part starting at byte {session.received_size}, got {start}")
+    if start + length > session.total_size:
+        raise UploadRangeError(f"Part ends past the declared size of {session.total_size} bytes")
+
+    hasher = _hasher_at(session)
+    path = partial_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+        f.seek(start)
+        f.truncate()  # Drop unacknowledged bytes left by an interrupted part
+        try:
+            while written < length:
+                block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                f.write(block)
+                hasher.update(block)
+                written += len(block)
+        except (ClientDisconnected, OSError) as e:
+            print(f"⚠️ Upload {session.id} interrupted after {start + written:,} bytes: {str(e)}")
+
+    received = start + written
+    _hash_states[session.id] = (received, hasher)
+    return received
+
+
+def finalize_upload(session):
+    """
+    Validate a complete upload and move it into place
+
+    Returns:
+        tuple: (final file path, sha256 hex digest)
+    """
+    if session.received_size != session.total_size:
+        raise UploadRangeError(f"Upload incomplete: {session.received_size} of {session.total_size} bytes received")
+
+    digest = _hasher_at(session).hexdigest()
+    if session.expected_sha256 and digest != session.expected_sha256.lower():
+        raise UploadRangeError(f"SHA-256 mismatch: expected {session.expected_sha256}, got {digest}")
+
+    path = final_path(session)
+    os.replace(partial_path(session), path)
+    discard_upload_state(session.id)
+    return path, digest
+
+
+def discard_upload_state(upload_id):
+    _hash_states.pop(upload_id, None)
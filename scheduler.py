@@ -0,0 +1,183 @@
+"""
+Fair-share scheduling of LLM call slots across concurrent submissions
+
+A process has LLM_MAX_CONCURRENT_CALLS call slots. When they are all busy,
+the next free slot goes to the hackathon, then the submission within it,
+that has received the least service so far (start-time fair queuing):
+every granted call advances the job's virtual time by 1/weight, and small
+jobs get a larger weight. A 500-chunk monorepo therefore cannot hold the
+slots while a 2-file submission waits behind it; the small job's calls are
+served as soon as a slot frees.
+
+Usage:
+    with scheduler.job(submission_id, hackathon_id, expected_calls):
+        ...
+        with scheduler.slot():
+            client.chat.completions.create(...)
+
+The job is carried in a context variable, so code that fans calls out to
+threads must run them via contextvars.copy_context().run.
+"""
+
+import contextvars
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import Config
+
+_current_job = contextvars.ContextVar('llm_scheduler_job', default=None)
+_anonymous_ids = itertools.count(1)
+
+
+class _Job:
+    def __init__(self, key, group, weight, expected_calls):
+        self.key = key
+        self.group = group
+        self.weight = weight
+        self.expected_calls = expected_calls
+        self.virtual_time = 0.0
+        self.waiting = 0
+        self.calls = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.started = time.monotonic()
+
+    def summary(self):
+        return {
+            'submission_id': self.key,
+            'hackathon_id': self.group,
+            'weight': self.weight,
+            'expected_calls': self.expected_calls,
+            'calls': self.calls,
+            'waiting': self.waiting,
+            'queue_wait_seconds': round(self.wait_total, 3),
+            'max_queue_wait_seconds': round(self.wait_max, 3),
+        }
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+class FairScheduler:
+    """Weighted fair queuing of call slots: hackathons first, then submissions within each"""
+
+    def __init__(self, max_concurrent=16, small_job_calls=3, small_job_weight=4.0, history=500):
+        self.max_concurrent = max(1, max_concurrent)
+        self.small_job_calls = small_job_calls
+        self.small_job_weight = small_job_weight
+        self._cond = threading.Condition()
+        self._active = 0
+        self._jobs = {}  # job key -> _Job
+        self._group_time = {}  # group key -> virtual time
+        self._finished = deque(maxlen=history)
+
+    @contextmanager
+    def job(self, key=None, group=None, expected_calls=1):
+        """Register a submission's evaluation as one schedulable job"""
+        weight = self.small_job_weight if expected_calls <= self.small_job_calls else 1.0
+        with self._cond:
+            if key is None or key in self._jobs:
+                key = f'anonymous-{next(_anonymous_ids)}'
+            job = _Job(key, group, weight, expected_calls)
+            # Newcomers start at the current minimum, not zero, so they cannot starve older jobs
+            peers = [j.virtual_time for j in self._jobs.values() if j.group == group]
+            job.virtual_time = min(peers) if peers else 0.0
+            if group not in self._group_time:
+                self._group_time[group] = min(self._group_time.values()) if self._group_time else 0.0
+            self._jobs[key] = job
+
+        token = _current_job.set(job)
+        try:
+            yield job
+        finally:
+            _current_job.reset(token)
+            with self._cond:
+                self._jobs.pop(key, None)
+                if not any(j.group == group for j in self._jobs.values()):
+                    self._group_time.pop(group, None)
+                self._finished.append(job.summary())
+                self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold one LLM call slot; blocks until the fair-share policy grants it"""
+        job = _current_job.get()
+        if job is None:
+            with self.job() as job:
+                with self.slot():
+                    yield
+            return
+
+        enqueued = time.monotonic()
+        with self._cond:
+            job.waiting += 1
+            while self._active >= self.max_concurrent or self._next_job() is not job:
+                self._cond.wait()
+            job.waiting -= 1
+            self._active += 1
+            job.calls += 1
+            job.virtual_time += 1.0 / job.weight
+            self._group_time[job.group] = self._group_time.get(job.group, 0.0) + 1.0
+            wait = time.monotonic() - enqueued
+            job.wait_total += wait
+            job.wait_max = max(job.wait_max, wait)
+            if self._active < self.max_concurrent:
+                self._cond.notify_all()  # Another slot is free: let the next job re-check
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _next_job(self):
+        """Waiting job with the least service, in the hackathon with the least service"""
+        waiting = [j for j in self._jobs.values() if j.waiting]
+        if not waiting:
+            return None
+        group = min({j.group for j in waiting}, key=lambda g: self._group_time.get(g, 0.0))
+        return min((j for j in waiting if j.group == group), key=lambda j: (j.virtual_time, j.started))
+
+    def pending_calls(self, group=None):
+        """Calls active jobs are still expected to make (all jobs, or one hackathon's)"""
+        with self._cond:
+            return sum(max(0, job.expected_calls - job.calls) for job in self._jobs.values()
+                       if group is None or job.group == group)
+
+    def stats(self):
+        with self._cond:
+            active_jobs = [job.summary() for job in self._jobs.values()]
+            finished = list(self._finished)
+
+        def wait_stats(jobs):
+            waits = [j['queue_wait_seconds'] for j in jobs]
+            return {'jobs': len(waits), 'p50': _percentile(waits, 0.5), 'p95': _percentile(waits, 0.95)}
+
+        return {
+            'max_concurrent': self.max_concurrent,
+            'active_calls': self._active,
+            'active_jobs': active_jobs,
+            'recent_queue_wait': {
+                'small_jobs': wait_stats([j for j in finished if j['expected_calls'] <= self.small_job_calls]),
+                'large_jobs': wait_stats([j for j in finished if j['expected_calls'] > self.small_job_calls]),
+            },
+            'recent_jobs': finished[-20:],
+        }
+
+
+def current_job():
+    return _current_job.get()
+
+
+llm_scheduler = FairScheduler(
+    max_concurrent=Config.LLM_MAX_CONCURRENT_CALLS,
+    small_job_calls=Config.LLM_SMALL_JOB_CALLS,
+    small_job_weight=Config.LLM_SMALL_JOB_WEIGHT
+)
@@ -0,0 +1,190 @@
+"""
+Per-hackathon score statistics, maintained as evaluations are written
+
+HackathonScoreStats keeps, per hackathon and score column, the count, sum,
+sum of squares and a 10-bin histogram. An after_flush hook turns every
+inserted, updated or deleted Evaluation into deltas and applies them with
+relative UPDATEs (count = count + 1, ...) in the same transaction, so
+concurrent workers never overwrite each other's increments and a rollback
+undoes the change together with the evaluation.
+
+Stats rows are created with their hackathon; ensure_schema (and the stats
+endpoint, on first use) backfill hackathons that predate the table.
+"""
+
+from collections import Counter, defaultdict
+from sqlalchemy import case, event, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from export import SCORE_COLUMNS
+from models import db, Hackathon, Submission, Evaluation, HackathonScoreStats
+
+HISTOGRAM_BINS = 10  # Unit-wide bins over the 0-10 score range; 10 falls in the last one
+
+
+def score_bin(score):
+    return min(max(int(score), 0), HISTOGRAM_BINS - 1)
+
+
+def _bin_expression(column):
+    """SQL equivalent of score_bin"""
+    return case(*[(column < index + 1, index) for index in range(HISTOGRAM_BINS - 1)], else_=HISTOGRAM_BINS - 1)
+
+
+def _load_replaced_score(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so a score set on an expired Evaluation loads the old value first"""
+
+
+for _column in SCORE_COLUMNS:
+    event.listen(getattr(Evaluation, _column), 'set', _load_replaced_score, active_history=True)
+
+
+class _Delta:
+    __slots__ = ('count', 'total', 'total_squares', 'bins')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.bins = Counter()
+
+    def add(self, score, sign):
+        if score is None:
+            return
+        self.count += sign
+        self.total += sign * score
+        self.total_squares += sign * score * score
+        self.bins[score_bin(score)] += sign
+
+
+def _hackathon_ids(session, submission_ids):
+    """Hackathon of each submission, from loaded session objects where possible (deleted rows are gone)"""
+    known = {}
+    for instance in list(session.deleted) + list(session.identity_map.values()):
+        if isinstance(instance, Submission):
+            loaded = db.inspect(instance).dict  # Loaded attributes only; never triggers a refresh
+            if loaded.get('id') in submission_ids and loaded.get('hackathon_id') is not None:
+                known[loaded['id']] = loaded['hackathon_id']
+    missing = submission_ids - known.keys()
+    if missing:
+        rows = session.connection().execute(
+            db.select(Submission.id, Submission.hackathon_id).where(Submission.id.in_(missing)))
+        known.update({row.id: row.hackathon_id for row in rows})
+    return known
+
+
+@event.listens_for(Session, 'before_flush')
+def _load_deleted_scores(session, flush_context, instances):
+    """Load what the stats update needs from rows about to be deleted, while they still exist"""
+    for instance in session.deleted:
+        if isinstance(instance, Evaluation):
+            for column in ('submission_id',) + tuple(SCORE_COLUMNS):
+                getattr(instance, column)
+        elif isinstance(instance, Submission):
+            instance.hackathon_id
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_score_stats(session, flush_context):
+    """Apply the score changes of this flush to the hackathons' stats rows"""
+    changes = []  # (submission id, score column, score, +1 or -1)
+    for instance in session.new:
+        if isinstance(instance, Evaluation):
+            changes.extend((instance.submission_id, column, getattr(instance, column), 1) for column in SCORE_COLUMNS)
+        elif isinstance(instance, Hackathon):
+            session.connection().execute(HackathonScoreStats.__table__.insert(), [
+                {'hackathon_id': instance.id, 'criterion': column} for column in SCORE_COLUMNS])
+    for instance in session.deleted:
+        if isinstance(instance, Evaluation):
+            changes.extend((instance.submission_id, column, getattr(instance, column), -1) for column in SCORE_COLUMNS)
+    for instance in session.dirty:
+        if isinstance(instance, Evaluation):
+            state = db.inspect(instance)
+            for column in SCORE_COLUMNS:
+                history = state.attrs[column].history
+                if history.has_changes():
+                    changes.extend((instance.submission_id, column, score, -1) for score in history.deleted)
+                    changes.extend((instance.submission_id, column, score, 1) for score in history.added)
+    if not changes:
+        return
+
+    hackathons = _hackathon_ids(session, {submission_id for submission_id, _, _, _ in changes})
+    deltas = defaultdict(_Delta)
+    for submission_id, column, score, sign in changes:
+        if submission_id in hackathons:
+            deltas[(hackathons[submission_id], column)].add(score, sign)
+
+    connection = session.connection()
+    for (hackathon_id, column), delta in deltas.items():
+        if not (delta.count or delta.total or delta.total_squares or any(delta.bins.values())):
+            continue
+        values = {
+            'count': HackathonScoreStats.count + delta.count,
+            'total': HackathonScoreStats.total + delta.total,
+            'total_squares': HackathonScoreStats.total_squares + delta.total_squares,
+        }
+        for index, count in delta.bins.items():
+            if count:
+                values[f'bin_{index}'] = getattr(HackathonScoreStats, f'bin_{index}') + count
+        # No row yet means the hackathon predates the table: rebuild_score_stats backfills it in full
+        connection.execute(update(HackathonScoreStats).where(
+            HackathonScoreStats.hackathon_id == hackathon_id,
+            HackathonScoreStats.criterion == column
+        ).values(**values))
+
+
+def rebuild_score_stats(hackathon_ids=None):
+    """
+    Recompute stats rows from the evaluations table (the caller commits)
+
+    Args:
+        hackathon_ids: Hackathons to rebuild; None rebuilds the ones without stats rows
+
+    Returns:
+        int: Hackathons rebuilt
+    """
+    if hackathon_ids is None:
+        hackathon_ids = [row.id for row in db.session.query(Hackathon.id).filter(
+            ~Hackathon.id.in_(db.session.query(HackathonScoreStats.hackathon_id)))]
+    for hackathon_id in hackathon_ids:
+        HackathonScoreStats.query.filter_by(hackathon_id=hackathon_id).delete()
+        scored = db.session.query(Evaluation).join(Submission, Evaluation.submission_id == Submission.id).filter(
+            Submission.hackathon_id == hackathon_id)
+        for column in SCORE_COLUMNS:
+            score = getattr(Evaluation, column)
+            count, total, total_squares = scored.with_entities(
+                func.count(score), func.coalesce(func.sum(score), 0.0), func.coalesce(func.sum(score * score), 0.0)
+            ).one()
+            stats = HackathonScoreStats(hackathon_id=hackathon_id, criterion=column, count=count,
+                                        total=total, total_squares=total_squares)
+            for index, binned in scored.filter(score.isnot(None)).with_entities(
+                _bin_expression(score), func.count()
+            ).group_by(_bin_expression(score)):
+                setattr(stats, f'bin_{index}', binned)
+            db.session.add(stats)
+    return len(hackathon_ids)
+
+
+def hackathon_score_stats(hackathon_id):
+    """
+    Score distribution of a hackathon: one row read per criterion
+
+    Returns:
+        dict: {'count', 'bins', 'criteria': {column: {'count', 'mean', 'stddev', 'histogram'}}}
+    """
+    rows = HackathonScoreStats.query.filter_by(hackathon_id=hackathon_id).all()
+    if not rows:
+        rebuild_score_stats([hackathon_id])
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another request backfilled it first
+        rows = HackathonScoreStats.query.filter_by(hackathon_id=hackathon_id).all()
+    criteria = {row.criterion: row.to_dict() for row in rows}
+    overall = criteria.get('overall_score')
+    return {
+        'hackathon_id': hackathon_id,
+        'count': overall['count'] if overall else 0,
+        'bins': list(range(HISTOGRAM_BINS + 1)),
+        'criteria': {column: criteria[column] for column in SCORE_COLUMNS if column in criteria}
+    }
@@ -0,0 +1,219 @@
+"""
+Full-text search over a hackathon's submissions (SQLite FTS5)
+
+One FTS5 row per submission (rowid = submission id) holds the project
+name, description, documentation, evaluation feedback and, with
+SEARCH_INDEX_CODE, the extracted code. An after_flush hook rewrites the
+rows of submissions whose indexed text changed, inside the same
+transaction, so the index commits and rolls back with the data.
+
+The hackathon is an indexed token ("h<id>") rather than an UNINDEXED
+column, so scoping a query to one hackathon intersects posting lists
+instead of reading every matching row; snippets are built only for the
+rows of the requested page.
+
+The table is created (and filled from existing rows) by ensure_schema.
+On other databases, or SQLite builds without FTS5, there is no index and
+search falls back to an unranked LIKE scan.
+"""
+
+import re
+from sqlalchemy import bindparam, event, or_, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from config import Config
+from models import db, Submission, Evaluation
+
+SEARCH_TABLE = 'submission_search'
+SEARCH_COLUMNS = ('project_name', 'project_description', 'documentation', 'feedback', 'code')
+COLUMN_WEIGHTS = (10.0, 4.0, 2.0, 3.0, 1.0, 0.0)  # bm25 weight per column above, then the hackathon token
+SUBMISSION_FIELDS = ('hackathon_id', 'project_name', 'project_description', 'documentation_content', 'code_content')
+EVALUATION_FIELDS = ('submission_id', 'feedback')
+QUERY_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+WORD_RE = re.compile(r'\w+')
+
+_available = {}  # engine url -> the index table exists
+
+
+def _index_rows_sql(where=''):
+    """INSERT ... SELECT building index rows from submissions and their evaluation"""
+    code = 's.code_content' if Config.SEARCH_INDEX_CODE else "''"
+    return text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}, hackathon) "
+        f"SELECT s.id, s.project_name, coalesce(s.project_description, ''), "
+        f"coalesce(s.documentation_content, ''), coalesce(e.feedback, ''), coalesce({code}, ''), "
+        f"'h' || s.hackathon_id "
+        f"FROM submissions s LEFT JOIN evaluations e ON e.submission_id = s.id {where}"
+    )
+
+
+def _index_available(connection):
+    key = str(connection.engine.url)
+    if key not in _available:
+        _available[key] = connection.dialect.name == 'sqlite' and connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {'name': SEARCH_TABLE}
+        ).first() is not None
+    return _available[key]
+
+
+def ensure_search_index(rebuild=False):
+    """
+    Create the FTS5 table and index existing submissions (SQLite only)
+
+    Args:
+        rebuild (bool): Drop and refill an existing index (e.g. after changing SEARCH_INDEX_CODE)
+
+    Returns:
+        bool: Whether the index was (re)built; False if it existed or is unsupported
+    """
+    engine = db.engine
+    key = str(engine.url)
+    if engine.dialect.name != 'sqlite':
+        _available[key] = False
+        return False
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {'name': SEARCH_TABLE}
+        ).first() is not None
+        if exists and not rebuild:
+            _available[key] = True
+            return False
+        if exists:
+            conn.execute(text(f'DROP TABLE {SEARCH_TABLE}'))
+        try:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                f"{', '.join(SEARCH_COLUMNS)}, hackathon, tokenize = 'porter unicode61')"
+            ))
+        except OperationalError as e:
+            print(f"⚠️ Full-text search unavailable ({e}); search falls back to LIKE scans")
+            _available[key] = False
+            return False
+        indexed = conn.execute(_index_rows_sql()).rowcount
+    _available[key] = True
+    print(f"🔎 Search index built ({indexed} submissions{', with code' if Config.SEARCH_INDEX_CODE else ''})")
+    return True
+
+
+def _changed(instance, fields):
+    state = db.inspect(instance)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_search_index(session, flush_context):
+    """Rewrite the index rows of submissions whose indexed text was written in this flush"""
+    changed, removed = set(), set()
+    for instance in session.new | session.dirty:
+        if isinstance(instance, Submission):
+            if instance in session.new or _changed(instance, SUBMISSION_FIELDS):
+                changed.add(instance.id)
+        elif isinstance(instance, Evaluation):
+            if instance in session.new or _changed(instance, EVALUATION_FIELDS):
+                changed.add(instance.submission_id)
+    for instance in session.deleted:
+        if isinstance(instance, Submission):
+            removed.add(instance.id)
+        elif isinstance(instance, Evaluation):
+            changed.add(instance.submission_id)
+
+    changed.discard(None)
+    if not changed and not removed:
+        return
+    connection = session.connection()
+    if not _index_available(connection):
+        return
+
+    connection.execute(
+        text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids').bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(changed | removed)}
+    )
+    changed -= removed
+    if changed:
+        connection.execute(
+            _index_rows_sql('WHERE s.id IN :ids').bindparams(bindparam('ids', expanding=True)),
+            {'ids': list(changed)}
+        )
+
+
+def match_expression(query):
+    """
+    FTS5 MATCH expression for a user query, or None if it has no words
+
+    Every word must match (prefix with a trailing *); "quoted text" must
+    match as a phrase. FTS5 operators in the input are treated as words.
+    """
+    terms = []
+    for phrase, word in QUERY_TERM_RE.findall(query):
+        words = WORD_RE.findall(phrase or word)
+        if not words:
+            continue
+        prefix = '*' if word.endswith('*') else ''
+        terms.append('"' + ' '.join(words) + '"' + prefix)
+    return ' '.join(terms) or None
+
+
+def search_submissions(hackathon_id, query, page=1, per_page=20):
+    """
+    Ranked page of a hackathon's submissions matching a query
+
+    Returns:
+        dict or None: {'total', 'ranked', 'hits': [{'submission_id', 'rank', 'snippet'}]},
+        None if the query has no searchable words
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return None
+    offset = (page - 1) * per_page
+
+    if not _index_available(db.session.connection()):
+        return _search_without_index(hackathon_id, query, offset, per_page)
+
+    # User terms only match the text columns, never the hackathon token
+    params = {
+        'query': f'hackathon : "h{int(hackathon_id)}" AND {{{" ".join(SEARCH_COLUMNS)}}} : ({expression})',
+        'limit': per_page,
+        'offset': offset
+    }
+    total = db.session.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :query"),
+                               params).scalar()
+    weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+    ranked = db.session.execute(text(
+        f"SELECT rowid AS id, bm25({SEARCH_TABLE}, {weights}) AS rank FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH :query ORDER BY rank LIMIT :limit OFFSET :offset"
+    ), params).all()
+    # Snippets of the page only (computed in the ranking query they would be built for every match)
+    snippets = dict(db.session.execute(text(
+        f"SELECT rowid, snippet({SEARCH_TABLE}, -1, '**', '**', '…', 16) FROM {SEARCH_TABLE} "
+        f"WHERE {SEARCH_TABLE} MATCH :query AND rowid IN :ids"
+    ).bindparams(bindparam('ids', expanding=True)), {**params, 'ids': [row.id for row in ranked]}).all()) if ranked else {}
+    return {
+        'total': total,
+        'ranked': True,
+        'hits': [{'submission_id': row.id, 'rank': round(-row.rank, 4), 'snippet': snippets.get(row.id)}
+                 for row in ranked]
+    }
+
+
+def _search_without_index(hackathon_id, query, offset, limit):
+    """Unranked substring match over the text columns, newest first (no FTS5 index)"""
+    pattern = f"%{query.strip()}%"
+    matches = db.session.query(Submission.id).outerjoin(
+        Evaluation, Evaluation.submission_id == Submission.id
+    ).filter(
+        Submission.hackathon_id == hackathon_id,
+        or_(
+            Submission.project_name.ilike(pattern),
+            Submission.project_description.ilike(pattern),
+            Submission.documentation_content.ilike(pattern),
+            Evaluation.feedback.ilike(pattern)
+        )
+    )
+    total = matches.count()
+    ids = [row.id for row in matches.order_by(Submission.id.desc()).offset(offset).limit(limit)]
+    return {
+        'total': total,
+        'ranked': False,
+        'hits': [{'submission_id': submission_id, 'rank': None, 'snippet': None} for submission_id in ids]
+    }
@@ -34,6 +34,8 @@ export interface Submission {
   code_content?: string;
   documentation_content?: string;
   github_url?: string;
+  repository_url?: string;
+  commit_sha?: string;
   status?: string;
   created_at?: string;
 }
@@ -51,6 +53,20 @@ export interface Evaluation {
   created_at?: string;
 }
 
+export interface CriterionStats {
+  count: number;
+  mean: number | null;
+  stddev: number | null;
+  histogram: number[];
+}
+
+export interface HackathonStats {
+  hackathon_id: number;
+  count: number;
+  bins: number[];
+  criteria: Record<string, CriterionStats>;
+}
+
 // Hackathon API
 export const hackathonApi = {
   // Get all hackathons
@@ -81,6 +97,12 @@ export const hackathonApi = {
   delete: async (id: number): Promise<void> => {
     await api.delete(`/hackathon/${id}`);
   },
+
+  // Score distribution per criterion (maintained server-side, constant cost)
+  getStats: async (id: number): Promise<HackathonStats> => {
+    const response = await api.get(`/hackathon/${id}/stats`);
+    return response.data;
+  },
 };
 
 // Submission API
@@ -112,6 +134,8 @@ export const submissionApi = {
     team_name: string;
     project_name: string;
     github_url: string;
+    ref?: string;
+    project_description?: string;
   }): Promise<Submission> => {
     const response = await api.post(`/hackathon/${hackathonId}/submit/github`, data);
     return response.data;
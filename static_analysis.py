@@ -0,0 +1,455 @@
+"""
+CPU-side static analysis of submissions.
+
+Computes objective metrics for a submission (LOC by language, Python AST
+complexity, test presence, docstring/comment coverage, dependency manifests
+and README sections) without any LLM calls. Files are analyzed in batches
+across a process pool so large archives use every core.
+
+The pool is created once per process, on first use, with the forkserver
+start method (spawn where unavailable): forking a web worker that runs
+LLM, scheduler and maintenance threads could copy a lock held by one of
+them into the child. It is shut down when the process exits.
+"""
+
+import os
+import ast
+import atexit
+import re
+import json
+import multiprocessing
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from utils import allowed_file, should_skip_directory
+
+LANGUAGE_BY_EXTENSION = {
+    'py': 'Python', 'ipynb': 'Python',
+    'js': 'JavaScript', 'jsx': 'JavaScript',
+    'ts': 'TypeScript', 'tsx': 'TypeScript',
+    'java': 'Java', 'kt': 'Kotlin', 'scala': 'Scala',
+    'c': 'C', 'h': 'C', 'cpp': 'C++', 'hpp': 'C++', 'cs': 'C#',
+    'go': 'Go', 'rs': 'Rust', 'rb': 'Ruby', 'php': 'PHP', 'swift': 'Swift',
+    'dart': 'Dart', 'r': 'R', 'm': 'MATLAB', 'matlab': 'MATLAB',
+    'html': 'HTML', 'htm': 'HTML', 'css': 'CSS', 'scss': 'CSS', 'sass': 'CSS', 'less': 'CSS',
+    'vue': 'Vue', 'svelte': 'Svelte', 'sql': 'SQL',
+    'sh': 'Shell', 'bash': 'Shell', 'zsh': 'Shell', 'fish': 'Shell', 'ps1': 'PowerShell',
+    'bat': 'Batch', 'cmd': 'Batch',
+    'json': 'Config', 'xml': 'Config', 'yml': 'Config', 'yaml': 'Config', 'toml': 'Config',
+    'ini': 'Config', 'cfg': 'Config', 'conf': 'Config', 'properties': 'Config',
+    'md': 'Docs', 'txt': 'Docs', 'rst': 'Docs', 'adoc': 'Docs', 'tex': 'Docs',
+}
+
+# Single-line comment prefixes per language (block comments are counted line by line)
+COMMENT_PREFIXES = {
+    'Python': ('#',), 'Shell': ('#',), 'Ruby': ('#',), 'R': ('#',), 'PowerShell': ('#',),
+    'SQL': ('--',), 'MATLAB': ('%',), 'Batch': ('rem ', '::'),
+    'HTML': ('<!--',), 'Vue': ('//', '/*', '*', '<!--'), 'Svelte': ('//', '/*', '*', '<!--'),
+}
+DEFAULT_COMMENT_PREFIXES = ('//', '/*', '*')
+
+DEPENDENCY_MANIFESTS = {
+    'requirements.txt', 'pyproject.toml', 'setup.py', 'pipfile', 'environment.yml',
+    'package.json', 'go.mod', 'cargo.toml', 'pom.xml', 'build.gradle', 'gemfile',
+    'composer.json', 'pubspec.yaml',
+}
+
+# AST nodes that add a decision point to cyclomatic complexity
+BRANCH_NODES = (
+    ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler,
+    ast.With, ast.AsyncWith, ast.Assert, ast.comprehension,
+)
+
+MAX_ANALYZED_FILE_SIZE = 500 * 1024  # Same per-file cap as ZIP extraction
+BATCH_SIZE = 64  # Files per worker task
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _language_for(relative_path):
+    """Map a file path to a language bucket"""
+    filename = os.path.basename(relative_path).lower()
+    if filename == 'dockerfile':
+        return 'Docker'
+    if filename == 'makefile':
+        return 'Make'
+    ext = filename.rsplit('.', 1)[1] if '.' in filename else ''
+    return LANGUAGE_BY_EXTENSION.get(ext, 'Other')
+
+
+def _is_test_path(relative_path):
+    """Heuristic test-file detection across common ecosystems"""
+    path = relative_path.replace('\\', '/').lower()
+    filename = os.path.basename(path)
+    parts = path.split('/')[:-1]
+    return (
+        any(part in ('test', 'tests', '__tests__', 'spec', 'specs') for part in parts)
+        or filename.startswith('test_')
+        or re.search(r'[._-](test|spec)\.[a-z]+$', filename) is not None
+        or filename.endswith('_test.go')
+    )
+
+
+def _python_metrics(content):
+    """AST metrics for a Python source file"""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return {'parse_error': True}
+
+    functions = 0
+    classes = 0
+    documented = 0
+    complexities = []
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions += 1
+            complexity = 1
+            for child in ast.walk(node):
+                if isinstance(child, BRANCH_NODES):
+                    complexity += 1
+                elif isinstance(child, ast.BoolOp):
+                    complexity += len(child.values) - 1
+            complexities.append(complexity)
+        elif isinstance(node, ast.ClassDef):
+            classes += 1
+        else:
+            continue
+        if ast.get_docstring(node):
+            documented += 1
+
+    return {
+        'functions': functions,
+        'classes': classes,
+        'documented': documented,
+        'complexity_total': sum(complexities),
+        'complexity_max': max(complexities) if complexities else 0,
+    }
+
+
+def _dependency_count(filename, content):
+    """Rough number of declared dependencies in a manifest"""
+    if filename == 'requirements.txt':
+        return sum(1 for line in content.splitlines() if line.strip() and not line.strip().startswith(('#', '-')))
+    if filename in ('package.json', 'composer.json'):
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return 0
+        return sum(len(data.get(key) or {}) for key in ('dependencies', 'devDependencies', 'require'))
+    return None
+
+
+def _analyze_content(relative_path, content):
+    """Compute metrics for a single file's text"""
+    language = _language_for(relative_path)
+    filename = os.path.basename(relative_path).lower()
+    prefixes = COMMENT_PREFIXES.get(language, DEFAULT_COMMENT_PREFIXES)
+
+    loc = 0
+    comment_lines = 0
+    for line in content.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        loc += 1
+        if language not in ('Docs', 'Config') and stripped.lower().startswith(prefixes):
+            comment_lines += 1
+
+    metrics = {
+        'path': relative_path,
+        'language': language,
+        'loc': loc,
+        'comment_lines': comment_lines,
+        'is_test': _is_test_path(relative_path),
+    }
+
+    if language == 'Python' and filename.endswith('.py'):
+        metrics['python'] = _python_metrics(content)
+
+    if filename in DEPENDENCY_MANIFESTS:
+        metrics['manifest'] = filename
+        metrics['dependencies'] = _dependency_count(filename, content)
+
+    if filename.startswith('readme'):
+        metrics['readme_sections'] = [
+            match.strip() for match in re.findall(r'^#{1,3}\s+(.+)$', content, re.MULTILINE)
+        ][:30]
+
+    return metrics
+
+
+def _analyze_batch(source_path, entries):
+    """
+    Worker entry point: analyze a batch of files from one source
+
+    Args:
+        source_path (str): ZIP archive or plain file on disk
+        entries (list): (member_name or None, relative_path) tuples
+
+    Returns:
+        list: Per-file metric dicts
+    """
+    results = []
+    archive = zipfile.ZipFile(source_path, 'r') if source_path.endswith('.zip') else None
+    try:
+        for member, relative_path in entries:
+            try:
+                if archive is not None:
+                    raw = archive.read(member)
+                else:
+                    with open(source_path, 'rb') as f:
+                        raw = f.read(MAX_ANALYZED_FILE_SIZE + 1)
+                if len(raw) > MAX_ANALYZED_FILE_SIZE:
+                    continue
+                results.append(_analyze_content(relative_path, raw.decode('utf-8', errors='ignore')))
+            except Exception as e:
+                print(f"Error analyzing {relative_path}: {str(e)}")
+    finally:
+        if archive is not None:
+            archive.close()
+    return results
+
+
+def _collect_entries(file_paths):
+    """
+    Enumerate analyzable files, applying the same filters as ZIP extraction
+
+    Returns:
+        list: (source_path, [(member, relative_path), ...]) batches
+    """
+    batches = []
+
+    for file_path in file_paths:
+        if not os.path.exists(file_path):
+            continue
+
+        if file_path.endswith('.zip'):
+            try:
+                with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                    infos = zip_ref.infolist()
+            except zipfile.BadZipFile:
+                continue
+
+            entries = []
+            for info in infos:
+                if info.is_dir() or info.file_size > MAX_ANALYZED_FILE_SIZE:
+                    continue
+                parts = info.filename.split('/')
+                if any(should_skip_directory(part) for part in parts[:-1]):
+                    continue
+                if allowed_file(parts[-1]):
+                    entries.append((info.filename, info.filename))
+
+            for i in range(0, len(entries), BATCH_SIZE):
+                batches.append((file_path, entries[i:i + BATCH_SIZE]))
+        else:
+            batches.append((file_path, [(None, os.path.basename(file_path))]))
+
+    return batches
+
+
+def _aggregate(file_metrics):
+    """Fold per-file metrics into a submission-level summary"""
+    languages = {}
+    total_loc = 0
+    comment_lines = 0
+    code_loc = 0
+    test_files = 0
+    manifests = {}
+    readme_sections = []
+    python = {'files': 0, 'functions': 0, 'classes': 0, 'documented': 0,
+              'complexity_total': 0, 'complexity_max': 0, 'parse_errors': 0}
+
+    for metrics in file_metrics:
+        language = metrics['language']
+        bucket = languages.setdefault(language, {'files': 0, 'loc': 0})
+        bucket['files'] += 1
+        bucket['loc'] += metrics['loc']
+        total_loc += metrics['loc']
+
+        if language not in ('Docs', 'Config', 'Other'):
+            code_loc += metrics['loc']
+            comment_lines += metrics['comment_lines']
+
+        if metrics['is_test']:
+            test_files += 1
+
+        if 'manifest' in metrics:
+            manifests[metrics['path']] = metrics['dependencies']
+
+        if metrics.get('readme_sections') and not readme_sections:
+            readme_sections = metrics['readme_sections']
+
+        py = metrics.get('python')
+        if py is not None:
+            python['files'] += 1
+            if py.get('parse_error'):
+                python['parse_errors'] += 1
+                continue
+            for key in ('functions', 'classes', 'documented', 'complexity_total'):
+                python[key] += py[key]
+            python['complexity_max'] = max(python['complexity_max'], py['complexity_max'])
+
+    definitions = python['functions'] + python['classes']
+    return {
+        'file_count': len(file_metrics),
+        'total_loc': total_loc,
+        'languages': dict(sorted(languages.items(), key=lambda item: -item[1]['loc'])),
+        'test_files': test_files,
+        'comment_ratio': round(comment_lines / code_loc, 3) if code_loc else 0.0,
+        'python': {
+            **python,
+            'docstring_coverage': round(python['documented'] / definitions, 3) if definitions else 0.0,
+            'avg_complexity': round(python['complexity_total'] / python['functions'], 2) if python['functions'] else 0.0,
+        },
+        'dependency_manifests': manifests,
+        'readme_sections': readme_sections,
+    }
+
+
+def _pool_size():
+    return Config.STATIC_ANALYSIS_WORKERS or os.cpu_count() or 1
+
+
+def _get_pool():
+    """The process-wide analysis pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            context = multiprocessing.get_context(method)
+            if method == 'forkserver':
+                context.set_forkserver_preload(['static_analysis'])
+            _pool = ProcessPoolExecutor(max_workers=_pool_size(), mp_context=context)
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drop a broken pool so the next submission starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """Stop the worker processes (at exit; safe to call more than once)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_pool)
+
+
+def analyze_submission(file_paths):
+    """
+    Compute static metrics for uploaded files across the process pool
+
+    Args:
+        file_paths (list): Saved upload paths (plain files and/or ZIP archives)
+
+    Returns:
+        dict: Aggregated submission metrics
+    """
+    batches = _collect_entries(file_paths)
+    if not batches:
+        return _aggregate([])
+
+    file_metrics = None
+
+    # A pool only pays off when there is more than one batch to spread out
+    if _pool_size() > 1 and len(batches) > 1:
+        pool = None
+        try:
+            pool = _get_pool()
+            file_metrics = []
+            sources = [source for source, _ in batches]
+            entries = [batch for _, batch in batches]
+            for results in pool.map(_analyze_batch, sources, entries):
+                file_metrics.extend(results)
+        except Exception as e:
+            print(f"⚠️ Process pool unavailable ({str(e)}), analyzing in-process...")
+            if pool is not None:
+                _discard_pool(pool)
+            file_metrics = None
+
+    if file_metrics is None:
+        file_metrics = []
+        for source, entries in batches:
+            file_metrics.extend(_analyze_batch(source, entries))
+
+    metrics = _aggregate(file_metrics)
+    print(f"🔬 Static analysis complete: {metrics['file_count']} files, {metrics['total_loc']:,} LOC")
+    return metrics
+
+
+def analyze_contents(files):
+    """
+    Compute static metrics for files already read into memory (in-process)
+
+    Args:
+        files (iterable): (relative_path, text) pairs, filtered like ZIP extraction
+
+    Returns:
+        dict: Aggregated submission metrics
+    """
+    file_metrics = [_analyze_content(relative_path, content) for relative_path, content in files
+                    if len(content) <= MAX_ANALYZED_FILE_SIZE]
+    metrics = _aggregate(file_metrics)
+    print(f"🔬 Static analysis complete: {metrics['file_count']} files, {metrics['total_loc']:,} LOC")
+    return metrics
+
+
+def format_metrics_summary(metrics):
+    """
+    Render metrics as a compact, prompt-friendly summary
+
+    Args:
+        metrics (dict or str): Output of analyze_submission (or its JSON string)
+
+    Returns:
+        str: Multi-line summary, empty if no metrics are available
+    """
+    if not metrics:
+        return ""
+    if isinstance(metrics, str):
+        try:
+            metrics = json.loads(metrics)
+        except ValueError:
+            return ""
+
+    languages = ", ".join(
+        f"{name} {info['files']}f/{info['loc']:,}loc"
+        for name, info in list(metrics.get('languages', {}).items())[:6]
+    ) or "none"
+    python = metrics.get('python', {})
+    manifests = metrics.get('dependency_manifests', {})
+    manifest_text = ", ".join(
+        f"{path} ({count} deps)" if count is not None else path
+        for path, count in list(manifests.items())[:5]
+    ) or "none"
+    sections = ", ".join(metrics.get('readme_sections', [])[:10]) or "no README sections found"
+
+    lines = [
+        f"- Files analyzed: {metrics.get('file_count', 0)}, total LOC: {metrics.get('total_loc', 0):,}",
+        f"- Languages: {languages}",
+        f"- Test files: {metrics.get('test_files', 0)}",
+        f"- Comment ratio (code lines): {metrics.get('comment_ratio', 0.0):.0%}",
+    ]
+    if python.get('files'):
+        lines.append(
+            f"- Python: {python['functions']} functions, {python['classes']} classes, "
+            f"docstring coverage {python.get('docstring_coverage', 0.0):.0%}, "
+            f"avg/max cyclomatic complexity {python.get('avg_complexity', 0.0)}/{python.get('complexity_max', 0)}"
+        )
+    lines.append(f"- Dependency manifests: {manifest_text}")
+    lines.append(f"- README sections: {sections}")
+    return "\n".join(lines)
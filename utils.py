@@ -1,4 +1,5 @@
 import os
+import hashlib
 import zipfile
 import shutil
 from werkzeug.utils import secure_filename
@@ -11,9 +12,54 @@ def allowed_file(filename):
 
 def extract_code_from_files(file_paths):
     """Extract code content from uploaded files with smart filtering"""
-    code_content = []
+    sections = 0
+    
+    def counted(iterable):
+        nonlocal sections
+        for section in iterable:
+            sections += 1
+            yield section
+    
+    # Sections stream straight into the join: no intermediate list beyond the one join builds
+    code_content = "\n\n".join(counted(iter_code_sections(file_paths)))
+    print(f"📊 Code extraction complete: {sections} files, {len(code_content)//1024}KB total")
+    return code_content
+
+def code_content_limit():
+    """
+    Characters of code one submission may keep
+    
+    MAX_CODE_CONTENT_SIZE, lowered so that the peak heap of extracting and
+    evaluating that much code, MEMORY_CEILING_FACTOR x content +
+    MEMORY_CEILING_OVERHEAD_MB, stays under SUBMISSION_MEMORY_CEILING_MB.
+    """
+    limit = Config.MAX_CODE_CONTENT_SIZE
+    if Config.SUBMISSION_MEMORY_CEILING_MB > 0:
+        headroom = (Config.SUBMISSION_MEMORY_CEILING_MB - Config.MEMORY_CEILING_OVERHEAD_MB) * 1024 * 1024
+        limit = min(limit, max(0, int(headroom / Config.MEMORY_CEILING_FACTOR)))
+    return limit
+
+def _char_width(text):
+    """Bytes per character CPython uses to store text (1, 2 or 4)"""
+    if text.isascii():
+        return 1
+    return 2 if max(text) <= '\uffff' else 4
+
+def iter_code_sections(file_paths, max_total_size=None):
+    """
+    Yield one `# File: <path>` section per extracted file, in extraction order
+    
+    The joined content is stored with the widest character of any section,
+    so a single emoji makes every character take 4 bytes; extraction stops
+    once characters x width would pass the limit.
+    
+    Args:
+        file_paths (list): Saved upload paths (plain files and/or ZIP archives)
+        max_total_size (int): Characters of code to extract; defaults to code_content_limit()
+    """
+    max_total_size = max_total_size or code_content_limit()
     total_size = 0
-    max_total_size = 100 * 1024 * 1024  # 10MB limit for code content
+    width = 1
     
     for file_path in file_paths:
         if not os.path.exists(file_path):
@@ -22,32 +68,39 @@ def extract_code_from_files(file_paths):
         try:
             # Handle zip files
             if file_path.endswith('.zip'):
-                zip_content, zip_size = extract_from_zip_smart(file_path, max_total_size - total_size)
-                code_content.extend(zip_content)
-                total_size += zip_size
+                for section, size in iter_zip_sections(file_path, max_total_size - total_size):
+                    section_width = max(width, _char_width(section))
+                    if (total_size + size) * section_width > max_total_size:
+                        yield f"# Remaining files skipped - memory limit reached ({max_total_size//1024//1024}MB)\n"
+                        return
+                    total_size += size
+                    width = section_width
+                    yield section
             else:
                 # Check file size before reading - be more generous for project code
                 file_size = os.path.getsize(file_path)
                 if file_size > 5 * 1024 * 1024:  # Skip files larger than 5MB (very generous)
-                    code_content.append(f"# File: {os.path.basename(file_path)} (SKIPPED - too large: {file_size//1024}KB)\n")
+                    yield f"# File: {os.path.basename(file_path)} (SKIPPED - too large: {file_size//1024}KB)\n"
                     continue
                 
                 if total_size + file_size > max_total_size:
-                    code_content.append(f"# Remaining files skipped - size limit reached ({max_total_size//1024//1024}MB)\n")
+                    yield f"# Remaining files skipped - size limit reached ({max_total_size//1024//1024}MB)\n"
                     break
                 
                 # Try to read as text
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
-                    code_content.append(f"# File: {os.path.basename(file_path)}\n{content}\n")
-                    total_size += len(content)
+                section_width = max(width, _char_width(content))
+                if (total_size + len(content)) * section_width > max_total_size:
+                    yield f"# Remaining files skipped - memory limit reached ({max_total_size//1024//1024}MB)\n"
+                    return
+                total_size += len(content)
+                width = section_width
+                yield f"# File: {os.path.basename(file_path)}\n{content}\n"
                     
         except Exception as e:
             print(f"Error reading file {file_path}: {str(e)}")
-            code_content.append(f"# File: {os.path.basename(file_path)} (ERROR: {str(e)})\n")
-    
-    print(f"📊 Code extraction complete: {len(code_content)} files, {total_size//1024}KB total")
-    return "\n\n".join(code_content)
+            yield f"# File: {os.path.basename(file_path)} (ERROR: {str(e)})\n"
 
 def should_skip_directory(dir_path):
     """Check if directory should be skipped - only skip truly irrelevant directories"""
@@ -98,84 +151,79 @@ def should_prioritize_file(file_path):
 
 def extract_from_zip_smart(zip_path, max_size_remaining):
     """Smart extraction from ZIP with filtering and prioritization"""
-    extracted_content = []
-    extract_dir = zip_path + '_extracted'
+    extracted = list(iter_zip_sections(zip_path, max_size_remaining))
+    return [section for section, _ in extracted], sum(size for _, size in extracted)
+
+def iter_zip_sections(zip_path, max_size_remaining):
+    """
+    Yield (section, content size) for the files of a ZIP, priority files first
+    
+    Members are read one at a time straight from the archive instead of
+    unpacking it to disk first; only one file is decoded at a time.
+    """
+    files = 0
     total_size = 0
     
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-        
-        # First pass: collect and prioritize files
-        all_files = []
-        priority_files = []
-        
-        for root, dirs, files in os.walk(extract_dir):
-            # Skip unwanted directories
-            dirs[:] = [d for d in dirs if not should_skip_directory(os.path.join(root, d))]
+            # First pass: collect and prioritize files from the central directory
+            all_files = []
+            priority_files = []
             
-            for file in files:
-                file_path = os.path.join(root, file)
-                if allowed_file(file):
-                    relative_path = os.path.relpath(file_path, extract_dir)
+            for info in zip_ref.infolist():
+                if info.is_dir():
+                    continue
+                
+                # Skip unwanted directories at any depth
+                parts = info.filename.split('/')
+                if any(should_skip_directory(part) for part in parts[:-1]):
+                    continue
+                if not allowed_file(parts[-1]):
+                    continue
+                
+                # Skip files larger than 500KB
+                if info.file_size > 500 * 1024:
+                    continue
+                
+                if should_prioritize_file(info.filename):
+                    priority_files.append(info)
+                else:
+                    all_files.append(info)
+            
+            # Process priority files first, then the remaining files
+            for priority, infos in ((True, priority_files), (False, all_files)):
+                marker = ' [PRIORITY]' if priority else ''
+                for info in infos:
+                    if total_size + info.file_size > max_size_remaining:
+                        if not priority:
+                            yield f"# Remaining files skipped - size limit reached\n", 0
+                        break
                     
-                    # Check file size
                     try:
-                        file_size = os.path.getsize(file_path)
-                        if file_size > 500 * 1024:  # Skip files larger than 500KB
-                            continue
-                            
-                        file_info = (file_path, relative_path, file_size)
-                        
-                        if should_prioritize_file(file_path):
-                            priority_files.append(file_info)
-                        else:
-                            all_files.append(file_info)
-                    except:
+                        with zip_ref.open(info) as f:
+                            content = f.read().decode('utf-8', errors='ignore')
+                    except Exception as e:
+                        print(f"Error reading file {info.filename}: {str(e)}")
                         continue
-        
-        # Process priority files first
-        for file_path, relative_path, file_size in priority_files:
-            if total_size + file_size > max_size_remaining:
-                break
-                
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    extracted_content.append(f"# File: {relative_path} [PRIORITY]\n{content}\n")
+                    files += 1
                     total_size += len(content)
-            except Exception as e:
-                print(f"Error reading priority file {file_path}: {str(e)}")
+                    yield f"# File: {info.filename}{marker}\n{content}\n", len(content)
         
-        # Process remaining files
-        for file_path, relative_path, file_size in all_files:
-            if total_size + file_size > max_size_remaining:
-                extracted_content.append(f"# Remaining files skipped - size limit reached\n")
-                break
-                
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    extracted_content.append(f"# File: {relative_path}\n{content}\n")
-                    total_size += len(content)
-            except Exception as e:
-                print(f"Error reading file {file_path}: {str(e)}")
-        
-        # Clean up extracted directory
-        shutil.rmtree(extract_dir, ignore_errors=True)
-        
-        print(f"📦 ZIP extraction: {len(extracted_content)} files, {total_size//1024}KB")
+        print(f"📦 ZIP extraction: {files} files, {total_size//1024}KB")
         
     except Exception as e:
         print(f"Error extracting zip file {zip_path}: {str(e)}")
-    
-    return extracted_content, total_size
 
 def extract_from_zip(zip_path):
     """Legacy function for backward compatibility"""
     content, _ = extract_from_zip_smart(zip_path, 10 * 1024 * 1024)
     return content
 
+def is_documentation_file(file_path):
+    """Whether a file counts as documentation (README, .md files, etc.)"""
+    filename = os.path.basename(file_path).lower()
+    return any(doc in filename for doc in ['readme', '.md', 'doc', '.txt'])
+
 def extract_documentation(file_paths, project_description):
     """Extract documentation from files (README, .md files, etc.)"""
     doc_content = [f"Project Description:\n{project_description}\n\n"]
@@ -183,11 +231,9 @@ def extract_documentation(file_paths, project_description):
     for file_path in file_paths:
         if not os.path.exists(file_path):
             continue
-            
-        filename = os.path.basename(file_path).lower()
         
         # Look for documentation files
-        if any(doc in filename for doc in ['readme', '.md', 'doc', '.txt']):
+        if is_documentation_file(file_path):
             try:
                 with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                     content = f.read()
@@ -197,6 +243,24 @@ def extract_documentation(file_paths, project_description):
     
     return "\n\n".join(doc_content)
 
+def hash_file(file_path, limit=None, block_size=1024 * 1024):
+    """Stream a file through SHA-256 (optionally only its first `limit` bytes)"""
+    hasher = hashlib.sha256()
+    remaining = limit
+    with open(file_path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            block = f.read(block_size if remaining is None else min(block_size, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return hasher
+
+def submission_folder_path(submission_id):
+    """Folder holding a submission's raw uploads"""
+    return os.path.join(Config.UPLOAD_FOLDER, f'submission_{submission_id}')
+
 def create_upload_folder():
     """Create upload folder if it doesn't exist"""
     if not os.path.exists(Config.UPLOAD_FOLDER):
@@ -204,17 +268,84 @@ def create_upload_folder():
 
 def save_uploaded_file(file, submission_id):
     """Save uploaded file and return path"""
+    file_path, _ = store_uploaded_file(file, submission_id)
+    return file_path
+
+def store_uploaded_file(file, submission_id, block_size=1024 * 1024):
+    """
+    Save an uploaded file, hashing it while it streams to disk
+
+    The saved file is deduplicated against the content-addressed blob store.
+
+    Returns:
+        tuple: (file path, sha256 hex digest)
+    """
     create_upload_folder()
     
     filename = secure_filename(file.filename)
-    submission_folder = os.path.join(Config.UPLOAD_FOLDER, f'submission_{submission_id}')
+    submission_folder = submission_folder_path(submission_id)
     
     if not os.path.exists(submission_folder):
         os.makedirs(submission_folder)
     
     file_path = os.path.join(submission_folder, filename)
-    file.save(file_path)
+    hasher = hashlib.sha256()
+    with open(file_path, 'wb') as out:
+        while True:
+            block = file.stream.read(block_size)
+            if not block:
+                break
+            hasher.update(block)
+            out.write(block)
     
-    return file_path
+    digest = hasher.hexdigest()
+    link_into_blob_store(file_path, digest)
+    return file_path, digest
+
+def blob_path(digest):
+    """Location of a blob in the content-addressed store"""
+    return os.path.join(Config.UPLOAD_FOLDER, 'blobs', digest[:2], digest)
+
+def _link_or_copy(source, destination):
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        raise
+    except OSError:
+        # Cross-device or no hard-link support: fall back to a copy
+        shutil.copyfile(source, destination)
+
+def link_into_blob_store(file_path, digest):
+    """
+    Deduplicate a saved file against the blob store
+
+    New content is hard-linked into the store; content the store already
+    holds replaces the saved copy with a link to the existing blob, so
+    identical archives occupy disk space once.
+
+    Returns:
+        str: Blob path
+    """
+    blob = blob_path(digest)
+    os.makedirs(os.path.dirname(blob), exist_ok=True)
+    
+    if not os.path.exists(blob):
+        try:
+            _link_or_copy(file_path, blob)
+            return blob
+        except FileExistsError:
+            pass  # A concurrent upload of the same content stored it first
+    
+    if not os.path.samefile(blob, file_path):
+        temp_path = file_path + '.link'
+        _link_or_copy(blob, temp_path)
+        os.replace(temp_path, file_path)
+    return blob
+
+def combine_content_hashes(digests):
+    """Content hash of a multi-file upload (order-independent)"""
+    if len(digests) == 1:
+        return digests[0]
+    return hashlib.sha256('\n'.join(sorted(digests)).encode()).hexdigest()
 
 